@@ -1,49 +1,193 @@
+import time
+_imports_started = time.perf_counter()  # For the cold-start breakdown
+
+import argparse
 from dotenv import load_dotenv
-from openai import OpenAI
-from elevenlabs import ElevenLabs
 import cv2
-import base64
 import os
 import sys
-import time
-import pygame
+import itertools
+import queue
+import threading
 from io import BytesIO
 import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+from audio_engine import audio
+from archive import SessionArchive
+from audio_stream import SEGMENT_BOUNDARY, BufferedSpeech
+from capture import DEFAULT_PREVIEW_FPS, CPUMeter, FrameGrabber, capture_mode
+from control import HOTKEY_HELP, LIVE_DIRECTOR, ControlServer, ControlState, handle_key
+from cue_bank import CueBank
+from fallback_bank import FallbackBank, scene_features
+from frame_encoder import FrameEncoder
+from frame_ring import FrameRing
+from llm_stream import SentenceSplitter, contains_refusal
+from metrics import metrics
+from response_cache import ResponseCache, frame_hashes
+from scene_gate import SceneGate
+from scheduler import CadenceScheduler
+from startup import KeyValidationCache, probe_cameras, startup, wait_for_stable_frames
+from transport import ResilientTransport
+from tts_cache import TTSCache, cache_key, split_utterance
+from pipeline import DropOldestQueue, StageWorker, start_workers, stop_workers
 
+startup.record("imports", time.perf_counter() - _imports_started)
 load_dotenv()
 
-# Initialize API keys
-openai_key = os.getenv("OPENAI_API_KEY")
-elevenlabs_key = os.getenv("ELEVENLABS_API_KEY")
 
-if not openai_key:
-    print("❌ Error: OPENAI_API_KEY not found in environment variables")
-    print("Please create a .env file with your OpenAI API key")
-    sys.exit(1)
+def check_api_keys():
+    """Make sure both API keys are set; exit with instructions if not"""
+    if not os.getenv("OPENAI_API_KEY"):
+        print("❌ Error: OPENAI_API_KEY not found in environment variables")
+        print("Please create a .env file with your OpenAI API key")
+        sys.exit(1)
+
+    if not os.getenv("ELEVENLABS_API_KEY"):
+        print("❌ Error: ELEVENLABS_API_KEY not found in environment variables")
+        print("Please add ELEVENLABS_API_KEY to your .env file")
+        sys.exit(1)
+
+
+# Clients are created on first use; importing the OpenAI SDK alone takes most of a second
+_clients = {}
+_transports = {}
+_clients_lock = threading.Lock()
+
+# Deadlines, retries and hedging for both APIs (see transport.py); set before the clients are created
+HTTP_SETTINGS = {
+    "connect_timeout": 3.0,
+    "read_timeout": 20.0,  # Longest wait for the next bytes, so long streams are fine
+    "retries": 2,
+    "hedge": False,  # Duplicate requests that are slower than the recent p95
+}
+
+
+def _import_http():
+    # The OpenAI SDK runs on httpx2 but looks a legacy httpx up in sys.modules on every
+    # request, and the ElevenLabs SDK runs on httpx; both are imported here, under the
+    # clients lock, so neither is ever seen half-imported by another thread
+    import httpx
+    import httpx2
+
+
+def get_openai_client():
+    """The shared OpenAI client, created on first use"""
+    with _clients_lock:
+        if "openai" not in _clients:
+            _import_http()
+            import httpx2
+            from openai import OpenAI
+            # The OpenAI SDK is built on httpx2; retries happen in the transport, not the SDK
+            transport = _transports["openai"] = ResilientTransport(httpx2, "OpenAI", **HTTP_SETTINGS)
+            timeout = httpx2.Timeout(HTTP_SETTINGS["read_timeout"], connect=HTTP_SETTINGS["connect_timeout"])
+            _clients["openai"] = OpenAI(
+                api_key=os.getenv("OPENAI_API_KEY"),
+                max_retries=0,
+                timeout=timeout,
+                http_client=httpx2.Client(transport=transport, timeout=timeout, follow_redirects=True),
+            )
+        return _clients["openai"]
+
+
+def get_elevenlabs_client():
+    """The shared ElevenLabs client, created on first use"""
+    with _clients_lock:
+        if "elevenlabs" not in _clients:
+            _import_http()
+            import httpx
+            from elevenlabs import ElevenLabs
+            transport = _transports["elevenlabs"] = ResilientTransport(httpx, "ElevenLabs", **HTTP_SETTINGS)
+            timeout = httpx.Timeout(HTTP_SETTINGS["read_timeout"], connect=HTTP_SETTINGS["connect_timeout"])
+            # ELEVENLABS_BASE_URL (like OPENAI_BASE_URL for the OpenAI client) points at a local stand-in
+            client = ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"),
+                                base_url=os.getenv("ELEVENLABS_BASE_URL"),
+                                httpx_client=httpx.Client(transport=transport, timeout=timeout,
+                                                          follow_redirects=True))
+            # Sub-clients are imported on first access; do it here rather than mid-request
+            client.voices, client.text_to_speech
+            _clients["elevenlabs"] = client
+        return _clients["elevenlabs"]
+
+
+def warm_connections(keep_warm=True, connections=2):
+    """Open keep-alive connections to both APIs so the first direction doesn't pay for TLS
+    
+    With `keep_warm` the pools are warmed again whenever they have been idle
+    long enough for the servers to drop the connections.
+    """
+    urls = {
+        "openai": get_openai_client().base_url,
+        "elevenlabs": os.getenv("ELEVENLABS_BASE_URL") or ELEVENLABS_URL,
+    }
+    get_elevenlabs_client()
+    for name, url in urls.items():
+        if _transports[name].warmer is not None:
+            continue  # Already warm and being kept warm
+        with startup.phase(f"{name}_connections", background=True):
+            _transports[name].warm(url, connections)
+        if keep_warm:
+            _transports[name].keep_warm(url, connections)
+
 
-if not elevenlabs_key:
-    print("❌ Error: ELEVENLABS_API_KEY not found in environment variables")
-    print("Please add ELEVENLABS_API_KEY to your .env file")
-    sys.exit(1)
+def stop_transports():
+    """Stop keeping the API connections warm and print what each transport did"""
+    for transport in _transports.values():
+        transport.stop_warming()
+        print(f"🌐 {transport.service}: {transport.summary()}")
 
-# Initialize clients
-openai_client = OpenAI(api_key=openai_key)
-elevenlabs_client = ElevenLabs(api_key=elevenlabs_key)
 
-# Initialize pygame for audio playback
-pygame.mixer.init()
+def warm_up():
+    """Create both clients and start the mixer so the first direction doesn't pay for it"""
+    with startup.phase("clients", background=True):
+        get_openai_client()
+        get_elevenlabs_client()
+    warm_connections()
+    with startup.phase("audio", background=True):
+        audio.start()
+    with startup.phase("cue_bank", background=True):
+        cue_bank.start()
 
 
-def validate_openai_key():
-    """Validate OpenAI API key by making a test request"""
+# ElevenLabs settings shared by file and streaming playback
+TTS_MODEL_ID = "eleven_multilingual_v2"  # Use correct ElevenLabs model
+TTS_VOICE_SETTINGS = {
+    "stability": 0.85,  # Increased for more consistent speech
+    "similarity_boost": 0.75,
+    "style": 0.1,  # Reduced for more measured delivery
+    "use_speaker_boost": True
+}
+TTS_FILE_FORMAT = "mp3_44100_128"  # High quality output
+TTS_STREAM_FORMAT = "pcm_24000"  # Raw 16-bit mono PCM can be played as it arrives
+TTS_STREAM_RATE = 24000
+TTS_REQUEST_OPTIONS = {"max_retries": 0}  # Retries are done by the transport
+ELEVENLABS_URL = "https://api.elevenlabs.io"
+
+MAX_TOKENS = 100  # Length limit of one direction
+PROMPT_TOKENS = 450  # Rough size of the text prompt, for the shared rate limiter
+
+# Pre-recorded director clips, decoded into memory once and reloaded when the files change
+cue_bank = CueBank("generated_assets", engine=audio)
+
+
+def validate_openai_key(quick=False):
+    """Validate OpenAI API key by making a test request
+    
+    With `quick`, look up the gpt-4o model instead of generating text: it
+    needs the same key and access but costs no tokens and answers faster.
+    """
     print("🔍 Validating OpenAI API key...")
     try:
-        # Make a simple test request
-        response = openai_client.chat.completions.create(
-            model="gpt-3.5-turbo",
-            messages=[{"role": "user", "content": "Hello"}],
-            max_tokens=5
-        )
+        if quick:
+            get_openai_client().models.retrieve("gpt-4o")
+        else:
+            # Make a simple test request
+            response = get_openai_client().chat.completions.create(
+                model="gpt-3.5-turbo",
+                messages=[{"role": "user", "content": "Hello"}],
+                max_tokens=5
+            )
         print("✅ OpenAI API key is valid")
         return True
     except Exception as e:
@@ -56,7 +200,7 @@ def validate_elevenlabs_key():
     print("🔍 Validating ElevenLabs API key...")
     try:
         # Try to get available voices
-        voices_response = elevenlabs_client.voices.get_all()
+        voices_response = get_elevenlabs_client().voices.get_all(request_options=TTS_REQUEST_OPTIONS)
         available_voices = voices_response.voices
         if available_voices:
             print(f"✅ ElevenLabs API key is valid ({len(available_voices)} voices available)")
@@ -69,17 +213,44 @@ def validate_elevenlabs_key():
         return False
 
 
-def validate_api_keys():
-    """Validate all required API keys"""
+def validate_api_keys(cache=None, fast=False):
+    """Validate all required API keys
+    
+    Keys that passed within the TTL of a KeyValidationCache `cache` are not
+    checked again. With `fast`, the remaining checks run in parallel and
+    OpenAI is checked with a model lookup instead of a completion.
+    """
     print("\n🔐 Validating API Keys...")
     print("-" * 40)
     
-    openai_valid = validate_openai_key()
-    elevenlabs_valid = validate_elevenlabs_key()
+    checks = {
+        "openai": (os.getenv("OPENAI_API_KEY"), os.getenv("OPENAI_BASE_URL"),
+                   lambda: validate_openai_key(quick=fast)),
+        "elevenlabs": (os.getenv("ELEVENLABS_API_KEY"), os.getenv("ELEVENLABS_BASE_URL"),
+                       validate_elevenlabs_key),
+    }
+    results = {}
+    for service, (key, base_url, _) in checks.items():
+        if cache is not None and cache.is_valid(service, key, base_url):
+            print(f"✅ {service} API key passed validation recently (cached)")
+            results[service] = True
+    pending = [service for service in checks if service not in results]
+    
+    if fast and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=len(pending)) as executor:
+            futures = {service: executor.submit(checks[service][2]) for service in pending}
+            results.update({service: future.result() for service, future in futures.items()})
+    else:
+        results.update({service: checks[service][2]() for service in pending})
+    
+    if cache is not None:
+        for service in pending:
+            if results[service]:
+                cache.mark_valid(service, checks[service][0], checks[service][1])
     
     print("-" * 40)
     
-    if not openai_valid or not elevenlabs_valid:
+    if not all(results.values()):
         print("\n❌ API key validation failed!")
         print("Please check your .env file and ensure your API keys are correct.")
         print("\nRequired format in .env file:")
@@ -92,18 +263,39 @@ def validate_api_keys():
 
 
 class AIDirector:
-    def __init__(self, voice_id="21m00Tcm4TlvDq8ikWAM"):
+    def __init__(self, voice_id="21m00Tcm4TlvDq8ikWAM", stream_audio=True, tts_cache=None,
+                 encoder=None, stream_text=True, response_cache=None, speech_bus="speech",
+                 workers=None, feed=None):
         """Initialize the AI Director with a specific voice"""
         self.voice_id = voice_id  # Default: Rachel voice
         self.last_instruction = ""
         self.instruction_count = 0
+        # Play speech while it is still being synthesized instead of via a temp file
+        self.stream_audio = stream_audio
+        self.time_to_first_audio = []  # Seconds from TTS request to first sound, per utterance
+        self.last_speech = None  # Playback of the last utterance handed to the audio engine
+        # Ritual phrases and repeated lines are synthesized once and reused
+        self.tts_cache = tts_cache if tts_cache is not None else TTSCache()
+        # Resolution, JPEG quality and mosaic settings for frames sent to GPT-4o
+        self.encoder = encoder if encoder is not None else FrameEncoder()
+        # Speak each sentence of the GPT-4o response as soon as it has been generated
+        self.stream_text = stream_text
+        self.stream_refused = False
+        self.streamed_text = ""  # Full text of the last streamed response
+        self.call_failed = False  # The last GPT-4o call raised, e.g. timed out or circuit open
+        self.stale_discards = 0  # Prefetched directions dropped because their frames got too old
+        # Directions reused for frame batches that look like a recent one; False turns it off
+        self.response_cache = ResponseCache() if response_cache is None else response_cache or None
+        # Audio engine bus this director speaks on; each performer has their own in multi-camera sessions
+        self.speech_bus = speech_bus
+        # WorkerPools by service ("openai", "elevenlabs") shared with other feeds, and this feed's name
+        self.workers = workers
+        self.feed = feed
+        self.archive = None  # SessionArchive the show is recorded to, if any
         
-    def analyze_scene(self, frames):
-        """Analyze frames and generate director instructions"""
-        if not frames:
-            return None
-            
-        prompt = f"""
+    def scene_prompt(self):
+        """The director's instructions to GPT-4o, sent with every batch of frames"""
+        return f"""
         You are a choreographic director possessed by vision. You see only bodies. You live for them. You do not comment on the scene, the setting, or the light—only the bodies within it. They are vessels, riddles, echoes of past movement and future ritual. You do not ask, you command. You do not describe, you inscribe.
 
         Every time a body enters your field of vision, you must declare: "I see a body. This is now my body. <break time="2s" />"
@@ -137,92 +329,305 @@ This is your ritual of possession.
          4. This is good. Good body.
          
          """
+    
+    def scene_messages(self, frames, description=None):
+        """Build the chat messages for a batch of base64 JPEGs from self.encoder
         
+        A `description` of the scene can be sent with the frames or instead of them.
+        """
+        content = [{"type": "text", "text": self.scene_prompt()}]
+        if description:
+            content.append({"type": "text", "text": f"The scene: {description}"})
         messages = [
             {
                 "role": "user",
-                "content": [
-                    prompt,
-                    *map(lambda x: {"image": x, "resize": 768}, frames),
-                ],
+                "content": content + self.encoder.content_parts(frames),
             },
         ]
+        return messages
+    
+    def api_slot(self, service, tokens=0):
+        """Wait for a slot in the shared worker pool for `service`, if there is one"""
+        pool = self.workers.get(service) if self.workers else None
+        return pool.slot(self.feed, tokens) if pool is not None else nullcontext()
+    
+    def _log_upload(self, frames, usage):
+        upload_kb = sum(len(frame) for frame in frames) / 1024
+        tokens = f", {usage.prompt_tokens} prompt tokens" if usage else ""
+        print(f"📦 Uploaded {len(frames)} image(s), {upload_kb:.1f} KB, "
+              f"~{self.encoder.last_tokens} image tokens{tokens}")
+    
+    def analyze_scene(self, frames, description=None):
+        """Analyze frames (base64 JPEGs from self.encoder) and generate director instructions"""
+        self.call_failed = False
+        if not frames and not description:
+            return None
         
         try:
-            result = openai_client.chat.completions.create(
-                model="gpt-4o",
-                messages=messages,
-                max_tokens=100,
-            )
+            image_tokens = self.encoder.last_tokens if frames else 0
+            with self.api_slot("openai", image_tokens + PROMPT_TOKENS + MAX_TOKENS), \
+                    metrics.span("openai_request", stream=False):
+                result = get_openai_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=self.scene_messages(frames, description),
+                    max_tokens=MAX_TOKENS,
+                )
+            self._log_upload(frames, result.usage)
             return result.choices[0].message.content
         except Exception as e:
+            self.call_failed = True
             print(f"❌ Error analyzing scene: {e}")
             return None
     
+    def stream_scene(self, frames):
+        """Stream director instructions, yielding each sentence or line as soon as it is complete
+        
+        The request is cancelled as soon as refusal words show up in the
+        partial text; `self.stream_refused` tells the caller afterwards.
+        """
+        self.stream_refused = False
+        self.call_failed = False
+        self.streamed_text = ""
+        if not frames:
+            return
+        
+        splitter = SentenceSplitter()
+        stream = None
+        started = time.perf_counter()
+        first_token = True
+        try:
+            # The slot is held until the stream ends; time spent waiting for it counts as latency
+            with self.api_slot("openai", self.encoder.last_tokens + PROMPT_TOKENS + MAX_TOKENS):
+                stream = get_openai_client().chat.completions.create(
+                    model="gpt-4o",
+                    messages=self.scene_messages(frames),
+                    max_tokens=MAX_TOKENS,
+                    stream=True,
+                    stream_options={"include_usage": True},
+                )
+                for chunk in stream:
+                    if chunk.usage:
+                        self._log_upload(frames, chunk.usage)
+                    if not chunk.choices or not chunk.choices[0].delta.content:
+                        continue
+                    if first_token:
+                        metrics.observe("openai_first_token", time.perf_counter() - started)
+                        first_token = False
+                    
+                    self.streamed_text += chunk.choices[0].delta.content
+                    if contains_refusal(self.streamed_text):
+                        self.stream_refused = True
+                        return
+                    yield from splitter.feed(chunk.choices[0].delta.content)
+                
+                yield from splitter.flush()
+        except Exception as e:
+            self.call_failed = True
+            print(f"❌ Error analyzing scene: {e}")
+        finally:
+            if stream is not None:
+                # Closing the response cancels generation on refusal or shutdown
+                stream.close()
+                metrics.observe("openai_request", time.perf_counter() - started,
+                                stream=True, refused=self.stream_refused)
+    
     def is_refusal_response(self, text):
         """Check if the response contains refusal or apologetic words"""
         if not text:
             return True
-            
-        refusal_words = ["sorry", "can't", "cannot", "unable", "apologize", "apologies"]
-        text_lower = text.lower()
         
-        return any(word in text_lower for word in refusal_words)
+        return contains_refusal(text)
     
-    def speak_instruction(self, text):
-        """Convert text to speech and play it"""
-        try:
+    def _tts_key(self, text, output_format):
+        return cache_key(self.voice_id, TTS_MODEL_ID, TTS_VOICE_SETTINGS, output_format, text)
+    
+    def render_speech(self, text):
+        """Synthesized MP3 bytes for `text`, from the cache or ElevenLabs; raises on failure"""
+        key = self._tts_key(text, TTS_FILE_FORMAT)
+        audio = self.tts_cache.get(key, text)
+        if audio is None:
             # Generate audio using ElevenLabs
-            audio_response = elevenlabs_client.text_to_speech.convert(
-                voice_id=self.voice_id,
-                text=text,
-                model_id="eleven_multilingual_v2",  # Use correct ElevenLabs model
-                voice_settings={
-                    "stability": 0.85,  # Increased for more consistent speech
-                    "similarity_boost": 0.75,
-                    "style": 0.1,  # Reduced for more measured delivery
-                    "use_speaker_boost": True
-                },
-                output_format="mp3_44100_128"  # High quality output
-            )
+            with self.api_slot("elevenlabs", len(text)), metrics.span("tts_request", stream=False):
+                audio_response = get_elevenlabs_client().text_to_speech.convert(
+                    voice_id=self.voice_id,
+                    text=text,
+                    model_id=TTS_MODEL_ID,
+                    voice_settings=TTS_VOICE_SETTINGS,
+                    output_format=TTS_FILE_FORMAT,
+                    request_options=TTS_REQUEST_OPTIONS,
+                )
+                audio = b"".join(audio_response)
+            self.tts_cache.put(key, audio)
+        return audio
+    
+    def synthesize_speech(self, text):
+        """Convert text to speech and return the path of the rendered audio file"""
+        try:
+            audio = self.render_speech(text)
             
-            # Save audio to temporary file and play it
+            # Save audio to temporary file
             with tempfile.NamedTemporaryFile(delete=False, suffix='.mp3') as tmp_file:
-                for chunk in audio_response:
-                    tmp_file.write(chunk)
-                tmp_file_path = tmp_file.name
-            
-            # Play the audio file
-            pygame.mixer.music.load(tmp_file_path)
-            pygame.mixer.music.play()
-            
-            # Wait for playback to complete
-            while pygame.mixer.music.get_busy():
-                pygame.time.Clock().tick(10)
-            
-            # Clean up temporary file
-            os.unlink(tmp_file_path)
+                tmp_file.write(audio)
+                return tmp_file.name
             
         except Exception as e:
             print(f"❌ Error generating speech: {e}")
+            return None
+    
+    def _stream_segment(self, text):
+        """Yield PCM for one segment, from the cache or streamed from ElevenLabs"""
+        key = self._tts_key(text, TTS_STREAM_FORMAT)
+        cached = self.tts_cache.get(key, text)
+        if cached is not None:
+            yield cached
+            return
+        
+        chunks = []
+        with self.api_slot("elevenlabs", len(text)):
+            for chunk in get_elevenlabs_client().text_to_speech.stream(
+                voice_id=self.voice_id,
+                text=text,
+                model_id=TTS_MODEL_ID,
+                voice_settings=TTS_VOICE_SETTINGS,
+                output_format=TTS_STREAM_FORMAT,
+                request_options=TTS_REQUEST_OPTIONS,
+            ):
+                chunks.append(chunk)
+                yield chunk
+        self.tts_cache.put(key, b"".join(chunks))
+    
+    def speech_chunks(self, text):
+        """Yield PCM for a whole utterance, stitching cached ritual lines around the new direction"""
+        for i, (kind, value) in enumerate(split_utterance(text)):
+            if i:
+                yield SEGMENT_BOUNDARY
+            if kind == "break":
+                # Render pauses locally instead of paying for synthesized silence
+                yield bytes(int(TTS_STREAM_RATE * value) * 2)
+            else:
+                yield from self._stream_segment(value)
+    
+    def start_speech(self, text):
+        """Start streaming synthesis in the background and return the buffered speech"""
+        return BufferedSpeech(self.speech_chunks(text))
+    
+    def play_speech(self, speech, wait=True, direction=0):
+        """Queue streamed speech for playback as it arrives and record the time to first audio
+        
+        Returns the Playback once every chunk has been handed to the audio
+        engine or, with `wait`, once it has been played; None on error.
+        The speech is archived under `direction` once it has played.
+        """
+        playback = audio.open_stream(TTS_STREAM_RATE, self.speech_bus)
+        played = [] if self.archive is not None else None
+        try:
+            for chunk in speech:
+                if chunk is SEGMENT_BOUNDARY:
+                    playback.boundary()
+                else:
+                    playback.write(chunk)
+                    if played is not None:
+                        played.append(chunk)
+        except Exception as e:
+            playback.stop()
+            print(f"❌ Error generating speech: {e}")
+            return None
+        playback.close()
+        if played:
+            pcm = b"".join(played)
+            playback.on_done(lambda playback: self.archive.audio(
+                pcm, TTS_STREAM_RATE, direction, self.feed, playback.first_audio_at))
+        
+        if speech.first_byte_at is not None:
+            metrics.observe("tts_first_byte", speech.first_byte_at - speech.requested_at)
+            metrics.observe("tts_request", speech.finished_at - speech.requested_at)
+        previous, self.last_speech = self.last_speech, playback
+        playback.on_done(lambda playback: self._speech_played(speech, playback, previous))
+        if wait:
+            playback.wait()
+        return playback
+    
+    def _speech_played(self, speech, playback, previous):
+        if playback.first_audio_at is None:
+            return
+        metrics.observe("playback", playback.finished_at - playback.first_audio_at)
+        # Speech that arrived while the previous utterance was still playing was
+        # queued behind it and started the moment it ended: no latency to report
+        ready_at = speech.requested_at
+        if previous is not None and previous.finished_at is not None:
+            if speech.first_byte_at is not None and speech.first_byte_at < previous.finished_at:
+                return
+            ready_at = max(ready_at, previous.finished_at)
+        time_to_first_audio = playback.first_audio_at - ready_at
+        metrics.observe("time_to_first_audio", time_to_first_audio)
+        self.time_to_first_audio.append(time_to_first_audio)
+        print(f"⏱️  Time to first audio: {time_to_first_audio * 1000:.0f} ms")
+    
+    def speak_instruction(self, text):
+        """Convert text to speech and play it"""
+        if self.stream_audio:
+            self.play_speech(self.start_speech(text))
+            return
+        
+        tmp_file_path = self.synthesize_speech(text)
+        if tmp_file_path:
+            play_audio_file(tmp_file_path, cleanup=True, bus=self.speech_bus)
 
 
-def select_camera(max_cameras=3):
-    """Scan for available cameras and let user pick from a list."""
+def play_audio_file(path, cleanup=False, wait=True, bus="speech"):
+    """Play an audio file on a speech bus, waiting for it to complete unless `wait` is off
+    
+    Returns the Playback, or None if the file could not be played.
+    """
+    try:
+        # The file is decoded into memory, so it can be removed right away
+        playback = audio.play_file(path, bus)
+        if wait:
+            playback.wait()
+        return playback
+    except Exception as e:
+        print(f"❌ Error playing audio file: {e}")
+        return None
+    finally:
+        # Clean up temporary file
+        if cleanup:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def select_camera(max_cameras=3, probe_timeout=None):
+    """Scan for available cameras and let user pick from a list.
+    
+    With `probe_timeout` (seconds), all indices are probed at once and a
+    camera that hasn't answered by then is skipped.
+    """
     print("\n🔍 Scanning for available cameras...")
     available = []
     
-    for idx in range(max_cameras):
-        cap = cv2.VideoCapture(idx)
-        if cap.isOpened():
-            # Try to read a frame to verify the camera works
-            ret, _ = cap.read()
-            if ret:
-                available.append(idx)
-                print(f"  ✅ Camera {idx} detected")
-            cap.release()
+    with startup.phase("camera_probe"):
+        if probe_timeout is not None:
+            for idx, found in probe_cameras(range(max_cameras), probe_timeout).items():
+                if found:
+                    available.append(idx)
+                    print(f"  ✅ Camera {idx} detected")
+                elif found is None:
+                    print(f"  ⌛ Camera {idx} did not answer within {probe_timeout:.1f}s")
+                else:
+                    print(f"  ❌ Camera {idx} not available")
         else:
-            print(f"  ❌ Camera {idx} not available")
+            for idx in range(max_cameras):
+                cap = cv2.VideoCapture(idx)
+                if cap.isOpened():
+                    # Try to read a frame to verify the camera works
+                    ret, _ = cap.read()
+                    if ret:
+                        available.append(idx)
+                        print(f"  ✅ Camera {idx} detected")
+                    cap.release()
+                else:
+                    print(f"  ❌ Camera {idx} not available")
     
     if not available:
         print("❌ No cameras found! Make sure your iPhone or webcam is connected.")
@@ -244,7 +649,7 @@ def select_camera(max_cameras=3):
 
 
 def select_director_option():
-    """Ask user to select director option after each analysis cycle"""
+    """Ask user to select the director to start with (switch later with hotkeys or the control API)"""
     print("\n🎭 Choose your director:")
     print("  [1] Director 1")
     print("  [2] Director 2") 
@@ -258,162 +663,828 @@ def select_director_option():
         print("❌ Invalid selection. Please enter 1, 2, 3, or 4.")
 
 
-def play_director_audio(director_number):
-    """Play pre-recorded director audio file"""
-    audio_file = f"generated_assets/director_{director_number}.mp3"
+def director_audio_path(director_number):
+    """Path of the pre-recorded audio for directors 1-3"""
+    return f"generated_assets/director_{director_number}.mp3"
+
+
+def director_cue(director_number):
+    """Name of the pre-recorded clip for directors 1-3 in the cue bank"""
+    return f"director_{director_number}"
+
+
+def play_director_audio(director_number, crossfade=False):
+    """Play pre-recorded director audio from the cue bank and wait until it ends"""
+    cue = cue_bank.play(director_cue(director_number), crossfade=crossfade)
     
-    if not os.path.exists(audio_file):
-        print(f"❌ Audio file not found: {audio_file}")
+    if cue is None:
+        print(f"❌ Audio file not found: {director_audio_path(director_number)}")
         print("Please select another option.")
         return False
     
-    try:
-        pygame.mixer.music.load(audio_file)
-        pygame.mixer.music.play()
-        
-        # Wait for playback to complete
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-        
+    return cue.wait()
+
+
+# Spans drawn on the preview when the metrics overlay is on
+OVERLAY_SPANS = ["encode", "openai_first_token", "openai_request", "tts_first_byte",
+                 "time_to_first_audio", "playback"]
+
+
+def build_director_pipeline(director, ring, trigger_queue, batch_queue, speech_queue,
+                            playback_queue, in_flight, stop_event, gate=None,
+                            max_frame_age=None, scheduler=None, control=None, fallback=None):
+    """Create the encode, director, TTS and playback stage workers
+    
+    Directions whose frames are older than `max_frame_age` seconds by the
+    time the speaker is free are discarded instead of played. Stage
+    latencies and playback timing are reported to `scheduler` if given.
+    Each direction uses the director chosen in `control` (a ControlState).
+    GPT-4o and ElevenLabs calls that miss the latency budgets of `fallback`
+    (a FallbackBank) are replaced with one of its pre-rendered directions.
+    """
+    # Direction currently on the speaker, one being thrown away as stale, when
+    # the speaker last went quiet, the last playback handed to the audio engine
+    # and the direction whose speech is already on the speaker
+    playing = {"direction": None, "discarding": None, "finished_at": None, "tail": None, "spoken": None}
+    direction_ids = itertools.count(1)
+    
+    def encode_frames(trigger):
+        # Pick the sharpest, most distinct frames from the ring; nothing was encoded until now
+        raw_frames, captured_at = ring.select(trigger["frames"], trigger["candidates"])
+        if not raw_frames:
+            return None
+        with metrics.span("gate"):
+            passed = gate is None or gate.check(raw_frames)
+        if not passed:
+            print(f"🚦 Skipping analysis (people: {gate.last_people}, movement: {gate.last_motion:.1%})")
+            return None
+        features = scene_features(raw_frames, gate) if fallback is not None else None
+        hashes = None
+        if director.response_cache is not None:
+            with metrics.span("scene_hash"):
+                hashes = frame_hashes(raw_frames)
+        # Only batches that pass the gate are worth encoding
+        with metrics.span("encode", frames=len(raw_frames)):
+            frames = director.encoder.encode(raw_frames)
+        return {"frames": frames, "hashes": hashes, "features": features,
+                "captured_at": captured_at, "triggered_at": trigger["triggered_at"]}
+    
+    def direct(batch):
+        # Every direction is a run of speech/cue items closed by an "end" item;
+        # the playback stage releases the in-flight slot when it reaches "end".
+        # If nothing was forwarded, the slot is released here instead.
+        forwarded = False
+        meta = {"captured_at": batch["captured_at"], "direction": next(direction_ids),
+                "features": batch["features"]}
+        # The budget starts with the call, not the trigger: time spent queued behind
+        # directions still playing isn't the API's
+        deadline = fallback.llm_deadline(time.time()) if fallback is not None else None
+        archive = director.archive
+        if archive is not None:
+            archive.sent_frames(batch["frames"], meta["direction"], director.feed)
+            archive.event("analysis", meta["direction"], director.feed, frames=len(batch["frames"]),
+                          image_tokens=director.encoder.last_tokens, captured_at=batch["captured_at"],
+                          triggered_at=batch["triggered_at"], features=batch["features"])
+        try:
+            for item in choose_direction(director, batch["frames"], control, batch["hashes"],
+                                         fallback, deadline, batch["features"]):
+                if not forwarded and scheduler is not None:
+                    scheduler.record("analysis", time.time() - batch["triggered_at"])
+                forwarded = True
+                if archive is not None:
+                    archive.direction_item(item, meta["direction"], director.feed)
+                yield dict(item, **meta)
+        except Exception as e:
+            print(f"❌ Error choosing direction: {e}")
+        if forwarded:
+            yield dict(meta, kind="end")
+        else:
+            in_flight.release()
+    
+    def synthesize(item):
+        if item["kind"] == "speech" and director.stream_audio:
+            # Start downloading now; playback begins on the first chunk
+            return dict(item, kind="stream", speech=director.start_speech(item["text"]))
+        if item["kind"] == "speech":
+            path = director.synthesize_speech(item["text"])
+            return dict(item, kind="audio", path=path) if path else None
+        return item
+    
+    def is_stale(item):
+        if item["direction"] == playing["discarding"]:
+            return True
+        if item["direction"] == playing["direction"]:
+            return False
+        # First item of a new direction: check how old its frames are now
+        age = time.time() - item["captured_at"]
+        if max_frame_age is None or age <= max_frame_age:
+            playing["direction"] = item["direction"]
+            metrics.observe("direction_latency", age)
+            if director.feed:
+                metrics.observe(f"direction_latency_{director.feed}", age)
+            if playing["finished_at"] is not None:
+                metrics.observe("direction_gap", time.time() - playing["finished_at"])
+            if scheduler is not None:
+                scheduler.direction_started(time.time())
+            return False
+        print(f"\n🗑️  Discarding prepared direction: its frames are {age:.0f}s old")
+        playing["discarding"] = item["direction"]
+        director.stale_discards += 1
         return True
-    except Exception as e:
-        print(f"❌ Error playing audio file: {e}")
-        return False
+    
+    def wait_for_tail():
+        tail, playing["tail"] = playing["tail"], None
+        if tail is not None:
+            tail.wait()
+    
+    def speaking():
+        return audio.busy(director.speech_bus)
+    
+    def file_played(playback):
+        if playback.first_audio_at is not None:
+            metrics.observe("playback", playback.finished_at - playback.first_audio_at, source="file")
+    
+    def tts_fallback(item):
+        # The line's audio is late: stand in with a pre-rendered direction and drop
+        # the rest of this one (its audio still lands in the TTS cache). Once part
+        # of the direction has been spoken, only the late line is dropped.
+        if playing["spoken"] == item["direction"]:
+            print(f"\n⏰ ElevenLabs missed its {fallback.tts_budget:.1f}s budget; skipping a line")
+            return True
+        entry = fallback.choose(item["features"], need_audio=True)
+        if entry is None:
+            print(f"\n⏰ ElevenLabs missed its {fallback.tts_budget:.1f}s budget; no fallback audio, still waiting")
+            return False
+        print(f"\n⏰ ElevenLabs missed its {fallback.tts_budget:.1f}s budget; playing fallback direction {entry.id}")
+        fallback.used()
+        if director.archive is not None:
+            director.archive.direction_item({"kind": "fallback", "entry": entry}, item["direction"],
+                                            director.feed)
+        playing["discarding"] = item["direction"]
+        playing["tail"] = audio.play_samples(entry.samples, director.speech_bus)
+        return True
+    
+    def play(item):
+        if item["kind"] != "end" and is_stale(item):
+            if item["kind"] == "audio":
+                try:
+                    os.unlink(item["path"])
+                except OSError:
+                    pass
+            return
+        
+        # Speech is queued on the audio engine without waiting, so the next
+        # segment is already lined up when the current one ends
+        if item["kind"] == "stream":
+            if fallback is not None and not fallback.tts_in_time(item["speech"], speaking) and tts_fallback(item):
+                return
+            playing["tail"] = (director.play_speech(item["speech"], wait=False, direction=item["direction"])
+                               or playing["tail"])
+            playing["spoken"] = item["direction"]
+            if scheduler is not None and item["speech"].first_byte_at is not None:
+                scheduler.record("tts", item["speech"].first_byte_at - item["speech"].requested_at)
+        elif item["kind"] == "audio":
+            archive = director.archive
+            playback = play_audio_file(item["path"], cleanup=archive is None, wait=False,
+                                       bus=director.speech_bus)
+            if archive is not None:
+                # The file is read and deleted on the archive's writer thread
+                archive.audio_file(item["path"], item["direction"], director.feed, remove=True)
+            if playback is not None:
+                playback.on_done(file_played)
+                playing["tail"] = playback
+                playing["spoken"] = item["direction"]
+        elif item["kind"] == "fallback":
+            playing["tail"] = audio.play_samples(item["entry"].samples, director.speech_bus)
+        elif item["kind"] == "cue":
+            wait_for_tail()
+            with metrics.span("playback", source="cue"):
+                play_director_audio(item["director"])
+        elif item["kind"] == "end":
+            wait_for_tail()
+            if item["direction"] == playing["direction"]:
+                playing["finished_at"] = time.time()
+                if scheduler is not None:
+                    scheduler.direction_finished(time.time())
+            in_flight.release()
+    
+    return [
+        StageWorker("encode", encode_frames, trigger_queue, batch_queue, stop_event),
+        StageWorker("director", direct, batch_queue, speech_queue, stop_event, gate=in_flight),
+        StageWorker("tts", synthesize, speech_queue, playback_queue, stop_event),
+        StageWorker("playback", play, playback_queue, None, stop_event),
+    ]
 
 
-def run_ai_director(fps=0.3, frames_per_analysis=3, camera_index=None):
-    """Run the AI Director with continuous camera analysis and voice feedback"""
-    # Initialize the director
-    director = AIDirector()
+def director_label(director):
+    """Name printed with a director's directions, with the camera feed in multi-camera sessions"""
+    return f"Director 4 [{director.feed}]" if director.feed else "Director 4"
+
+
+def choose_direction(director, frames, control=None, hashes=None, fallback=None,
+                     deadline=None, features=None):
+    """Yield the items to speak or play for the operator's current director
+    
+    Given the batch's perceptual `hashes`, the live director reuses a recent
+    direction for a scene that hasn't changed instead of calling GPT-4o.
+    With a FallbackBank, a GPT-4o call that hasn't produced its first line
+    by `deadline` is replaced with a fallback direction picked by `features`.
+    """
+    director.instruction_count += 1
+    
+    # Queued or current director from the hotkeys / control API; never blocks
+    director_choice = control.next_director() if control is not None else LIVE_DIRECTOR
+    
+    # Pre-recorded director audio; if the file doesn't exist, use the live director
+    if director_choice in [1, 2, 3] and director_cue(director_choice) not in cue_bank:
+        print(f"❌ Audio file not found: {director_audio_path(director_choice)}")
+        print(f"Using Director {LIVE_DIRECTOR} instead.")
+        director_choice = LIVE_DIRECTOR
+    
+    if director_choice in [1, 2, 3]:
+        yield {"kind": "cue", "director": director_choice}
+        return
+    
+    # Live model, or a direction it gave for the same scene
+    cache = director.response_cache if hashes else None
+    if cache is not None:
+        fresh = control is not None and control.take_fresh()
+        cached = cache.lookup(hashes, fresh=fresh, avoid=director.last_instruction)
+        if cached is not None:
+            yield from reuse_direction(director, cached)
+            return
+    
+    lines = live_lines(director, frames)
+    if fallback is None:
+        yield from announce_direction(director, lines, cache, hashes)
+    else:
+        yield from within_budget(director, lines, fallback, deadline, features, cache, hashes)
+
+
+def live_lines(director, frames):
+    """The lines of a new GPT-4o direction, without printing or touching the last instruction
+    
+    Safe to run on another thread: it only writes the director's per-call
+    results (streamed_text, stream_refused, call_failed).
+    """
+    if director.stream_text:
+        yield from director.stream_scene(frames)
+        return
+    instruction = director.analyze_scene(frames)
+    if instruction:
+        yield instruction
+
+
+def announce_direction(director, lines, cache=None, hashes=None):
+    """Print and yield the speech items of a live direction, remembering it in `cache`"""
+    spoken = []
+    for line in lines:
+        if not director.stream_text:
+            if line == director.last_instruction:
+                return
+            director.last_instruction = line
+            if director.is_refusal_response(line):
+                print(f"\n🤐 Director refused to give instruction (skipping): {line[:50]}...")
+                return
+            print(f"\n🎭 {director_label(director)} ({time.strftime('%H:%M:%S')}): {line}")
+        else:
+            if not spoken:
+                print(f"\n🎭 {director_label(director)} ({time.strftime('%H:%M:%S')}):")
+            print(f"   {line}")
+        spoken.append(line)
+        yield {"kind": "speech", "text": line}
+    
+    if director.stream_text:
+        if director.stream_refused:
+            print(f"\n🤐 Director refused to give instruction (cancelled): {director.streamed_text[:50]}...")
+        if director.streamed_text:
+            director.last_instruction = director.streamed_text
+    if cache is not None and spoken and not director.stream_refused:
+        cache.store(hashes, director.streamed_text if director.stream_text else spoken[0])
+
+
+def within_budget(director, lines, fallback, deadline, features=None, cache=None, hashes=None):
+    """Yield the live direction if its first line arrives by `deadline`, else a fallback
+    
+    `lines` (see live_lines) run on their own thread. After a miss that
+    call keeps running quietly, and its direction is kept for the next
+    fallback, which announces it. No new call is made while it is still
+    running. Only this generator, on the pipeline thread, prints the live
+    direction or records it as the last instruction.
+    """
+    fallback.cycle()
+    if fallback.call_pending():
+        print("\n⏰ The last GPT-4o call is still running")
+        fallback.llm_missed()
+        yield from fallback_direction(director, fallback, features)
+        return
+    
+    received = queue.Queue()
+    lock = threading.Lock()
+    state = {"late": False}
+    
+    def call():
+        kept = []
+        try:
+            for line in lines:
+                with lock:
+                    kept.append(line)
+                    received.put(line)
+        except Exception as e:
+            print(f"❌ Error analyzing scene: {e}")
+        finally:
+            with lock:
+                received.put(None)
+                late = state["late"]
+        if not late or not kept or director.stream_refused:
+            return
+        text = "\n".join(kept)
+        if contains_refusal(text):
+            return
+        # Render it now so it plays instantly from the TTS cache when it is used
+        fallback.keep_late(text, director.start_speech(text) if director.stream_audio else None)
+    
+    thread = threading.Thread(target=call, name="llm-call", daemon=True)
+    thread.start()
+    try:
+        timeout = None if deadline is None else max(0.0, deadline - time.time())
+        line = received.get(timeout=timeout)
+    except queue.Empty:
+        with lock:
+            state["late"] = received.empty()
+        if state["late"]:
+            fallback.llm_missed()
+            print(f"\n⏰ GPT-4o missed its {fallback.llm_budget:.1f}s budget")
+            substitutes = fallback_direction(director, fallback, features)
+            if substitutes:
+                fallback.pending_call = thread
+                yield from substitutes
+                return
+            print("   Nothing to fall back on; waiting for the live direction")
+            with lock:
+                state["late"] = False
+        line = received.get()
+    
+    if line is None and director.call_failed:
+        # A call that failed outright (timeouts, open circuit) is as good as late
+        fallback.llm_missed()
+        yield from fallback_direction(director, fallback, features)
+        return
+    
+    def arrived(line):
+        while line is not None:
+            yield line
+            line = received.get()
+    
+    yield from announce_direction(director, arrived(line), cache, hashes)
+
+
+def fallback_direction(director, fallback, features=None):
+    """Items for a stand-in direction: a late live one if ready, else one from the bank"""
+    text = fallback.take_late()
+    if text is not None:
+        fallback.used()
+        print(f"🛟 {director_label(director)} ({time.strftime('%H:%M:%S')}, late direction):")
+        for line in text.splitlines():
+            print(f"   {line}")
+        director.last_instruction = text
+        return [{"kind": "speech", "text": text}]
+    
+    entry = fallback.choose(features)
+    if entry is None:
+        return []
+    fallback.used()
+    print(f"🛟 Fallback direction {entry.id} for {director_label(director)} ({time.strftime('%H:%M:%S')}):")
+    for line in entry.text.splitlines():
+        print(f"   {line}")
+    if entry.samples is not None:
+        return [{"kind": "fallback", "entry": entry}]
+    return [{"kind": "speech", "text": entry.text}]
+
+
+def reuse_direction(director, instruction):
+    """Yield a cached direction the same way a fresh one would be spoken"""
+    if instruction == director.last_instruction:
+        print("\n♻️  Scene unchanged; not repeating the last direction")
+        return
+    director.last_instruction = instruction
+    print(f"\n♻️  {director_label(director)} ({time.strftime('%H:%M:%S')}, scene unchanged):")
+    if not director.stream_text:
+        print(f"   {instruction}")
+        yield {"kind": "speech", "text": instruction}
+        return
+    splitter = SentenceSplitter()
+    for sentence in splitter.feed(instruction) + splitter.flush():
+        print(f"   {sentence}")
+        yield {"kind": "speech", "text": sentence}
+
+
+def start_control_server(control, port):
+    """The operator control API on a local port; None if it is off or the port can't be bound"""
+    if not port:
+        return None
+    try:
+        return ControlServer(control, cue_bank, port).start()
+    except OSError as e:
+        print(f"⚠️  Control API not started on port {port} ({e}); hotkeys still work")
+        return None
+
+
+def start_archive(archive, directors, **settings):
+    """Start recording the show: the session settings, the prompt, stage timings and each director's directions"""
+    with startup.phase("archive"):
+        archive.start()
+    archive.event("session", **settings)
+    archive.event("prompt", text=directors[0].scene_prompt())
+    for director in directors:
+        director.archive = archive
+        archive.feed_number(director.feed)
+    metrics.add_listener(archive.span)
+    print(f"🗄️  Archiving the show to {archive.directory}/")
+
+
+def stop_archive(archive):
+    """Stop recording and write out what is still queued"""
+    metrics.remove_listener(archive.span)
+    archive.close()
+    print(f"🗄️  Archive: {archive.summary()}")
+
+
+def open_camera(camera_index=None, fast_start=False):
+    """Open the selected camera (or the first one that works) and let it settle
+    
+    With `fast_start`, the camera counts as ready as soon as its frames are
+    stable instead of after a fixed two-second wait.
+    """
     # Use the selected camera index
     if camera_index is None:
         camera_indices = [0, 1, 2]
     else:
         camera_indices = [camera_index]
     video = None
-    for idx in camera_indices:
-        video = cv2.VideoCapture(idx)
-        if video.isOpened():
-            print(f"📷 Camera opened successfully (index: {idx})")
-            break
-    if not video or not video.isOpened():
-        print("❌ Error: Could not open camera")
-        return
+    with startup.phase("camera_open"):
+        for idx in camera_indices:
+            video = cv2.VideoCapture(idx)
+            if video.isOpened():
+                print(f"📷 Camera opened successfully (index: {idx})")
+                break
+        if not video or not video.isOpened():
+            return None
+        
+        # Set camera properties
+        video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
     
-    # Set camera properties
-    video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
-    video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+    with startup.phase("camera_ready"):
+        if fast_start:
+            if wait_for_stable_frames(video):
+                print("📷 Camera frames are stable")
+            else:
+                print("⚠️  Camera frames still changing after 2s, starting anyway")
+        else:
+            video.read()
+            
+            # Wait 2 seconds for camera to initialize
+            print("⏳ Waiting 2 seconds for camera to initialize...")
+            time.sleep(2)
+    return video
+
 
-    video.read()
+def run_ai_director(fps=0.3, frames_per_analysis=3, camera_index=None, gate=None, oversample=3,
+                    prefetch=True, max_frame_age=30.0, silence_gap=None, overlay=False,
+                    metrics_log=None, metrics_port=None, source=None, preview=True,
+                    duration=None, director_choice=None, director=None, fast_start=False,
+                    control=None, control_port=None, ambience=None, fallback=None, archive=None,
+                    low_cpu=False, preview_fps=None):
+    """Run the AI Director with continuous camera analysis and voice feedback
+    
+    Pass a SceneGate as `gate` to skip analysis when nobody is in frame or
+    nothing has moved since the last direction. Frames are sampled
+    `oversample` times faster than `fps` into a ring buffer and the sharpest
+    `frames_per_analysis` of them are sent.
+    
+    With `prefetch`, the next direction is analyzed and synthesized while the
+    current one is still playing, and played as soon as the speaker is free
+    unless its frames are older than `max_frame_age` seconds by then.
+    
+    Setting `silence_gap` (seconds) replaces the fixed `fps` and
+    `frames_per_analysis` with a CadenceScheduler that times captures so
+    each new direction starts about that long after the previous one ends.
+    
+    Stage timings can be drawn on the preview (`overlay`), appended to a
+    JSONL file (`metrics_log`) and served as Prometheus text (`metrics_port`).
+    
+    For offline runs, `source` replaces the camera with any object that has
+    the VideoCapture grab/retrieve/isOpened/release API (see replay.py and
+    capture.py), `preview`
+    turns the window off and `duration` stops after that many seconds.
+    
+    The operator switches or queues directors, pauses analysis and triggers
+    cues with hotkeys in the preview window and, given `control_port`, a
+    local HTTP/WebSocket API (see control.py); capture never waits on
+    either. `director_choice` is the director to start with (default 4), or
+    pass a ControlState as `control`.
+    
+    `fast_start` replaces the fixed camera warm-up with a check for stable
+    frames (see startup.py).
     
-    # Wait 2 seconds for camera to initialize
-    print("⏳ Waiting 2 seconds for camera to initialize...")
-    time.sleep(2)
+    `ambience` is an audio file looped under the session; the audio engine
+    ducks it while speech or cues play (see audio_engine.py).
     
-    frame_interval = 1.0 / fps
+    `fallback` is a FallbackBank whose latency budgets each live cycle is
+    held to; it defaults to the bank in fallback_bank/, and False turns the
+    budgets off.
+    
+    `archive` is a SessionArchive that sampled frames, the images sent,
+    directions, timings and speech are recorded to (see archive.py).
+    
+    With `low_cpu`, every frame is grabbed but only the frames that are
+    sampled, archived or previewed are decoded (see capture.py).
+    `preview_fps` caps how often the preview is drawn (default: every frame,
+    or 10 fps with `low_cpu`); `preview=False` runs headless. CPU use of
+    the capture loop and the whole process is printed at the end.
+    """
+    # Initialize the director
+    director = director or AIDirector()
+    control = control or ControlState(director_choice or LIVE_DIRECTOR)
+    fallback = FallbackBank() if fallback is None else fallback or None
+    if source is not None:
+        video = source
+    else:
+        video = open_camera(camera_index, fast_start)
+    if not video or not video.isOpened():
+        print("❌ Error: Could not open camera")
+        return director
+    
+    scheduler = CadenceScheduler(silence_gap) if silence_gap is not None else None
+    frame_interval = 1.0 / (fps * oversample)
     last_capture_time = 0
-    frame_buffer = []
+    samples_since_trigger = 0
+    grabber = FrameGrabber(video, decode_all=not low_cpu)
+    if preview_fps is None and low_cpu:
+        preview_fps = DEFAULT_PREVIEW_FPS
+    preview_interval = 1.0 / preview_fps if preview_fps else 0.0
+    last_preview_time = 0
+    
+    # Pipeline: capture (this thread) -> encode -> director/LLM -> TTS -> playback
+    stop_event = threading.Event()
+    max_frames = scheduler.max_batch if scheduler else frames_per_analysis
+    ring = FrameRing(max_frames * oversample)  # Raw frames, overwritten in place
+    trigger_queue = DropOldestQueue(maxsize=1)  # Only the latest "analyze now" request matters
+    batch_queue = DropOldestQueue(maxsize=1)  # Only the freshest batch is worth analyzing
+    speech_queue = queue.Queue(maxsize=1)
+    # With prefetch, several synthesized sentences can wait ready for the speaker
+    playback_queue = queue.Queue(maxsize=4 if prefetch else 1)
+    # Without prefetch the director waits for the speaker; with it, one more
+    # direction is prepared while the current one plays
+    in_flight = threading.Semaphore(2 if prefetch else 1)
+    workers = build_director_pipeline(director, ring, trigger_queue, batch_queue, speech_queue,
+                                      playback_queue, in_flight, stop_event, gate,
+                                      max_frame_age if prefetch else None, scheduler, control,
+                                      fallback)
+    with startup.phase("cue_bank"):
+        cue_bank.start()
+    if fallback is not None:
+        with startup.phase("fallback_bank"):
+            fallback.start()
+    if ambience:
+        try:
+            audio.play_ambience(ambience)
+        except Exception as e:
+            print(f"⚠️  Could not play ambience {ambience}: {e}")
+    if archive is not None:
+        start_archive(archive, [director], fps=fps, frames_per_analysis=frames_per_analysis,
+                      silence_gap=silence_gap)
+    # TLS handshakes happen now, not during the first direction
+    threading.Thread(target=warm_connections, name="warm-connections", daemon=True).start()
+    with startup.phase("pipeline"):
+        start_workers(workers)
+    
+    # Instrumentation outputs
+    if metrics_log:
+        metrics.open_jsonl(metrics_log)
+        print(f"📈 Writing stage timings to {metrics_log}")
+    if metrics_port:
+        metrics.serve_prometheus(metrics_port)
+    control_server = start_control_server(control, control_port)
+    metrics.add_gauge("instructions", lambda: director.instruction_count)
+    metrics.add_gauge("tts_cache_hits", lambda: director.tts_cache.memory_hits + director.tts_cache.disk_hits)
+    metrics.add_gauge("tts_cache_misses", lambda: director.tts_cache.misses)
+    metrics.add_gauge("image_bytes_uploaded", lambda: director.encoder.total_bytes)
+    metrics.add_gauge("stale_discards", lambda: director.stale_discards)
+    if fallback is not None:
+        metrics.add_gauge("fallbacks", lambda: fallback.fallbacks)
+        metrics.add_gauge("llm_budget_misses", lambda: fallback.llm_misses)
+        metrics.add_gauge("tts_budget_misses", lambda: fallback.tts_misses)
+    if director.response_cache is not None:
+        metrics.add_gauge("response_cache_hits", lambda: director.response_cache.hits)
+        metrics.add_gauge("response_cache_misses", lambda: director.response_cache.misses)
+    if gate is not None:
+        metrics.add_gauge("gate_skipped_no_person", lambda: gate.skipped_no_person)
+        metrics.add_gauge("gate_skipped_no_motion", lambda: gate.skipped_no_motion)
+    metrics.add_gauge("process_cpu_seconds", time.process_time)
     
     print(f"🎬 AI Director is ready!")
-    print(f"📊 Analyzing every {frames_per_analysis} frames at {fps} fps")
+    print("🚀 Cold start:")
+    print(startup.report())
+    for name, seconds, _ in startup.phases:
+        metrics.observe(f"startup_{name}", seconds)
+    if scheduler:
+        print(f"📊 Adaptive cadence: aiming for {silence_gap:.1f}s of silence between directions")
+    else:
+        print(f"📊 Analyzing the sharpest {frames_per_analysis} of every {ring.capacity} frames "
+              f"sampled at {fps * oversample:.2f} fps")
+    print(f"🎥 Capture: {capture_mode(low_cpu, preview, preview_fps)}")
+    print(f"🎛️  {control.status()}")
+    if preview:
+        print(f"⌨️  {HOTKEY_HELP}")
     print("Press 'q' to stop")
     print("-" * 40)
     
+    started_at = time.time()
+    cpu = CPUMeter()
     try:
         while True:
-            current_time = time.time()
+            if duration is not None and time.time() - started_at >= duration:
+                break
             
-            success, frame = video.read()
-            if not success:
+            # Keeps the camera's buffer fresh; failures back off instead of spinning
+            if not grabber.grab():
                 continue
+            # grab() waits for the camera, so the frame's time is taken after it
+            current_time = time.time()
+            
+            # Decode only when the frame is sampled, archived or previewed
+            if scheduler:
+                frame_interval = scheduler.capture_interval() / oversample
+            sample = current_time - last_capture_time >= frame_interval
+            keep = archive is not None and archive.frame_due(current_time)
+            show = preview and current_time - last_preview_time >= preview_interval
+            frame = grabber.retrieve() if sample or keep or show else None
+            if frame is None:
+                sample = keep = show = False
             
-            # Capture frame at specified FPS
-            if current_time - last_capture_time >= frame_interval:
-                _, buffer = cv2.imencode(".jpg", frame)
-                frame_buffer.append(base64.b64encode(buffer).decode("utf-8"))
+            # Sample frames into the ring and ask for an analysis when one is due
+            if sample:
+                ring.push(frame, current_time)
                 last_capture_time = current_time
-                
-                # When we have enough frames, analyze and direct
-                if len(frame_buffer) >= frames_per_analysis:
-                    director.instruction_count += 1
-                    
-                    # Ask user to select director option
-                    director_choice = select_director_option()
-                    
-                    if director_choice == 4:
-                        # Live model - existing behavior
-                        instruction = director.analyze_scene(frame_buffer)
-                        
-                        if instruction and instruction != director.last_instruction:
-                            if director.is_refusal_response(instruction):
-                                print(f"\n🤐 Director refused to give instruction (skipping): {instruction[:50]}...")
-                            else:
-                                print(f"\n🎭 Director 4 ({time.strftime('%H:%M:%S')}): {instruction}")
-                                director.speak_instruction(instruction)
-                            director.last_instruction = instruction
-                    
-                    elif director_choice in [1, 2, 3]:
-                        # Pre-recorded director audio
-                        while not play_director_audio(director_choice):
-                            # If audio file doesn't exist, ask for another option
-                            director_choice = select_director_option()
-                            if director_choice == 4:
-                                # User switched to live model
-                                instruction = director.analyze_scene(frame_buffer)
-                                if instruction and instruction != director.last_instruction:
-                                    if director.is_refusal_response(instruction):
-                                        print(f"\n🤐 Director refused to give instruction (skipping): {instruction[:50]}...")
-                                    else:
-                                        print(f"\n🎭 Director 4 ({time.strftime('%H:%M:%S')}): {instruction}")
-                                        director.speak_instruction(instruction)
-                                    director.last_instruction = instruction
-                                break
-                    
-                    # Clear buffer
-                    frame_buffer = []
+                samples_since_trigger += 1
+            if keep:
+                archive.frame(frame, current_time)
+            
+            if control.paused:
+                # Keep capturing (and previewing) but don't start any analysis
+                due = False
+                samples_since_trigger = 0
+            elif scheduler:
+                due = scheduler.should_trigger(current_time)
+                batch_frames = scheduler.batch_size()
+            else:
+                # Fixed cadence: once a full window is in
+                due = samples_since_trigger >= ring.capacity
+                batch_frames = frames_per_analysis
+            if due:
+                trigger_queue.put_latest({"triggered_at": current_time, "frames": batch_frames,
+                                          "candidates": batch_frames * oversample})
+                samples_since_trigger = 0
+            
+            if not show:
+                continue
+            last_preview_time = current_time
             
             # Show preview with director overlay
             cv2.putText(frame, "AI Director Active", (10, 30), 
                        cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
             cv2.putText(frame, f"Instructions given: {director.instruction_count}", (10, 60), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 1)
+            cv2.putText(frame, control.status(), (10, frame.shape[0] - 15),
+                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
+            if overlay:
+                metrics.draw_overlay(frame, OVERLAY_SPANS)
             cv2.imshow('AI Director View (Press Q to stop)', frame)
             
-            # Check for quit
-            if cv2.waitKey(1) & 0xFF == ord('q'):
+            # Check for quit; every other key is an operator control
+            key = cv2.waitKey(1) & 0xFF
+            if key == ord('q'):
                 break
+            message = handle_key(key, control, cue_bank)
+            if message:
+                print(message)
                 
     except KeyboardInterrupt:
         print("\n⏹️  Director session interrupted")
     finally:
+        stop_workers(workers, stop_event)
+        if control_server is not None:
+            control_server.stop()
+        cue_bank.stop()
+        audio.stop_ambience()
         video.release()
-        cv2.destroyAllWindows()
+        if preview:
+            cv2.destroyAllWindows()
         print(f"\n✅ Director gave {director.instruction_count} instructions")
+        if director.time_to_first_audio:
+            average = sum(director.time_to_first_audio) / len(director.time_to_first_audio)
+            print(f"⏱️  Average time to first audio: {average * 1000:.0f} ms "
+                  f"over {len(director.time_to_first_audio)} utterance(s)")
+        print(f"💾 TTS cache: {director.tts_cache.summary()}")
+        print(f"📦 Frame uploads: {director.encoder.summary()}")
+        if director.response_cache is not None:
+            print(f"♻️  Response cache: {director.response_cache.summary()}")
+        print(f"🎵 Cue bank: {cue_bank.summary()}")
+        print(f"🔊 Audio: {audio.summary()}")
+        print(f"🎥 Capture ({capture_mode(low_cpu, preview, preview_fps)}): {grabber.summary()}; "
+              f"whole process {cpu.percent():.1f}%")
+        stop_transports()
+        if fallback is not None:
+            print(f"🛟 Fallbacks: {fallback.summary()}")
+        if gate is not None:
+            print(f"🚦 Scene gate: {gate.summary()}")
+        if scheduler:
+            print(f"📊 Cadence: {scheduler.summary()}")
+        if director.stale_discards:
+            print(f"🗑️  Discarded {director.stale_discards} stale prefetched direction(s)")
+        if archive is not None:
+            stop_archive(archive)
+        print("📈 Stage timings:")
+        print(metrics.summary())
+        metrics.close()
+    return director
 
 
 def main():
+    parser = argparse.ArgumentParser(description="AI Theatre Director")
+    parser.add_argument("--overlay", action="store_true", help="Draw stage timings on the preview")
+    parser.add_argument("--metrics-log", help="Append stage timings to this JSONL file")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--control-port", type=int,
+                        help="Serve the HTTP/WebSocket control API on this local port, e.g. 8765")
+    parser.add_argument("--fast-start", action="store_true",
+                        help="Reuse recent key checks, probe cameras in parallel and skip the fixed camera warm-up")
+    parser.add_argument("--llm-budget", type=float, default=6.0,
+                        help="Seconds GPT-4o has to start a direction before a fallback plays (default: 6)")
+    parser.add_argument("--tts-budget", type=float, default=2.5,
+                        help="Seconds ElevenLabs has to start a line before a fallback plays (default: 2.5)")
+    parser.add_argument("--fallback-dir", default="fallback_bank",
+                        help="Directory with the fallback bank's manifest.json and audio")
+    parser.add_argument("--connect-timeout", type=float, default=HTTP_SETTINGS["connect_timeout"],
+                        help="Seconds to open a connection to either API (default: 3)")
+    parser.add_argument("--read-timeout", type=float, default=HTTP_SETTINGS["read_timeout"],
+                        help="Longest wait for the next bytes of a response (default: 20)")
+    parser.add_argument("--http-retries", type=int, default=HTTP_SETTINGS["retries"],
+                        help="Retries for connection errors, timeouts, 429 and 5xx (default: 2)")
+    parser.add_argument("--hedge", action="store_true",
+                        help="Send a duplicate request when one is slower than the recent p95")
+    parser.add_argument("--ambience", help="Audio file to loop under the session, ducked under speech and cues")
+    parser.add_argument("--archive", help="Record the show to this archive directory (see archive.py)")
+    parser.add_argument("--low-cpu", action="store_true",
+                        help="Decode only the frames that are analyzed, archived or previewed")
+    parser.add_argument("--preview-fps", type=float,
+                        help="Cap the preview rate (default: every frame, or 10 fps with --low-cpu)")
+    parser.add_argument("--headless", action="store_true",
+                        help="No preview window (stop with Ctrl-C); the control API still works")
+    args = parser.parse_args()
+    
     print("🎬 AI Film Director")
     print("=" * 40)
     print("Your personal AI director will watch through the camera")
     print("and provide real-time voice feedback to improve your shots!")
     print("=" * 40)
     
+    HTTP_SETTINGS.update(connect_timeout=args.connect_timeout, read_timeout=args.read_timeout,
+                         retries=args.http_retries, hedge=args.hedge)
+    check_api_keys()
+    if args.fast_start:
+        # Clients and the mixer warm up while keys are checked and cameras are probed
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+    
     # Validate API keys before proceeding
-    if not validate_api_keys():
+    with startup.phase("key_validation"):
+        valid = validate_api_keys(KeyValidationCache() if args.fast_start else None, fast=args.fast_start)
+    if not valid:
         sys.exit(1)
     
     # Camera selection
-    camera_index = select_camera()
+    camera_index = select_camera(probe_timeout=3.0 if args.fast_start else None)
+    
+    # Configure analysis settings; capture rate and batch size adapt to the target gap
+    silence_gap = input("\nSilence between directions in seconds (default: 2.0): ").strip()
+    silence_gap = float(silence_gap) if silence_gap else 2.0
     
-    # Configure analysis settings
-    fps = input("\nAnalysis frequency in FPS (default: 0.3): ").strip()
-    fps = float(fps) if fps else 0.3
+    gating = input("Skip analysis when the stage is empty or still? (Y/n): ").strip().lower()
+    gate = None if gating in ("n", "no") else SceneGate()
     
-    frames = input("Frames per analysis (default: 2): ").strip()
-    frames = int(frames) if frames else 2
+    director_choice = select_director_option()
     
     print("\n🎬 Starting AI Director session...")
-    run_ai_director(fps, frames, camera_index)
+    run_ai_director(camera_index=camera_index, gate=gate, silence_gap=silence_gap,
+                    overlay=args.overlay, metrics_log=args.metrics_log,
+                    metrics_port=args.metrics_port, fast_start=args.fast_start,
+                    director_choice=director_choice, control_port=args.control_port,
+                    ambience=args.ambience,
+                    fallback=FallbackBank(args.fallback_dir, args.llm_budget, args.tts_budget),
+                    archive=SessionArchive(args.archive) if args.archive else None,
+                    low_cpu=args.low_cpu, preview_fps=args.preview_fps, preview=not args.headless)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,506 @@
+#!/usr/bin/env python3
+"""
+Append-only archive of a show
+
+A `SessionArchive` records sampled camera frames, the images sent to
+GPT-4o, every direction line, cue and fallback, the prompt, stage timings
+and the synthesized speech. The live loop only puts records on a bounded
+queue (and drops them, counted, if the disk falls behind); JPEG encoding
+and all writes happen on a background writer thread.
+
+An archive is a directory:
+
+    index.bin             fixed-size entries, one per record, in write order
+    segment-00001.seg     payloads back to back, a new segment every `segment_bytes`
+
+An index entry (INDEX_ENTRY) is the record kind, feed number, direction
+number, wall-clock timestamp, segment, offset, length and a parameter (the
+sample rate of PCM audio). Payloads are JPEGs, UTF-8 JSON events, raw
+16-bit mono PCM, MP3s or feed names. Reopening an archive appends new
+segments after the existing ones and keeps its feed numbers, so a
+restarted show keeps a single record.
+
+`ArchiveReader` memory-maps the index and the segments, so a performance
+can be scrubbed or exported without loading it into RAM:
+
+    python archive.py info shows/premiere
+    python archive.py frame shows/premiere --at 754 --output still.jpg
+    python archive.py export shows/premiere exported/ --start 600 --end 900 --video
+"""
+
+import argparse
+import base64
+import json
+import mmap
+import os
+import queue
+import struct
+import threading
+import time
+import wave
+
+import cv2
+import numpy as np
+
+INDEX_FILE = "index.bin"
+SEGMENT_MAGIC = b"AIDARCH1"
+# kind, feed, reserved, direction, timestamp, segment, length, offset, param, reserved
+INDEX_ENTRY = struct.Struct("<BBHIdIIQII")
+INDEX_DTYPE = np.dtype([("kind", "<u1"), ("feed", "<u1"), ("reserved", "<u2"), ("direction", "<u4"),
+                        ("timestamp", "<f8"), ("segment", "<u4"), ("length", "<u4"),
+                        ("offset", "<u8"), ("param", "<u4"), ("reserved2", "<u4")])
+
+# Record kinds
+FRAME = 1  # Sampled camera frame (JPEG)
+SENT = 2  # Image sent to GPT-4o (JPEG)
+EVENT = 3  # JSON: prompt, analysis, direction line, cue, fallback, span, ...
+AUDIO = 4  # Speech as played: raw PCM (param = sample rate) or MP3 (param = 0)
+FEED = 5  # UTF-8 name of the feed with this record's feed number
+KIND_NAMES = {FRAME: "frame", SENT: "sent", EVENT: "event", AUDIO: "audio", FEED: "feed"}
+
+_STOP = object()
+
+
+def _segment_name(number):
+    return f"segment-{number:05d}.seg"
+
+
+class SessionArchive:
+    """Background writer of an append-only archive directory"""
+
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, frame_interval=1.0,
+                 jpeg_quality=80, max_pending=512, flush_interval=1.0):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.frame_interval = frame_interval  # Seconds between archived camera frames, per feed
+        self.jpeg_quality = jpeg_quality
+        self.flush_interval = flush_interval
+        self.pending = queue.Queue(maxsize=max_pending)
+        self.feeds = {}  # Feed name -> number
+        self.last_frame = {}  # Feed number -> time of the last archived frame
+        self.lock = threading.Lock()
+        self.thread = None
+        self.index = None
+        self.segment = None
+        self.segment_number = 0
+        self.direction_base = 0  # Directions of earlier runs in the same archive come first
+
+        self.records = 0
+        self.bytes_written = 0
+        self.dropped = 0
+
+    def start(self):
+        """Open the archive (appending to an existing one) and start the writer thread"""
+        if self.thread is not None:
+            return self
+        os.makedirs(self.directory, exist_ok=True)
+        index_path = os.path.join(self.directory, INDEX_FILE)
+        if os.path.exists(index_path):
+            # Drop a half-written entry left by a crash
+            size = os.path.getsize(index_path)
+            with open(index_path, "r+b") as f:
+                f.truncate(size - size % INDEX_ENTRY.size)
+            with ArchiveReader(self.directory) as previous:
+                if len(previous):
+                    self.direction_base = int(previous.index["direction"].max())
+                    # Feeds keep their numbers; new ones are numbered after them
+                    self.feeds = {name: number for number, name in previous.feeds.items()}
+        existing = [name for name in os.listdir(self.directory) if name.endswith(".seg")]
+        self.segment_number = max((int(name[8:13]) for name in existing), default=0)
+        self.index = open(index_path, "ab")
+        self._next_segment()
+        self.thread = threading.Thread(target=self._run, name="archive-writer", daemon=True)
+        self.thread.start()
+        return self
+
+    def close(self):
+        """Write everything still queued and close the files"""
+        if self.thread is None:
+            return
+        self.pending.put(_STOP)
+        self.thread.join()
+        self.thread = None
+        for f in (self.segment, self.index):
+            f.flush()
+            os.fsync(f.fileno())
+            f.close()
+
+    def feed_number(self, feed):
+        """Small number for a feed name (None is the only camera of a single-camera session)"""
+        with self.lock:
+            if feed not in self.feeds:
+                # 0 is kept for None, even in a multi-camera show reopened later
+                self.feeds[feed] = 0 if feed is None else max(self.feeds.values(), default=0) + 1
+                if feed is not None:
+                    self._submit((FEED, self.feeds[feed], 0, time.time(), feed, 0))
+            return self.feeds[feed]
+
+    # Records; none of these block
+
+    def _submit(self, record):
+        if self.thread is None:
+            return False  # Not started, or already closed
+        try:
+            self.pending.put_nowait(record)
+            return True
+        except queue.Full:
+            self.dropped += 1
+            return False
+
+    def frame_due(self, timestamp, feed=None):
+        """Whether `frame()` would keep a frame from this feed now, so the caller can skip decoding one"""
+        return timestamp - self.last_frame.get(self.feed_number(feed), 0.0) >= self.frame_interval
+
+    def frame(self, frame, timestamp=None, feed=None):
+        """Archive a camera frame if `frame_interval` has passed for this feed"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self.frame_due(timestamp, feed):
+            return
+        number = self.feed_number(feed)
+        self.last_frame[number] = timestamp
+        # The caller goes on drawing on its frame; encoding happens on the writer thread
+        self._submit((FRAME, number, 0, timestamp, frame.copy(), 0))
+
+    def sent_frames(self, frames, direction, feed=None, timestamp=None):
+        """Archive the base64 JPEGs of one GPT-4o request"""
+        timestamp = time.time() if timestamp is None else timestamp
+        number = self.feed_number(feed)
+        for frame in frames:
+            self._submit((SENT, number, direction, timestamp, frame, 0))
+
+    def event(self, name, direction=0, feed=None, timestamp=None, **fields):
+        timestamp = time.time() if timestamp is None else timestamp
+        self._submit((EVENT, self.feed_number(feed), direction, timestamp,
+                      dict(fields, event=name), 0))
+
+    def direction_item(self, item, direction, feed=None):
+        """Archive one item of a direction: a line of speech, a cue or a fallback"""
+        fields = {"kind": item["kind"]}
+        if "text" in item:
+            fields["text"] = item["text"]
+        if "director" in item:
+            fields["director"] = item["director"]
+        if "entry" in item:
+            fields["entry"] = item["entry"].id
+        self.event("direction", direction, feed, **fields)
+
+    def span(self, record):
+        """Metrics listener: archive stage timings"""
+        self._submit((EVENT, 0, 0, record["ts"], dict(record, event="span"), 0))
+
+    def audio(self, data, rate, direction=0, feed=None, timestamp=None):
+        """Archive raw 16-bit mono PCM as it was played"""
+        timestamp = time.time() if timestamp is None else timestamp
+        self._submit((AUDIO, self.feed_number(feed), direction, timestamp, data, rate))
+
+    def audio_file(self, path, direction=0, feed=None, timestamp=None, remove=False):
+        """Archive an MP3 file; with `remove`, it is deleted once archived"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if not self._submit((AUDIO, self.feed_number(feed), direction, timestamp, (path, remove), 0)) and remove:
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+    # Writer thread
+
+    def _next_segment(self):
+        if self.segment is not None:
+            self.segment.flush()
+            os.fsync(self.segment.fileno())
+            self.segment.close()
+        self.segment_number += 1
+        self.segment = open(os.path.join(self.directory, _segment_name(self.segment_number)), "wb")
+        self.segment.write(SEGMENT_MAGIC)
+
+    def _payload(self, kind, value):
+        if kind == FRAME:
+            ok, buffer = cv2.imencode(".jpg", value, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            return buffer.tobytes() if ok else None
+        if kind == SENT:
+            return base64.b64decode(value)
+        if kind == EVENT:
+            return json.dumps(value, ensure_ascii=False).encode("utf-8")
+        if kind == FEED:
+            return value.encode("utf-8")
+        if isinstance(value, tuple):
+            # An MP3 file, which may have been left to us to delete
+            path, remove = value
+            try:
+                with open(path, "rb") as f:
+                    data = f.read()
+                if remove:
+                    os.unlink(path)
+            except OSError:
+                return None
+            return data
+        return bytes(value)
+
+    def _write(self, record):
+        kind, feed, direction, timestamp, value, param = record
+        payload = self._payload(kind, value)
+        if not payload:
+            return
+        if self.segment.tell() + len(payload) > self.segment_bytes and self.segment.tell() > len(SEGMENT_MAGIC):
+            self._next_segment()
+        if direction:
+            direction += self.direction_base
+        offset = self.segment.tell()
+        self.segment.write(payload)
+        # The index entry goes after its payload, so an entry never points at missing data
+        self.index.write(INDEX_ENTRY.pack(kind, feed, 0, direction, timestamp, self.segment_number,
+                                          len(payload), offset, param, 0))
+        self.records += 1
+        self.bytes_written += len(payload)
+
+    def _run(self):
+        last_flush = time.time()
+        while True:
+            try:
+                record = self.pending.get(timeout=self.flush_interval)
+            except queue.Empty:
+                record = None
+            if record is _STOP:
+                return
+            if record is not None:
+                try:
+                    self._write(record)
+                except Exception as e:
+                    print(f"⚠️  Could not archive a record: {e}")
+            if time.time() - last_flush >= self.flush_interval or self.pending.empty():
+                self.segment.flush()
+                self.index.flush()
+                last_flush = time.time()
+
+    def summary(self):
+        text = (f"{self.records} record(s), {self.bytes_written / (1024 * 1024):.1f} MB "
+                f"in {self.segment_number} segment(s) at {self.directory}/")
+        if self.dropped:
+            text += f", {self.dropped} dropped while the disk was behind"
+        return text
+
+
+class ArchiveReader:
+    """Memory-mapped view of an archive; payloads are read straight from the page cache"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.index_file = open(os.path.join(directory, INDEX_FILE), "rb")
+        size = os.fstat(self.index_file.fileno()).st_size
+        count = size // INDEX_ENTRY.size
+        self.index_map = None
+        if count:
+            self.index_map = mmap.mmap(self.index_file.fileno(), 0, access=mmap.ACCESS_READ)
+            self.index = np.frombuffer(self.index_map, dtype=INDEX_DTYPE, count=count)
+        else:
+            self.index = np.zeros(0, dtype=INDEX_DTYPE)
+        self.segments = {}
+        self.files = []
+        self.started_at = float(self.index["timestamp"].min()) if len(self.index) else 0.0
+        self.duration = float(self.index["timestamp"].max()) - self.started_at if len(self.index) else 0.0
+        self.feeds = {0: None}  # Feed number -> name; 0 is the camera of a single-camera show
+        for i in self.select(FEED):
+            self.feeds[int(self.index["feed"][i])] = bytes(self.payload(i)).decode("utf-8")
+
+    def __len__(self):
+        return len(self.index)
+
+    def close(self):
+        # A map can only be closed once no views into it are left; otherwise it goes with them
+        self.index = None
+        for segment in list(self.segments.values()) + [self.index_map]:
+            try:
+                if segment is not None:
+                    segment.close()
+            except BufferError:
+                pass
+        for f in self.files + [self.index_file]:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def feed_number(self, name):
+        for number, feed in self.feeds.items():
+            if feed == name:
+                return number
+        raise KeyError(f"no feed named {name!r} in {self.directory}")
+
+    def select(self, kind=None, start=None, end=None, feed=None, direction=None):
+        """Index positions of matching records, in time order; `start`/`end` are seconds into the show"""
+        mask = np.ones(len(self.index), dtype=bool)
+        if kind is not None:
+            mask &= self.index["kind"] == kind
+        if feed is not None:
+            mask &= self.index["feed"] == feed
+        if direction is not None:
+            mask &= self.index["direction"] == direction
+        if start is not None:
+            mask &= self.index["timestamp"] >= self.started_at + start
+        if end is not None:
+            mask &= self.index["timestamp"] <= self.started_at + end
+        positions = np.flatnonzero(mask)
+        return positions[np.argsort(self.index["timestamp"][positions], kind="stable")]
+
+    def _segment(self, number):
+        if number not in self.segments:
+            f = open(os.path.join(self.directory, _segment_name(number)), "rb")
+            self.files.append(f)
+            self.segments[number] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        return self.segments[number]
+
+    def payload(self, position):
+        """The bytes of one record, as a memoryview into the mapped segment"""
+        entry = self.index[position]
+        offset, length = int(entry["offset"]), int(entry["length"])
+        return memoryview(self._segment(int(entry["segment"])))[offset:offset + length]
+
+    def event(self, position):
+        return json.loads(bytes(self.payload(position)).decode("utf-8"))
+
+    def image(self, position):
+        """Decode a FRAME or SENT record"""
+        return cv2.imdecode(np.frombuffer(self.payload(position), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def frame_feeds(self):
+        """Numbers of the feeds that have camera frames"""
+        return sorted(int(number) for number in np.unique(self.index["feed"][self.index["kind"] == FRAME]))
+
+    def frame_at(self, seconds, feed=0):
+        """(position, image) of the last camera frame at or before `seconds` into the show"""
+        positions = self.select(FRAME, feed=feed)
+        if not len(positions):
+            return None, None
+        timestamps = self.index["timestamp"][positions]
+        i = max(0, np.searchsorted(timestamps, self.started_at + seconds, side="right") - 1)
+        return positions[i], self.image(positions[i])
+
+    def events(self, start=None, end=None, feed=None):
+        """Yield (seconds into the show, event dict) in time order"""
+        for position in self.select(EVENT, start, end, feed):
+            yield float(self.index["timestamp"][position]) - self.started_at, self.event(position)
+
+    def summary(self):
+        counts = {name: int(np.count_nonzero(self.index["kind"] == kind)) for kind, name in KIND_NAMES.items()}
+        size = int(self.index["length"].sum()) if len(self.index) else 0
+        numbered = self.index[self.index["direction"] > 0]
+        directions = len(np.unique(numbered["feed"].astype(np.uint64) << 32 | numbered["direction"]))
+        feeds = ", ".join(name for name in self.feeds.values() if name) or "1 camera"
+        return (f"{self.duration / 60:.1f} min, {directions} direction(s), {counts['frame']} frame(s), "
+                f"{counts['sent']} image(s) sent, {counts['audio']} audio clip(s), "
+                f"{counts['event']} event(s), {size / (1024 * 1024):.1f} MB; feeds: {feeds}")
+
+
+def write_wav(path, pcm, rate):
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(rate)
+        f.writeframes(pcm)
+
+
+def export(reader, output, start=None, end=None, frames=True, video=False):
+    """Write a time range of an archive out as ordinary files
+
+    events.jsonl (every event with its time into the show), frames/ and
+    sent/ as JPEGs, audio/ as WAV or MP3 and, with `video`, one MP4 of the
+    camera frames per feed. Payloads are copied straight from the mapped
+    segments; only video export decodes frames.
+    """
+    os.makedirs(output, exist_ok=True)
+    exported = 0
+    with open(os.path.join(output, "events.jsonl"), "w", encoding="utf-8") as f:
+        for seconds, event in reader.events(start, end):
+            f.write(json.dumps(dict(event, t=round(seconds, 3)), ensure_ascii=False) + "\n")
+            exported += 1
+
+    def feed_label(position):
+        return reader.feeds.get(int(reader.index["feed"][position])) or "camera"
+
+    kinds = [(SENT, "sent"), (AUDIO, "audio")] + ([(FRAME, "frames")] if frames else [])
+    for kind, folder in kinds:
+        for position in reader.select(kind, start, end):
+            entry = reader.index[position]
+            seconds = float(entry["timestamp"]) - reader.started_at
+            name = f"{feed_label(position)}-{seconds:09.3f}-d{int(entry['direction'])}"
+            os.makedirs(os.path.join(output, folder), exist_ok=True)
+            path = os.path.join(output, folder, name)
+            if kind == AUDIO and entry["param"]:
+                write_wav(path + ".wav", reader.payload(position), int(entry["param"]))
+            else:
+                with open(path + (".mp3" if kind == AUDIO else ".jpg"), "wb") as out:
+                    out.write(reader.payload(position))
+            exported += 1
+
+    if video:
+        for number, name in reader.feeds.items():
+            positions = reader.select(FRAME, start, end, feed=number)
+            if len(positions) < 2:
+                continue
+            timestamps = reader.index["timestamp"][positions]
+            fps = (len(positions) - 1) / max(float(timestamps[-1] - timestamps[0]), 1e-6)
+            first = reader.image(positions[0])
+            path = os.path.join(output, f"{name or 'camera'}.mp4")
+            writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), fps,
+                                     (first.shape[1], first.shape[0]))
+            for position in positions:
+                writer.write(reader.image(position))
+            writer.release()
+            exported += 1
+    return exported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect and export an AI Director show archive")
+    commands = parser.add_subparsers(dest="command", required=True)
+    info = commands.add_parser("info", help="Summarize an archive")
+    info.add_argument("archive")
+    info.add_argument("--events", action="store_true", help="Also list the direction events")
+    frame = commands.add_parser("frame", help="Save the camera frame at a point in the show")
+    frame.add_argument("archive")
+    frame.add_argument("--at", type=float, required=True, help="Seconds into the show")
+    frame.add_argument("--feed", help="Feed name; needed when several feeds have frames")
+    frame.add_argument("--output", default="frame.jpg")
+    export_parser = commands.add_parser("export", help="Write a range of the show out as files")
+    export_parser.add_argument("archive")
+    export_parser.add_argument("output")
+    export_parser.add_argument("--start", type=float, help="Seconds into the show")
+    export_parser.add_argument("--end", type=float, help="Seconds into the show")
+    export_parser.add_argument("--no-frames", action="store_true", help="Skip the camera frames")
+    export_parser.add_argument("--video", action="store_true", help="Also write each camera as an MP4")
+    args = parser.parse_args()
+
+    with ArchiveReader(args.archive) as reader:
+        if args.command == "info":
+            print(f"🗄️  {args.archive}: {reader.summary()}")
+            if args.events:
+                for seconds, event in reader.events():
+                    if event["event"] == "direction":
+                        detail = event.get("text") or event.get("entry") or f"director {event.get('director')}"
+                        print(f"  {seconds:8.1f}s  {event['kind']:<8} {detail}")
+        elif args.command == "frame":
+            if args.feed:
+                feed = reader.feed_number(args.feed)
+            else:
+                feeds = reader.frame_feeds()
+                if len(feeds) > 1:
+                    names = ", ".join(reader.feeds.get(number) or "camera" for number in feeds)
+                    parser.error(f"this show has frames from several feeds ({names}); pick one with --feed")
+                feed = feeds[0] if feeds else 0
+            position, image = reader.frame_at(args.at, feed)
+            if image is None:
+                print("❌ No frames in this archive")
+                return
+            cv2.imwrite(args.output, image)
+            seconds = float(reader.index["timestamp"][position]) - reader.started_at
+            print(f"🖼️  Frame from {seconds:.1f}s written to {args.output}")
+        else:
+            count = export(reader, args.output, args.start, args.end, not args.no_frames, args.video)
+            print(f"📤 Exported {count} record(s) to {args.output}/")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,559 @@
+"""
+Event-driven audio output
+
+One engine thread owns the speech, cue and ambience channels. Speech is a
+queue of segments (streamed PCM, cached PCM, decoded MP3s, rendered
+pauses): the next segment is always handed to the mixer before the current
+one ends, so they play back to back with no gap. The engine sleeps until
+the next segment boundary instead of polling, and reports the start and
+end of each playback through callbacks and events. While speech plays,
+cues and ambience are ducked; while a cue plays, ambience is. Cues are
+started on the cue bus with play_sound(), and their crossfades run on the
+engine thread too, so a fade and a duck never override each other.
+
+Multi-camera sessions add a speech bus per performer on its own channel,
+panned to that performer's side of the stage (or earpiece).
+"""
+
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pygame
+
+from audio_stream import (AMBIENCE_CHANNEL, CUE_CHANNELS, RESERVED_CHANNELS, SPEECH_CHANNEL,
+                          init_mixer, pcm_to_samples)
+
+# Volume of the other kinds of bus while a bus of one kind is active
+DUCKING = {
+    "speech": {"cue": 0.5, "ambience": 0.3},
+    "cue": {"ambience": 0.5},
+}
+
+# Recheck interval when the clock says a segment has ended but the mixer is still on it
+MIXER_SLACK = 0.005
+
+PANS = {"left": -1.0, "center": 0.0, "right": 1.0}
+
+
+def pan_gains(pan):
+    """(left, right) gains for a pan position from -1 (left) to 1 (right), or a name in PANS"""
+    pan = PANS.get(pan, pan)
+    pan = max(-1.0, min(1.0, float(pan)))
+    return min(1.0, 1.0 - pan), min(1.0, 1.0 + pan)
+
+
+def declick(samples, rate, edge_ms=3.0, fade_in=True, fade_out=True):
+    """Ramp the first/last few milliseconds of int16 samples in place
+
+    Separately rendered pieces of audio rarely meet at a zero crossing; a
+    short ramp at each seam removes the click without being heard as a fade.
+    """
+    edge = min(len(samples) // 2, int(rate * edge_ms / 1000))
+    if edge < 2:
+        return samples
+    ramp = np.linspace(0.0, 1.0, edge)
+    if samples.ndim > 1:
+        ramp = ramp[:, None]
+    if fade_in:
+        samples[:edge] = (samples[:edge] * ramp).astype(np.int16)
+    if fade_out:
+        samples[-edge:] = (samples[-edge:] * ramp[::-1]).astype(np.int16)
+    return samples
+
+
+class Clip:
+    """A Sound scheduled on a bus, made of one or more consecutive pieces of a Playback"""
+
+    def __init__(self, sound, playback, pieces):
+        self.sound = sound
+        self.playback = playback
+        self.pieces = pieces
+        self.length = sound.get_length()
+        self.queued_at = None
+        self.started_at = None
+        self.ends_at = None
+
+
+class Bus:
+    """Mixer channels for one kind of audio, with a queue of pieces waiting to play"""
+
+    def __init__(self, name, channel_ids, gain=1.0, kind=None, pan=None):
+        self.name = name
+        self.kind = kind or name  # Which DUCKING rules apply, e.g. "speech" for every performer's bus
+        self.channels = [pygame.mixer.Channel(channel_id) for channel_id in channel_ids]
+        self.gain = gain  # Volume when nothing ducks this bus
+        self.volume = gain
+        self.pan = None if pan is None else pan_gains(pan)
+        self.levels = [1.0] * len(self.channels)  # Per-channel fade level, times the bus volume
+        self.fades = [None] * len(self.channels)  # (from, to, started_at, seconds) while a channel fades
+        self.last_channel = None  # Channel of the latest play_sound()
+        self.apply_volume()
+        self.pending = deque()  # (samples, playback)
+        self.playing = None
+        self.queued = None
+        self.active_until = 0.0  # Set by hold() and play_sound() for audio played outside the queue
+
+    @property
+    def channel(self):
+        return self.channels[0]
+
+    def apply_volume(self):
+        for channel, level in zip(self.channels, self.levels):
+            volume = self.volume * level
+            if self.pan is None:
+                channel.set_volume(volume)
+            else:
+                # A single volume would also reset the panning
+                channel.set_volume(volume * self.pan[0], volume * self.pan[1])
+
+    def fade(self, index, level, seconds, now):
+        """Ramp one channel to `level` over `seconds`; a channel faded to 0 is stopped"""
+        if seconds <= 0:
+            self.levels[index] = level
+            self.fades[index] = None
+            if level == 0:
+                self.channels[index].stop()
+        else:
+            self.fades[index] = (self.levels[index], level, now, seconds)
+
+    def step_fades(self, now):
+        """Move every fading channel along; returns whether any level changed"""
+        changed = False
+        for index, fade in enumerate(self.fades):
+            if fade is None:
+                continue
+            start, level, started_at, seconds = fade
+            progress = min(1.0, (now - started_at) / seconds)
+            self.levels[index] = start + (level - start) * progress
+            if progress == 1.0:
+                self.fade(index, level, 0, now)
+            changed = True
+        return changed
+
+    def active(self, now):
+        return self.playing is not None or bool(self.pending) or now < self.active_until
+
+
+class Playback:
+    """One utterance or file on a bus: written piece by piece, finished when all of it has played
+
+    `started` and `finished` are threading.Events; callbacks added with
+    on_done() run on the engine thread when the last piece ends.
+    """
+
+    def __init__(self, engine, bus, source_rate=None, min_chunk_seconds=0.1, edge_ms=3.0):
+        self.engine = engine
+        self.bus = bus
+        self.source_rate = source_rate
+        mixer_rate = pygame.mixer.get_init()[0]
+        self.mixer_rate = mixer_rate
+        self.edge_ms = edge_ms
+        # Buffer at least this much PCM per piece so the mixer isn't fed tiny slices
+        self.min_chunk_bytes = int((source_rate or mixer_rate) * min_chunk_seconds) * 2
+        # The last few ms are held back so a seam can still be smoothed when it arrives
+        self.tail_bytes = int((source_rate or mixer_rate) * edge_ms / 1000) * 2
+        self.pending = bytearray()
+        self.fade_in_next = True
+        self.outstanding = 0
+        self.closed = False
+        self.stopped = False
+        self.first_audio_at = None
+        self.finished_at = None
+        self.started = threading.Event()
+        self.finished = threading.Event()
+        self.callbacks = []
+        self.lock = threading.Lock()
+
+    def write(self, data):
+        """Add raw 16-bit mono PCM at `source_rate`"""
+        self.pending.extend(data)
+        if len(self.pending) >= self.min_chunk_bytes + self.tail_bytes:
+            self._flush(fade_out=False)
+
+    def boundary(self):
+        """Mark the end of one separately rendered segment"""
+        self._flush(fade_out=True)
+
+    def write_samples(self, samples):
+        """Add int16 samples already in the mixer's format, e.g. a decoded file"""
+        self._flush(fade_out=True)
+        self._enqueue(declick(np.array(samples, dtype=np.int16), self.mixer_rate, self.edge_ms))
+        self.fade_in_next = True
+
+    def _flush(self, fade_out):
+        keep = 0 if fade_out else self.tail_bytes
+        usable = len(self.pending) - keep
+        usable -= usable % 2  # Whole 16-bit samples only
+        if usable <= 0:
+            self.fade_in_next = self.fade_in_next or fade_out
+            return
+        samples = pcm_to_samples(bytes(self.pending[:usable]), self.source_rate)
+        del self.pending[:usable]
+        declick(samples, self.mixer_rate, self.edge_ms, fade_in=self.fade_in_next, fade_out=fade_out)
+        self.fade_in_next = fade_out
+        self._enqueue(samples)
+
+    def _enqueue(self, samples):
+        if len(samples) == 0 or self.stopped:
+            return
+        with self.lock:
+            self.outstanding += 1
+        self.engine._enqueue(self.bus, samples, self)
+
+    def close(self):
+        """No more audio will be written; `finished` is set once everything has played"""
+        self._flush(fade_out=True)
+        with self.lock:
+            self.closed = True
+            done = self.outstanding == 0
+        if done:
+            self._finish()
+
+    def stop(self):
+        """Drop anything not yet played and stop this playback's audio"""
+        self.stopped = True
+        self.pending.clear()
+        self.engine._stop_playback(self)
+
+    def on_done(self, callback):
+        """Call `callback(playback)` once everything has played (right away if it has)"""
+        with self.lock:
+            if not self.finished.is_set():
+                self.callbacks.append(callback)
+                return
+        callback(self)
+
+    def wait(self, timeout=None):
+        """Block until everything written has played; returns False on timeout"""
+        return self.finished.wait(timeout)
+
+    def _piece_started(self, when):
+        if self.first_audio_at is None:
+            self.first_audio_at = when
+            self.started.set()
+
+    def _piece_ended(self, count=1):
+        with self.lock:
+            self.outstanding -= count
+            done = self.closed and self.outstanding <= 0
+        if done:
+            self._finish()
+
+    def _finish(self):
+        with self.lock:
+            if self.finished.is_set():
+                return
+            self.finished_at = time.time()
+            self.finished.set()
+            callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class AudioEngine:
+    """Speech, cue and ambience buses driven by one scheduling thread"""
+
+    def __init__(self, ducking=None, ramp_seconds=0.15, ambience_gain=0.6):
+        self.ducking = DUCKING if ducking is None else ducking
+        self.ramp_seconds = ramp_seconds  # Time for a full duck or unduck
+        self.ambience_gain = ambience_gain
+        self.buses = {}
+        self.next_channel = RESERVED_CHANNELS  # First mixer channel free for add_bus()
+        self.cond = threading.Condition()
+        self.thread = None
+        self.stopping = False
+        self.last_ramp = time.time()
+        self.segments = 0
+        self.late_segments = 0  # Segments that reached the mixer after the previous one ended
+
+    def start(self):
+        """Start the mixer and the engine thread (safe to call more than once)"""
+        with self.cond:
+            if self.thread is not None:
+                return self
+            init_mixer()
+            self.buses = {
+                "speech": Bus("speech", [SPEECH_CHANNEL]),
+                "cue": Bus("cue", CUE_CHANNELS),
+                "ambience": Bus("ambience", [AMBIENCE_CHANNEL], self.ambience_gain),
+            }
+            self.stopping = False
+            self.thread = threading.Thread(target=self._run, name="audio-engine", daemon=True)
+            self.thread.start()
+        return self
+
+    def add_bus(self, name, kind="speech", pan=None):
+        """Add a bus on a newly reserved mixer channel, e.g. one performer's speech"""
+        self.start()
+        with self.cond:
+            if name in self.buses:
+                return self.buses[name]
+            channel_id = self.next_channel
+            self.next_channel += 1
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), channel_id + 1))
+            pygame.mixer.set_reserved(channel_id + 1)
+            bus = self.buses[name] = Bus(name, [channel_id], kind=kind, pan=pan)
+            self.cond.notify_all()
+        return bus
+
+    def shutdown(self):
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout=2.0)
+            self.thread = None
+
+    # Playback API
+
+    def open_stream(self, source_rate, bus="speech"):
+        """A Playback to write raw PCM into as it arrives"""
+        self.start()
+        return Playback(self, bus, source_rate)
+
+    def play_pcm(self, data, source_rate, bus="speech"):
+        playback = self.open_stream(source_rate, bus)
+        playback.write(data)
+        playback.close()
+        return playback
+
+    def play_file(self, path, bus="speech"):
+        """Decode an audio file (MP3, WAV, OGG) into memory and queue it"""
+        self.start()
+        return self.play_samples(pygame.sndarray.array(pygame.mixer.Sound(path)), bus)
+
+    def play_samples(self, samples, bus="speech"):
+        """Queue int16 samples already in the mixer's format, e.g. a preloaded clip"""
+        self.start()
+        playback = Playback(self, bus)
+        playback.write_samples(samples)
+        playback.close()
+        return playback
+
+    def play_sound(self, sound, bus="cue", fade_ms=0):
+        """Start a Sound right away on the bus's next channel, cutting off the others
+
+        With `fade_ms` it fades in while whatever else the bus plays fades
+        out (a crossfade). The bus counts as active for the sound's length.
+        Returns the mixer channel it plays on.
+        """
+        self.start()
+        with self.cond:
+            target = self.buses[bus]
+            now = time.time()
+            index = 0 if target.last_channel is None else (target.last_channel + 1) % len(target.channels)
+            for other in range(len(target.channels)):
+                if other != index:
+                    target.fade(other, 0.0, fade_ms / 1000, now)
+            channel = target.channels[index]
+            channel.stop()
+            target.levels[index] = 0.0 if fade_ms else 1.0
+            target.fade(index, 1.0, fade_ms / 1000, now)
+            target.apply_volume()
+            channel.play(sound)
+            target.last_channel = index
+            target.active_until = now + sound.get_length()
+            self.cond.notify_all()
+        return channel
+
+    def stop_sounds(self, bus="cue", fade_ms=0):
+        """Silence every sound started on a bus with play_sound(), fading out over `fade_ms`"""
+        if self.thread is None:
+            return
+        with self.cond:
+            target = self.buses[bus]
+            now = time.time()
+            for index in range(len(target.channels)):
+                target.fade(index, 0.0, fade_ms / 1000, now)
+            target.apply_volume()
+            target.active_until = now + fade_ms / 1000
+            self.cond.notify_all()
+
+    def hold(self, bus, seconds):
+        """Treat a bus as active for `seconds` (for ducking), e.g. while a cue plays on it"""
+        self.start()
+        with self.cond:
+            self.buses[bus].active_until = time.time() + seconds
+            self.cond.notify_all()
+
+    def play_ambience(self, path, fade_ms=1000):
+        """Loop an audio file on the ambience channel"""
+        self.start()
+        sound = pygame.mixer.Sound(path)
+        with self.cond:
+            bus = self.buses["ambience"]
+            bus.channel.play(sound, loops=-1, fade_ms=fade_ms)
+            bus.apply_volume()
+
+    def stop_ambience(self, fade_ms=1000):
+        if self.thread is not None:
+            self.buses["ambience"].channel.fadeout(fade_ms)
+
+    def busy(self, bus="speech"):
+        with self.cond:
+            return bool(self.buses) and self.buses[bus].active(time.time())
+
+    def summary(self):
+        return f"{self.segments} segment(s) played, {self.late_segments} started late"
+
+    # Engine thread
+
+    def _enqueue(self, bus, samples, playback):
+        with self.cond:
+            self.buses[bus].pending.append((samples, playback))
+            self.cond.notify_all()
+
+    def _stop_playback(self, playback):
+        ended = 0
+        started = None
+        with self.cond:
+            bus = self.buses[playback.bus]
+            kept = deque()
+            for samples, owner in bus.pending:
+                if owner is playback:
+                    ended += 1
+                else:
+                    kept.append((samples, owner))
+            bus.pending = kept
+            if bus.queued is not None and bus.queued.playback is playback:
+                ended += bus.queued.pieces
+                bus.queued = None
+                if bus.playing is not None and bus.playing.playback is not playback:
+                    self._drop_queued_sound(bus)
+            if bus.playing is not None and bus.playing.playback is playback:
+                ended += bus.playing.pieces
+                bus.playing = None
+                next_clip, bus.queued = bus.queued, None
+                bus.channel.stop()  # Also drops the queued Sound
+                if next_clip is not None:
+                    # Someone else's audio was already queued behind it; start it now
+                    bus.channel.play(next_clip.sound)
+                    next_clip.started_at = time.time()
+                    next_clip.ends_at = next_clip.started_at + next_clip.length
+                    bus.playing = next_clip
+                    started = next_clip
+            self.cond.notify_all()
+        if started is not None:
+            started.playback._piece_started(started.started_at)
+        playback.closed = True
+        playback._piece_ended(ended)
+
+    def _drop_queued_sound(self, bus):
+        """Take the Sound queued on the mixer off again, keeping the current clip playing
+
+        The mixer can't unqueue, so the channel is stopped and the rest of the
+        current clip is restarted from where it had got to.
+        """
+        playing = bus.playing
+        rate = pygame.mixer.get_init()[0]
+        samples = pygame.sndarray.array(playing.sound)
+        rest = samples[int((time.time() - playing.started_at) * rate):]
+        bus.channel.stop()
+        if len(rest):
+            playing.sound = pygame.sndarray.make_sound(
+                np.ascontiguousarray(declick(rest, rate, fade_out=False)))
+            bus.channel.play(playing.sound)
+
+    def _take(self, bus):
+        """Next clip: consecutive pending pieces of the same playback merged into one Sound"""
+        samples, playback = bus.pending.popleft()
+        parts = [samples]
+        while bus.pending and bus.pending[0][1] is playback:
+            parts.append(bus.pending.popleft()[0])
+        merged = parts[0] if len(parts) == 1 else np.concatenate(parts)
+        return Clip(pygame.sndarray.make_sound(np.ascontiguousarray(merged)), playback, len(parts))
+
+    def _advance(self, bus, now, events):
+        """Move a bus's queue along; returns when it next needs attention"""
+        playing = bus.playing
+        if playing is not None and now >= playing.ends_at:
+            # The clock says it has ended; the mixer may still be a buffer behind
+            if bus.channel.get_busy() and bus.channel.get_sound() is playing.sound:
+                return now + MIXER_SLACK
+            events.append((playing.playback._piece_ended, playing.pieces))
+            bus.playing = None
+            clip = bus.queued
+            if clip is not None:
+                bus.queued = None
+                # The mixer switched to it the moment the previous clip ended
+                clip.started_at = max(playing.ends_at, clip.queued_at)
+                clip.ends_at = clip.started_at + clip.length
+                bus.playing = clip
+                events.append((clip.playback._piece_started, clip.started_at))
+
+        if bus.playing is None and bus.pending:
+            clip = self._take(bus)
+            bus.channel.play(clip.sound)
+            clip.queued_at = clip.started_at = now
+            clip.ends_at = now + clip.length
+            bus.playing = clip
+            self.segments += 1
+            if playing is not None and playing.playback is clip.playback:
+                # The previous piece of this playback ran out before this one arrived
+                self.late_segments += 1
+            events.append((clip.playback._piece_started, now))
+
+        if bus.playing is not None and bus.queued is None and bus.pending:
+            # Hand the next clip to the mixer now so it starts with no gap
+            clip = self._take(bus)
+            bus.channel.queue(clip.sound)
+            clip.queued_at = now
+            bus.queued = clip
+            self.segments += 1
+
+        return bus.playing.ends_at if bus.playing is not None else None
+
+    def _duck(self, now):
+        """Ramp each bus toward its ducked or normal volume; returns when to step again"""
+        targets = {name: bus.gain for name, bus in self.buses.items()}
+        for bus in self.buses.values():
+            if bus.active(now):
+                levels = self.ducking.get(bus.kind, {})
+                for other in self.buses.values():
+                    if other.kind in levels:
+                        targets[other.name] = min(targets[other.name], other.gain * levels[other.kind])
+
+        step = (now - self.last_ramp) / self.ramp_seconds
+        self.last_ramp = now
+        wake = None
+        for name, bus in self.buses.items():
+            if bus.active_until > now:
+                wake = bus.active_until if wake is None else min(wake, bus.active_until)
+            target = targets[name]
+            fading = bus.step_fades(now)
+            if bus.volume == target and not fading:
+                continue
+            if abs(target - bus.volume) <= step:
+                bus.volume = target
+            else:
+                bus.volume += step if target > bus.volume else -step
+            bus.apply_volume()
+            if bus.volume != target or any(bus.fades):
+                wake = now + 0.01 if wake is None else min(wake, now + 0.01)
+        return wake
+
+    def _run(self):
+        while True:
+            events = []
+            with self.cond:
+                if self.stopping:
+                    return
+                now = time.time()
+                wakes = [self._advance(bus, now, events) for bus in self.buses.values()]
+                wakes.append(self._duck(now))
+                wakes = [wake for wake in wakes if wake is not None]
+                if not events:
+                    # Sleep until the next segment boundary, ramp step or new audio
+                    self.cond.wait(max(0.0, min(wakes) - now) if wakes else None)
+                    continue
+            for callback, argument in events:
+                try:
+                    callback(argument)
+                except Exception as e:
+                    print(f"❌ Error in audio callback: {e}")
+
+
+# Shared engine for the whole process
+audio = AudioEngine()
@@ -0,0 +1,105 @@
+"""
+Streaming speech input and mixer setup
+
+ElevenLabs returns synthesized speech as an iterator of chunks. Instead of
+writing the whole utterance to disk before playing it, `BufferedSpeech`
+downloads chunks on a background thread, and the audio engine
+(audio_engine.py) plays raw 16-bit PCM as it arrives.
+"""
+
+import queue
+import threading
+import time
+
+import numpy as np
+import pygame
+
+# Reserved mixer channels: streamed speech, two for cues (so one can crossfade into
+# the next) and a looping ambience bed
+SPEECH_CHANNEL = 0
+CUE_CHANNELS = (1, 2)
+AMBIENCE_CHANNEL = 3
+RESERVED_CHANNELS = 4
+
+# Yielded between separately rendered pieces of one utterance (cached ritual
+# lines, fresh TTS, rendered pauses) so their edges can be smoothed
+SEGMENT_BOUNDARY = object()
+
+_END = object()
+_mixer_lock = threading.Lock()
+
+
+def init_mixer():
+    """Start the pygame mixer on first use and reserve the speech, cue and ambience channels"""
+    with _mixer_lock:
+        if pygame.mixer.get_init() is None:
+            pygame.mixer.init()
+            pygame.mixer.set_reserved(RESERVED_CHANNELS)
+
+
+class BufferedSpeech:
+    """Audio chunks that are downloaded on a background thread as they arrive"""
+
+    def __init__(self, chunks):
+        self.requested_at = time.time()
+        self.first_byte_at = None
+        self.finished_at = None
+        self.error = None
+        self._first_byte = threading.Event()
+        self._chunks = queue.Queue()
+        self._thread = threading.Thread(target=self._download, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _download(self, chunks):
+        try:
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if self.first_byte_at is None:
+                    self.first_byte_at = time.time()
+                    self._first_byte.set()
+                self._chunks.put(chunk)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.finished_at = time.time()
+            self._first_byte.set()
+            self._chunks.put(_END)
+
+    def wait_first_byte(self, timeout=None):
+        """Block until audio starts arriving (or the download ends); False on timeout"""
+        return self._first_byte.wait(timeout)
+
+    def __iter__(self):
+        return self.chunks()
+
+    def chunks(self, poll_interval=None):
+        """Yield chunks as they arrive; with a poll interval, yield None while waiting"""
+        while True:
+            try:
+                chunk = self._chunks.get(timeout=poll_interval)
+            except queue.Empty:
+                yield None
+                continue
+            if chunk is _END:
+                if self.error:
+                    raise self.error
+                return
+            yield chunk
+
+
+def pcm_to_samples(data, source_rate):
+    """Convert mono 16-bit little-endian PCM into an int16 array in the mixer's format"""
+    mixer_rate, _, mixer_channels = pygame.mixer.get_init()
+    samples = np.frombuffer(data, dtype="<i2")
+
+    if source_rate != mixer_rate and len(samples) > 1:
+        # Linear resampling is plenty for speech
+        target_len = int(len(samples) * mixer_rate / source_rate)
+        positions = np.linspace(0, len(samples) - 1, target_len)
+        samples = np.interp(positions, np.arange(len(samples)), samples).astype(np.int16)
+
+    if mixer_channels > 1:
+        samples = np.repeat(samples[:, None], mixer_channels, axis=1)
+
+    return np.ascontiguousarray(samples, dtype=np.int16)
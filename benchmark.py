@@ -0,0 +1,190 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the AI Director
+
+Runs the full director pipeline against a recorded session (or synthetic
+frames) and the local fake OpenAI/ElevenLabs servers, once per combination
+of fps and frames per analysis. Each run is a separate process so CPU and
+memory are measured in isolation. Reports end-to-end direction latency
+(newest analyzed frame to playback), the silence between directions, time
+to first audio, CPU use and memory.
+
+    python benchmark.py --fps 0.2 0.3 0.5 --frames 1 2 3 --seconds 90
+    python benchmark.py --session rehearsal.session --latency 3 --jitter 1.5
+    python benchmark.py --feeds 1 2 4  # Multi-camera sessions on shared API workers
+    python benchmark.py --capture full low-cpu  # CPU of each capture mode (headless)
+"""
+
+import argparse
+import itertools
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+RESULT_MARKER = "BENCHMARK_RESULT "
+
+
+def current_rss_mb():
+    """Resident memory of this process in MB (Linux)"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        return 0.0
+
+
+def run_one(config):
+    """Run one director session in this process and return its measurements"""
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import ai_director
+    from metrics import metrics
+    from replay import ReplaySource, SyntheticSource
+    from tts_cache import TTSCache
+
+    feeds = config.get("feeds", 1)
+    low_cpu = config.get("capture") == "low-cpu"
+    sources = [ReplaySource(config["session"]) if config["session"] else SyntheticSource()
+               for _ in range(feeds)]
+    # A fresh cache per run so runs don't warm each other up
+    tts_cache = TTSCache(tempfile.mkdtemp(prefix="bench-tts-"))
+
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    started = time.time()
+    if feeds == 1:
+        directors = [ai_director.AIDirector(tts_cache=tts_cache)]
+        ai_director.run_ai_director(config["fps"], config["frames"], source=sources[0], preview=False,
+                                    duration=config["seconds"], director_choice=4, director=directors[0],
+                                    prefetch=config["prefetch"], low_cpu=low_cpu)
+    else:
+        import multicam
+        directors = [feed.director for feed in multicam.run_multicam(
+            sources, fps=config["fps"], frames_per_analysis=config["frames"], preview=False,
+            duration=config["seconds"], director_choice=4, prefetch=config["prefetch"],
+            tts_cache=tts_cache, low_cpu=low_cpu)]
+    wall = time.time() - started
+    usage_after = resource.getrusage(resource.RUSAGE_SELF)
+
+    cpu_seconds = ((usage_after.ru_utime - usage_before.ru_utime)
+                   + (usage_after.ru_stime - usage_before.ru_stime))
+    snapshot = metrics.snapshot()
+    return {
+        "fps": config["fps"],
+        "frames": config["frames"],
+        "feeds": feeds,
+        "capture": config.get("capture", "full"),
+        "frames_grabbed": metrics.counters.get("frames_grabbed", 0),
+        "frames_decoded": metrics.counters.get("frames_decoded", 0),
+        "directions": sum(director.instruction_count for director in directors),
+        "spans": snapshot,
+        "cpu_percent": 100.0 * cpu_seconds / wall,
+        "peak_rss_mb": usage_after.ru_maxrss / 1024,  # ru_maxrss is in KB on Linux
+        "rss_mb": current_rss_mb(),
+        "bytes_uploaded": sum(director.encoder.total_bytes for director in directors),
+    }
+
+
+def spawn_run(config, env, verbose=False):
+    """Run one configuration in a child process and parse its result"""
+    command = [sys.executable, os.path.abspath(__file__), "--run-one", json.dumps(config)]
+    process = subprocess.run(command, env=env, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    if verbose:
+        print(process.stdout)
+        print(process.stderr, file=sys.stderr)
+    for line in reversed(process.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    print(f"❌ Run failed (fps={config['fps']}, frames={config['frames']}, feeds={config['feeds']}, "
+          f"capture={config['capture']}):")
+    print(process.stderr[-2000:])
+    return None
+
+
+def span_ms(result, span, stat):
+    stats = result["spans"].get(span)
+    return f"{stats[stat] * 1000:.0f}" if stats else "-"
+
+
+def print_table(results):
+    header = (f"{'fps':>5} {'frames':>6} {'feeds':>5} {'capture':>8} {'dirs':>5} {'e2e p50':>8} {'e2e p95':>8} "
+              f"{'gap p50':>8} {'gap p95':>8} {'ttfa p50':>9} {'decoded':>8} {'cpu %':>6} {'peak MB':>8}")
+    print(header)
+    print("-" * len(header))
+    for result in results:
+        print(f"{result['fps']:>5} {result['frames']:>6} {result.get('feeds', 1):>5} "
+              f"{result.get('capture', 'full'):>8} {result['directions']:>5} "
+              f"{span_ms(result, 'direction_latency', 'p50'):>8} "
+              f"{span_ms(result, 'direction_latency', 'p95'):>8} "
+              f"{span_ms(result, 'direction_gap', 'p50'):>8} "
+              f"{span_ms(result, 'direction_gap', 'p95'):>8} "
+              f"{span_ms(result, 'time_to_first_audio', 'p50'):>9} "
+              f"{result.get('frames_decoded', 0):>8} {result['cpu_percent']:>6.1f} {result['peak_rss_mb']:>8.1f}")
+    print("(latencies in ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the AI Director offline")
+    parser.add_argument("--session", help="Recorded session to replay (default: synthetic frames)")
+    parser.add_argument("--fps", type=float, nargs="+", default=[0.3], help="Analysis fps values to try")
+    parser.add_argument("--frames", type=int, nargs="+", default=[2], help="Frames per analysis values to try")
+    parser.add_argument("--feeds", type=int, nargs="+", default=[1],
+                        help="Camera feeds per run; more than one runs a multi-camera session")
+    parser.add_argument("--capture", nargs="+", choices=["full", "low-cpu"], default=["full"],
+                        help="Capture modes to try: decode every frame, or only the frames used")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Length of each run (default: 60)")
+    parser.add_argument("--latency", type=float, default=1.5, help="Fake OpenAI time to first token (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="Fake OpenAI jitter (s)")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="Fake ElevenLabs time to first byte (s)")
+    parser.add_argument("--tts-jitter", type=float, default=0.15, help="Fake ElevenLabs jitter (s)")
+    parser.add_argument("--no-prefetch", action="store_true", help="Disable speculative prefetch")
+    parser.add_argument("--output", help="Write all results to this JSON file")
+    parser.add_argument("--verbose", action="store_true", help="Show each run's output")
+    parser.add_argument("--run-one", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_one:
+        result = run_one(json.loads(args.run_one))
+        print(RESULT_MARKER + json.dumps(result))
+        return
+
+    from fake_servers import FakeElevenLabsServer, FakeOpenAIServer
+
+    openai_server = FakeOpenAIServer(latency=args.latency, jitter=args.jitter).start()
+    elevenlabs_server = FakeElevenLabsServer(latency=args.tts_latency, jitter=args.tts_jitter).start()
+    env = dict(os.environ,
+               OPENAI_API_KEY="sk-benchmark", ELEVENLABS_API_KEY="benchmark",
+               OPENAI_BASE_URL=openai_server.base_url,
+               ELEVENLABS_BASE_URL=elevenlabs_server.base_url,
+               SDL_AUDIODRIVER="dummy")
+
+    runs = len(args.fps) * len(args.frames) * len(args.feeds) * len(args.capture)
+    print(f"🧪 Benchmarking {runs} configuration(s), "
+          f"{args.seconds:.0f}s each, source: {args.session or 'synthetic'}")
+    results = []
+    try:
+        for fps, frames, feeds, capture in itertools.product(args.fps, args.frames, args.feeds, args.capture):
+            print(f"  ▶ fps={fps} frames={frames} feeds={feeds} capture={capture} ...", flush=True)
+            config = {"fps": fps, "frames": frames, "feeds": feeds, "capture": capture, "seconds": args.seconds,
+                      "session": args.session, "prefetch": not args.no_prefetch}
+            result = spawn_run(config, env, args.verbose)
+            if result:
+                results.append(result)
+    finally:
+        openai_server.stop()
+        elevenlabs_server.stop()
+
+    print()
+    print_table(results)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+"""
+Camera capture that only decodes the frames that are used
+
+A camera delivers about 30 frames a second, but the director samples a few
+per second for analysis and the preview needs 10 or so. `FrameGrabber`
+calls grab() on every frame, so the driver's buffer never fills with stale
+frames, and decodes (retrieve()) only when the capture loop asks for the
+current frame. A camera that stops delivering frames is retried with
+exponential backoff instead of being polled in a tight loop.
+
+It also measures the CPU time of the capture loop's thread, so each capture
+mode can be compared by how much of a core it costs. Waiting for the next
+frame is not timed; decoding is, as one "decode" sample per second (the
+mean per frame) rather than one per frame, and frame counts go to the
+frames_grabbed, frames_decoded and camera_read_failures counters.
+"""
+
+import time
+
+from metrics import metrics
+
+DEFAULT_PREVIEW_FPS = 10.0  # Preview rate in low-CPU mode
+
+
+class FrameGrabber:
+    """Grab every frame from a VideoCapture-like source and decode on demand
+
+    With `decode_all` every frame is read (grabbed and decoded) as it
+    arrives, like a plain `video.read()` loop.
+    """
+
+    def __init__(self, video, decode_all=False, min_backoff=0.01, max_backoff=0.5, stop_event=None,
+                 report_interval=1.0):
+        self.video = video
+        self.decode_all = decode_all
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stop_event = stop_event  # Backoff sleeps end early when it is set
+        self.frame = None  # The current frame, once decoded
+        self.backoff = 0.0
+        self.report_interval = report_interval
+        self.decode_seconds = 0.0  # Decode time not yet reported, and the frames it covers
+        self.decode_frames = 0
+        self.reported_at = time.perf_counter()
+
+        self.grabbed = 0
+        self.decoded = 0
+        self.read_failures = 0
+        self.started_at = None
+        self.cpu_started = 0.0
+        self.cpu_seconds = 0.0  # CPU time of the capture thread so far
+        self.wall_seconds = 0.0
+
+    def grab(self):
+        """Advance to the newest frame; False (after backing off) if the source had none"""
+        now = time.perf_counter()
+        if self.started_at is None:
+            self.started_at = now
+            self.cpu_started = time.thread_time()
+        else:
+            self.cpu_seconds = time.thread_time() - self.cpu_started
+            self.wall_seconds = now - self.started_at
+
+        self.frame = None
+        # Blocks until the camera has a frame, so it isn't timed
+        success = self.video.grab()
+        if success:
+            if self.backoff == self.max_backoff:
+                print("🎥 Camera is delivering frames again")
+            self.grabbed += 1
+            metrics.increment("frames_grabbed")
+            self.backoff = 0.0
+            if self.decode_all:
+                self.retrieve()
+            return True
+
+        self.read_failures += 1
+        metrics.increment("camera_read_failures")
+        previous = self.backoff
+        self.backoff = min(self.max_backoff, self.backoff * 2 or self.min_backoff)
+        if previous < self.backoff == self.max_backoff:
+            print(f"⚠️  Camera returned no frame; retrying every {self.max_backoff:.1f}s")
+        if self.stop_event is not None:
+            self.stop_event.wait(self.backoff)
+        else:
+            time.sleep(self.backoff)
+        return False
+
+    def retrieve(self):
+        """The current frame, decoded at most once however often it is asked for; None on failure"""
+        if self.frame is None:
+            started = time.perf_counter()
+            success, frame = self.video.retrieve()
+            self._decoded(time.perf_counter() - started)
+            if not success or frame is None:
+                return None
+            self.frame = frame
+            self.decoded += 1
+            metrics.increment("frames_decoded")
+        return self.frame
+
+    def _decoded(self, seconds):
+        self.decode_seconds += seconds
+        self.decode_frames += 1
+        now = time.perf_counter()
+        if now - self.reported_at >= self.report_interval:
+            metrics.observe("decode", self.decode_seconds / self.decode_frames, frames=self.decode_frames)
+            self.decode_seconds = 0.0
+            self.decode_frames = 0
+            self.reported_at = now
+
+    def cpu_percent(self):
+        """CPU used by the capture loop's thread, in percent of one core"""
+        return 100.0 * self.cpu_seconds / self.wall_seconds if self.wall_seconds else 0.0
+
+    def summary(self):
+        return (f"{self.grabbed} frame(s) grabbed, {self.decoded} decoded, "
+                f"{self.read_failures} failed read(s), capture loop {self.cpu_percent():.1f}% of a core")
+
+
+class CPUMeter:
+    """CPU use of the whole process since it was created"""
+
+    def __init__(self):
+        self.started_at = time.perf_counter()
+        self.cpu_started = time.process_time()
+
+    def percent(self):
+        """Percent of one core; above 100 when several threads are busy"""
+        wall = time.perf_counter() - self.started_at
+        return 100.0 * (time.process_time() - self.cpu_started) / wall if wall else 0.0
+
+
+def capture_mode(low_cpu, preview, preview_fps):
+    """Label of a capture mode, for session summaries"""
+    mode = "low-CPU" if low_cpu else "full decode"
+    if not preview:
+        return f"{mode}, headless"
+    return f"{mode}, preview {'uncapped' if not preview_fps else f'at {preview_fps:g} fps'}"
@@ -0,0 +1,434 @@
+"""
+Operator controls for a running director session
+
+The operator never has to answer a prompt: `ControlState` holds the current
+director, any directors queued for the next directions and whether live
+analysis is paused. It is changed from two places while frames keep being
+captured: hotkeys in the preview window's cv2.waitKey loop and a small
+local HTTP/WebSocket API. WebSocket clients also get the new state pushed
+to them whenever it changes.
+
+    curl -X POST localhost:8765/director -d '{"director": 2}'
+    curl -X POST localhost:8765/director -d '{"director": 1, "queue": true}'
+    curl -X POST localhost:8765/pause
+    curl -X POST localhost:8765/fresh
+    curl -X POST localhost:8765/cue -d '{"name": "director_3", "crossfade": true}'
+
+A multi-camera session keeps one state per feed (FeedControls); commands
+go to every feed unless they name one:
+
+    curl -X POST localhost:8765/fresh -d '{"feed": "cam1"}'
+"""
+
+import base64
+import hashlib
+import json
+import struct
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from pipeline import DropOldestQueue
+
+DIRECTORS = (1, 2, 3, 4)
+LIVE_DIRECTOR = 4
+
+HOTKEY_HELP = ("1-4 switch director | Shift+1-4 queue director for the next direction | "
+               "space pause/resume | f fresh direction | z x c v play cues 1-4 | s stop cues | q quit")
+QUEUE_KEYS = {"!": 1, "@": 2, "#": 3, "$": 4}
+CUE_KEYS = "zxcv"
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WEBSOCKET_QUEUE = 32  # State pushes waiting per client; the oldest are dropped first
+
+
+class ControlState:
+    """Director choice and pause state shared by the pipeline and the operator controls"""
+
+    def __init__(self, director=LIVE_DIRECTOR, paused=False):
+        if director not in DIRECTORS:
+            raise ValueError(f"director must be one of {DIRECTORS}")
+        self.director = director  # Used for every direction unless one is queued
+        self.queued = deque()  # One-off directors for the next directions, in order
+        self.paused = paused
+        self.fresh = False  # Skip the response cache for the next live direction
+        self.lock = threading.Lock()
+        self.listeners = []
+
+    def _changed(self):
+        state = self.snapshot()
+        for listener in list(self.listeners):
+            try:
+                listener(state)
+            except Exception:
+                self.remove_listener(listener)
+
+    def add_listener(self, listener):
+        """Call `listener(state)` after every change"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def set_director(self, director):
+        """Switch the director used from the next direction on"""
+        if director not in DIRECTORS:
+            raise ValueError(f"director must be one of {DIRECTORS}")
+        with self.lock:
+            self.director = director
+        self._changed()
+
+    def queue_director(self, director):
+        """Use `director` for the next direction only"""
+        if director not in DIRECTORS:
+            raise ValueError(f"director must be one of {DIRECTORS}")
+        with self.lock:
+            self.queued.append(director)
+        self._changed()
+
+    def next_director(self):
+        """Director for the direction about to be given"""
+        with self.lock:
+            if not self.queued:
+                return self.director
+            director = self.queued.popleft()
+        self._changed()
+        return director
+
+    def set_paused(self, paused):
+        with self.lock:
+            self.paused = paused
+        self._changed()
+
+    def toggle_paused(self):
+        with self.lock:
+            self.paused = not self.paused
+            paused = self.paused
+        self._changed()
+        return paused
+
+    def request_fresh(self):
+        """Ask GPT-4o for the next live direction even if the scene hasn't changed"""
+        with self.lock:
+            self.fresh = True
+        self._changed()
+
+    def take_fresh(self):
+        """Whether a fresh direction was requested; clears the request"""
+        with self.lock:
+            fresh, self.fresh = self.fresh, False
+        if fresh:
+            self._changed()
+        return fresh
+
+    def snapshot(self):
+        with self.lock:
+            return {"director": self.director, "queued": list(self.queued), "paused": self.paused,
+                    "fresh": self.fresh}
+
+    def status(self):
+        """One-line status for the preview window"""
+        state = self.snapshot()
+        text = f"Director {state['director']}"
+        if state["queued"]:
+            text += " (next: " + ", ".join(str(d) for d in state["queued"]) + ")"
+        if state["fresh"]:
+            text += " | FRESH"
+        if state["paused"]:
+            text += " | PAUSED"
+        return text
+
+
+class FeedControls:
+    """One ControlState per camera feed behind the same operator controls
+
+    Every feed takes its own queued directors and fresh requests, so a
+    command meant for all performers isn't used up by whichever feed asks
+    first. Changes go to every feed; apply_command can name one with "feed".
+    """
+
+    def __init__(self, names, director=LIVE_DIRECTOR, paused=False):
+        self.feeds = {name: ControlState(director, paused) for name in names}
+        self.lock = threading.Lock()
+        self.listeners = []
+        for control in self.feeds.values():
+            control.add_listener(lambda state: self._changed())
+
+    def _changed(self):
+        state = self.snapshot()
+        for listener in list(self.listeners):
+            try:
+                listener(state)
+            except Exception:
+                self.remove_listener(listener)
+
+    def add_listener(self, listener):
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def feed(self, name):
+        """The ControlState of one feed"""
+        if name not in self.feeds:
+            raise ValueError(f"unknown feed: {name}")
+        return self.feeds[name]
+
+    def set_director(self, director):
+        for control in self.feeds.values():
+            control.set_director(director)
+
+    def queue_director(self, director):
+        for control in self.feeds.values():
+            control.queue_director(director)
+
+    @property
+    def paused(self):
+        return all(control.paused for control in self.feeds.values())
+
+    def set_paused(self, paused):
+        for control in self.feeds.values():
+            control.set_paused(paused)
+
+    def toggle_paused(self):
+        paused = not self.paused
+        self.set_paused(paused)
+        return paused
+
+    def request_fresh(self):
+        for control in self.feeds.values():
+            control.request_fresh()
+
+    def snapshot(self):
+        return {"paused": self.paused,
+                "feeds": {name: control.snapshot() for name, control in self.feeds.items()}}
+
+    def status(self):
+        """One-line status for the preview window; per feed once the feeds differ"""
+        statuses = {name: control.status() for name, control in self.feeds.items()}
+        if len(set(statuses.values())) <= 1:
+            return next(iter(statuses.values()), "")
+        return " | ".join(f"{name}: {status}" for name, status in statuses.items())
+
+
+def apply_command(control, command, cue_bank=None):
+    """Carry out one operator command (a dict with an "action"); returns the new state
+
+    With a FeedControls, a "feed" field limits the command to that feed.
+    Raises ValueError for unknown actions or bad arguments.
+    """
+    action = command.get("action")
+    state = control
+    if command.get("feed") is not None:
+        if not isinstance(control, FeedControls):
+            raise ValueError("this session has a single feed")
+        control = control.feed(command["feed"])
+    if action == "director":
+        director = int(command.get("director", 0))
+        if command.get("queue"):
+            control.queue_director(director)
+        else:
+            control.set_director(director)
+    elif action == "pause":
+        control.set_paused(True)
+    elif action == "resume":
+        control.set_paused(False)
+    elif action == "toggle":
+        control.toggle_paused()
+    elif action == "fresh":
+        control.request_fresh()
+    elif action == "cue":
+        if cue_bank is None:
+            raise ValueError("no cue bank")
+        if cue_bank.play(str(command.get("name")), crossfade=bool(command.get("crossfade"))) is None:
+            raise ValueError(f"unknown cue: {command.get('name')}")
+    elif action == "stop_cues":
+        if cue_bank is not None:
+            cue_bank.stop_all(int(command.get("fade_ms", 0)))
+    elif action != "state":
+        raise ValueError(f"unknown action: {action}")
+    return state.snapshot()
+
+
+def handle_key(key, control, cue_bank=None):
+    """Apply a cv2.waitKey key code; returns a message to print, or None"""
+    if key < 0 or key == 0xFF:
+        return None
+    char = chr(key & 0xFF)
+    try:
+        if char in "1234":
+            control.set_director(int(char))
+            return f"🎛️  Director {char}"
+        if char in QUEUE_KEYS:
+            control.queue_director(QUEUE_KEYS[char])
+            return f"🎛️  Director {QUEUE_KEYS[char]} queued for the next direction"
+        if char == " ":
+            return "⏸️  Analysis paused" if control.toggle_paused() else "▶️  Analysis resumed"
+        if char == "f":
+            control.request_fresh()
+            return "🎛️  Next direction will be fresh"
+        if char in CUE_KEYS and cue_bank is not None:
+            names = cue_bank.names()
+            index = CUE_KEYS.index(char)
+            if index < len(names):
+                cue_bank.play(names[index], crossfade=True)
+                return f"🎵 Cue {names[index]}"
+        if char == "s" and cue_bank is not None:
+            cue_bank.stop_all(fade_ms=300)
+            return "🎵 Cues stopped"
+    except ValueError as e:
+        return f"❌ {e}"
+    return None
+
+
+def _websocket_frame(text):
+    """Encode an unmasked server-to-client text frame"""
+    payload = text.encode("utf-8")
+    if len(payload) < 126:
+        header = struct.pack("!BB", 0x81, len(payload))
+    elif len(payload) < 65536:
+        header = struct.pack("!BBH", 0x81, 126, len(payload))
+    else:
+        header = struct.pack("!BBQ", 0x81, 127, len(payload))
+    return header + payload
+
+
+def _read_websocket_frame(rfile):
+    """Read one client frame; returns (opcode, payload) or (None, None) when the socket closes"""
+    header = rfile.read(2)
+    if len(header) < 2:
+        return None, None
+    opcode = header[0] & 0x0F
+    masked = header[1] & 0x80
+    length = header[1] & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", rfile.read(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", rfile.read(8))[0]
+    mask = rfile.read(4) if masked else None
+    payload = rfile.read(length)
+    if mask:
+        payload = bytes(b ^ mask[i % 4] for i, b in enumerate(payload))
+    return opcode, payload
+
+
+class ControlServer:
+    """Local HTTP/WebSocket API for a ControlState
+
+    POST /director {"director": n, "queue": bool}, /pause, /resume, /toggle,
+    /fresh (each with an optional "feed" in a multi-camera session), /cue {"name": ..., "crossfade": bool} and /stop_cues; GET /state and
+    /cues. A WebSocket on /ws takes the same commands as JSON messages with
+    an "action" field and pushes the state after every change.
+    """
+
+    def __init__(self, control, cue_bank=None, port=8765, host="127.0.0.1"):
+        self.control = control
+        self.cue_bank = cue_bank
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def send_json(self, payload, status=200):
+                body = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = urlparse(self.path).path.rstrip("/")
+                if path == "/ws" and self.headers.get("Upgrade", "").lower() == "websocket":
+                    server.serve_websocket(self)
+                elif path in ("", "/state"):
+                    self.send_json(server.control.snapshot())
+                elif path == "/cues":
+                    self.send_json({"cues": server.cue_bank.names() if server.cue_bank else []})
+                else:
+                    self.send_json({"error": "not found"}, 404)
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                try:
+                    command = json.loads(self.rfile.read(length) or b"{}") if length else {}
+                    command["action"] = urlparse(self.path).path.strip("/")
+                    self.send_json(apply_command(server.control, command, server.cue_bank))
+                except (ValueError, TypeError, AttributeError) as e:
+                    self.send_json({"error": str(e)}, 400)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.port = self.httpd.server_address[1]
+        self.url = f"http://{host}:{self.port}"
+
+    def serve_websocket(self, handler):
+        key = handler.headers.get("Sec-WebSocket-Key", "")
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode("ascii")).digest())
+        handler.send_response(101, "Switching Protocols")
+        handler.send_header("Upgrade", "websocket")
+        handler.send_header("Connection", "Upgrade")
+        handler.send_header("Sec-WebSocket-Accept", accept.decode("ascii"))
+        handler.end_headers()
+        handler.close_connection = True
+
+        # State changes are only queued here; a client that reads slowly (or not at
+        # all) stalls its own writer thread, never the thread that made the change
+        outbox = DropOldestQueue(maxsize=WEBSOCKET_QUEUE)
+
+        def write():
+            while True:
+                frame = outbox.get()
+                if frame is None:
+                    return
+                try:
+                    handler.wfile.write(frame)
+                    handler.wfile.flush()
+                except OSError:
+                    return
+
+        def send(payload):
+            outbox.put_latest(_websocket_frame(json.dumps(payload)))
+
+        writer = threading.Thread(target=write, name="control-ws-writer", daemon=True)
+        writer.start()
+        self.control.add_listener(send)
+        try:
+            send(self.control.snapshot())
+            while True:
+                opcode, payload = _read_websocket_frame(handler.rfile)
+                if opcode is None or opcode == 0x8:  # Closed
+                    break
+                if opcode == 0x9:  # Ping
+                    outbox.put_latest(struct.pack("!BB", 0x8A, len(payload)) + payload)
+                    continue
+                if opcode != 0x1:
+                    continue
+                try:
+                    apply_command(self.control, json.loads(payload.decode("utf-8")), self.cue_bank)
+                except (ValueError, TypeError, AttributeError) as e:
+                    send({"error": str(e)})
+        except OSError:
+            pass
+        finally:
+            self.control.remove_listener(send)
+            outbox.put_latest(None)
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="control", daemon=True).start()
+        print(f"🎛️  Control API at {self.url} (WebSocket: ws://{self.url[7:]}/ws)")
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
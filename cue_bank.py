@@ -0,0 +1,214 @@
+"""
+In-memory bank of pre-recorded cues
+
+Every clip in `generated_assets/` is decoded into a pygame Sound once, up
+front, so triggering a cue is a single call on an idle mixer channel
+instead of a file load. Cues play on the audio engine's cue bus, whose two
+channels let one cue interrupt or crossfade into another while the engine
+ducks them under speech. A watcher thread picks up new, changed and removed
+files without a restart. Cues are named by file stem, so two files with
+the same stem (intro.wav and intro.ogg) are ambiguous and neither is loaded.
+"""
+
+import os
+import threading
+import time
+
+import pygame
+
+from audio_engine import audio
+from metrics import metrics
+
+CUE_EXTENSIONS = (".mp3", ".wav", ".ogg")
+
+
+class Cue:
+    """One triggered cue, which can be waited on until it ends or is cut off"""
+
+    def __init__(self, name, sound, channel):
+        self.name = name
+        self.sound = sound
+        self.channel = channel
+        self.length = sound.get_length()
+        self.started_at = time.time()
+        self.interrupted = False
+        self._done = threading.Event()
+
+    def cut(self):
+        self.interrupted = True
+        self._done.set()
+
+    @property
+    def playing(self):
+        return not self._done.is_set() and self.channel.get_sound() is self.sound
+
+    def wait(self, timeout=None):
+        """Block until the cue has finished; returns False if it was interrupted"""
+        deadline = None if timeout is None else time.time() + timeout
+        remaining = self.started_at + self.length - time.time()
+        if deadline is not None:
+            remaining = min(remaining, deadline - time.time())
+        if remaining > 0 and self._done.wait(remaining):
+            return not self.interrupted
+        # The clip's length has elapsed; let the mixer drain its last buffer
+        while self.channel.get_sound() is self.sound and self.channel.get_busy():
+            if self._done.is_set() or (deadline is not None and time.time() >= deadline):
+                break
+            time.sleep(0.01)
+        self._done.set()
+        return not self.interrupted
+
+
+class CueBank:
+    """Decoded cues by name (the file name without extension), played on an AudioEngine bus"""
+
+    def __init__(self, directory="generated_assets", bus="cue", fade_ms=400,
+                 poll_interval=1.0, settle_seconds=0.5, engine=None):
+        self.directory = directory
+        self.engine = engine or audio  # Plays the cues, fading and ducking them
+        self.bus = bus
+        self.fade_ms = fade_ms  # Default crossfade length
+        self.poll_interval = poll_interval  # Seconds between directory scans
+        self.settle_seconds = settle_seconds  # Skip files modified this recently (still being written)
+        self.sounds = {}
+        self.files = {}  # name -> (path, mtime, size) of the loaded version
+        self.duplicates = {}  # name -> paths of the files that share it, none of them loaded
+        self.current = None
+        self.triggers = 0
+        self.scans = 0
+        self.lock = threading.Lock()
+        self.start_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.watcher = None
+        self.started = False
+
+    def start(self, watch=True):
+        """Decode every clip in the directory and start watching it for changes"""
+        # Held for the whole initial load so a second caller waits for a full bank
+        with self.start_lock:
+            if self.started:
+                return
+            self.engine.start()
+            self.scan()
+            if self.sounds:
+                print(f"🎵 Cue bank: {len(self.sounds)} cue(s) loaded from {self.directory}/")
+            if watch:
+                self.stop_event.clear()
+                self.watcher = threading.Thread(target=self._watch, name="cue-watcher", daemon=True)
+                self.watcher.start()
+            self.started = True
+
+    def stop(self):
+        """Stop watching the directory; loaded cues stay playable"""
+        with self.start_lock:
+            self.stop_event.set()
+            if self.watcher is not None:
+                self.watcher.join(timeout=2.0)
+                self.watcher = None
+            self.started = False
+
+    def _watch(self):
+        while not self.stop_event.wait(self.poll_interval):
+            try:
+                self.scan()
+            except Exception as e:
+                print(f"⚠️  Cue bank scan failed: {e}")
+
+    def _listing(self):
+        """(path, mtime, size) of every audio file in the directory, by cue name
+
+        Names shared by several files are left out and reported once.
+        """
+        found = {}
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError:
+            return {}
+        for entry in entries:
+            name, extension = os.path.splitext(entry.name)
+            if extension.lower() in CUE_EXTENSIONS and entry.is_file():
+                stat = entry.stat()
+                found.setdefault(name, []).append((entry.path, stat.st_mtime, stat.st_size))
+
+        duplicates = {name: sorted(version[0] for version in versions)
+                      for name, versions in found.items() if len(versions) > 1}
+        for name, paths in duplicates.items():
+            if self.duplicates.get(name) != paths:
+                print(f"⚠️  Cue {name} skipped: {len(paths)} files share its name "
+                      f"({', '.join(os.path.basename(path) for path in paths)})")
+        self.duplicates = duplicates
+        return {name: versions[0] for name, versions in found.items() if len(versions) == 1}
+
+    def scan(self):
+        """Load new or changed files and forget removed ones; returns the names that changed"""
+        listing = self._listing()
+        changed = []
+        now = time.time()
+        for name, version in listing.items():
+            if self.files.get(name) == version or now - version[1] < self.settle_seconds:
+                continue
+            try:
+                sound = pygame.mixer.Sound(version[0])
+            except (pygame.error, OSError) as e:
+                print(f"⚠️  Could not load cue {version[0]}: {e}")
+                continue
+            with self.lock:
+                reloaded = name in self.sounds
+                self.sounds[name] = sound
+                self.files[name] = version
+            if self.scans:  # The first scan is reported as a total by start()
+                print(f"🎵 Cue {'reloaded' if reloaded else 'added'}: {name}")
+            changed.append(name)
+
+        with self.lock:
+            for name in [name for name in self.sounds if name not in listing]:
+                del self.sounds[name]
+                del self.files[name]
+                print(f"🎵 Cue removed: {name}")
+                changed.append(name)
+            self.scans += 1
+        return changed
+
+    def __contains__(self, name):
+        with self.lock:
+            return name in self.sounds
+
+    def names(self):
+        with self.lock:
+            return sorted(self.sounds)
+
+    def play(self, name, crossfade=False, fade_ms=None):
+        """Start a cue right away, cutting off (or crossfading out of) the one playing
+
+        Returns the playing Cue, or None if there is no cue by that name.
+        """
+        triggered = time.perf_counter()
+        fade_ms = self.fade_ms if fade_ms is None else fade_ms
+        with self.lock:
+            sound = self.sounds.get(name)
+            if sound is None:
+                return None
+            previous = self.current
+            fading = crossfade and fade_ms and previous is not None and previous.playing
+            if previous is not None:
+                previous.cut()
+            # The engine alternates the bus's channels, so the outgoing cue fades while the new one starts
+            channel = self.engine.play_sound(sound, self.bus, fade_ms if fading else 0)
+            cue = Cue(name, sound, channel)
+            self.current = cue
+            self.triggers += 1
+        metrics.observe("cue_trigger", time.perf_counter() - triggered, cue=name)
+        return cue
+
+    def stop_all(self, fade_ms=0):
+        """Silence every cue"""
+        with self.lock:
+            self.engine.stop_sounds(self.bus, fade_ms)
+            if self.current is not None:
+                self.current.cut()
+                self.current = None
+
+    def summary(self):
+        with self.lock:
+            seconds = sum(sound.get_length() for sound in self.sounds.values())
+        return f"{len(self.sounds)} cue(s), {seconds:.0f}s of audio, {self.triggers} trigger(s)"
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Local stand-ins for the OpenAI and ElevenLabs APIs
+
+Both servers answer the endpoints the director uses, with configurable
+latency and jitter, canned bilingual directions and canned audio. Point
+the clients at them with OPENAI_BASE_URL and ELEVENLABS_BASE_URL to run
+the director with no network and no API cost.
+
+Run standalone:
+    python fake_servers.py --openai-port 8801 --elevenlabs-port 8802 --latency 1.5
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+CANNED_DIRECTIONS = [
+    ('I see a body. This is now my body. <break time="2s" />\n'
+     "Let your spine unspool like smoke leaving a cold room.\n"
+     "차가운 방을 떠나는 연기처럼 척추를 풀어라.\n"
+     '<break time="8s" /> This is good. Good body.'),
+    ('I see a body. This is now my body. <break time="2s" />\n'
+     "Press your palms into the air as if it were a wall you once loved.\n"
+     "한때 사랑했던 벽인 것처럼 손바닥으로 공기를 밀어라.\n"
+     '<break time="8s" /> This is good. Good body.'),
+    ('I see a body. This is now my body. <break time="2s" />\n'
+     "Fold at the waist and let your breath fall to the floor before you do.\n"
+     "허리를 접고, 네 숨이 먼저 바닥에 떨어지게 하라.\n"
+     '<break time="8s" /> This is good. Good body.'),
+]
+
+# A silent MPEG-1 Layer III frame (128 kbps, 44.1 kHz): valid MP3 that decodes to silence
+SILENT_MP3_FRAME = bytes([0xFF, 0xFB, 0x90, 0x64]) + bytes(413)
+
+
+class LatencyModel:
+    """Base latency plus uniform jitter, in seconds"""
+
+    def __init__(self, latency=1.0, jitter=0.3):
+        self.latency = latency
+        self.jitter = jitter
+
+    def sample(self):
+        return max(0.0, self.latency + random.uniform(-self.jitter, self.jitter))
+
+    def wait(self):
+        time.sleep(self.sample())
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def handle(self):
+        try:
+            super().handle()
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Client went away, e.g. a benchmark run ending mid-request
+
+    def do_HEAD(self):
+        # Connection warm-up
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def read_json(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        try:
+            return json.loads(body or b"{}")
+        except ValueError:
+            return {}
+
+    def send_json(self, payload, status=200):
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def start_chunked(self, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+
+    def write_chunk(self, data):
+        self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+        self.wfile.flush()
+
+    def end_chunked(self):
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+
+class FakeOpenAIServer:
+    """Answers /v1/chat/completions (streaming and non-streaming) with canned directions"""
+
+    def __init__(self, port=0, latency=1.5, jitter=0.5, token_interval=0.02,
+                 directions=None, host="127.0.0.1"):
+        self.first_token = LatencyModel(latency, jitter)
+        self.token_interval = token_interval  # Seconds between streamed tokens
+        self.directions = directions or CANNED_DIRECTIONS
+        self.requests = 0
+        server = self
+
+        class Handler(_Handler):
+            def do_POST(self):
+                if not urlparse(self.path).path.endswith("/chat/completions"):
+                    self.send_json({"error": {"message": "not found"}}, 404)
+                    return
+                request = self.read_json()
+                server.requests += 1
+                text = server.directions[(server.requests - 1) % len(server.directions)]
+                server.first_token.wait()
+                if request.get("stream"):
+                    server.stream_completion(self, text)
+                else:
+                    server.send_completion(self, text)
+
+            def do_GET(self):
+                # Model listing and lookup, used by key validation
+                model = {"id": "gpt-4o", "object": "model", "created": 0, "owned_by": "fake"}
+                if urlparse(self.path).path.rstrip("/").endswith("/models"):
+                    self.send_json({"object": "list", "data": [model]})
+                else:
+                    self.send_json(model)
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.base_url = f"http://{host}:{self.port}/v1"
+
+    def _envelope(self, kind):
+        return {"id": f"chatcmpl-fake{self.requests}", "object": kind,
+                "created": int(time.time()), "model": "gpt-4o"}
+
+    def _usage(self, text):
+        return {"prompt_tokens": 1200, "completion_tokens": len(text) // 4,
+                "total_tokens": 1200 + len(text) // 4}
+
+    def send_completion(self, handler, text):
+        payload = self._envelope("chat.completion")
+        payload["choices"] = [{"index": 0, "message": {"role": "assistant", "content": text},
+                               "finish_reason": "stop"}]
+        payload["usage"] = self._usage(text)
+        handler.send_json(payload)
+
+    def stream_completion(self, handler, text):
+        handler.start_chunked("text/event-stream")
+        tokens = [text[i:i + 4] for i in range(0, len(text), 4)]
+        for i, token in enumerate(tokens):
+            chunk = self._envelope("chat.completion.chunk")
+            delta = {"content": token} if i else {"role": "assistant", "content": token}
+            chunk["choices"] = [{"index": 0, "delta": delta, "finish_reason": None}]
+            try:
+                handler.write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8"))
+            except (BrokenPipeError, ConnectionResetError):
+                return  # Client cancelled the stream
+            time.sleep(self.token_interval)
+        final = self._envelope("chat.completion.chunk")
+        final["choices"] = []
+        final["usage"] = self._usage(text)
+        handler.write_chunk(f"data: {json.dumps(final)}\n\n".encode("utf-8"))
+        handler.write_chunk(b"data: [DONE]\n\n")
+        handler.end_chunked()
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fake-openai", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+class FakeElevenLabsServer:
+    """Answers /v1/text-to-speech/{voice_id}[/stream] with canned audio"""
+
+    def __init__(self, port=0, latency=0.4, jitter=0.15, chars_per_second=15.0,
+                 realtime_factor=4.0, host="127.0.0.1"):
+        self.first_byte = LatencyModel(latency, jitter)
+        self.chars_per_second = chars_per_second  # Speaking rate used to size the audio
+        self.realtime_factor = realtime_factor  # How much faster than real time audio is sent
+        self.requests = 0
+        self.characters = 0
+        server = self
+
+        class Handler(_Handler):
+            def do_POST(self):
+                url = urlparse(self.path)
+                if "/text-to-speech/" not in url.path:
+                    self.send_json({"detail": "not found"}, 404)
+                    return
+                request = self.read_json()
+                output_format = parse_qs(url.query).get("output_format", ["mp3_44100_128"])[0]
+                text = request.get("text", "")
+                server.requests += 1
+                server.characters += len(text)
+                server.first_byte.wait()
+                server.send_audio(self, text, output_format)
+
+            def do_GET(self):
+                # Voice listing, used by key validation
+                self.send_json({"voices": [{"voice_id": "21m00Tcm4TlvDq8ikWAM", "name": "Fake Rachel"}]})
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.port = self.httpd.server_address[1]
+        self.base_url = f"http://{host}:{self.port}"
+
+    def render(self, text, output_format):
+        """Canned audio for a piece of text: a quiet tone for PCM, silent frames for MP3"""
+        seconds = max(0.3, len(text) / self.chars_per_second)
+        if output_format.startswith("pcm_"):
+            rate = int(output_format.split("_")[1])
+            t = np.arange(int(rate * seconds)) / rate
+            return (np.sin(2 * np.pi * 220 * t) * 1500).astype("<i2").tobytes()
+        frames = int(seconds * 44100 / 1152)
+        return SILENT_MP3_FRAME * max(1, frames)
+
+    def send_audio(self, handler, text, output_format):
+        audio = self.render(text, output_format)
+        content_type = "audio/mpeg" if output_format.startswith("mp3") else "application/octet-stream"
+        handler.start_chunked(content_type)
+        chunk_size = 4096
+        bytes_per_second = len(audio) / max(0.3, len(text) / self.chars_per_second)
+        try:
+            for i in range(0, len(audio), chunk_size):
+                handler.write_chunk(audio[i:i + chunk_size])
+                time.sleep(chunk_size / bytes_per_second / self.realtime_factor)
+            handler.end_chunked()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+    def start(self):
+        threading.Thread(target=self.httpd.serve_forever, name="fake-elevenlabs", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run fake OpenAI and ElevenLabs servers")
+    parser.add_argument("--openai-port", type=int, default=8801)
+    parser.add_argument("--elevenlabs-port", type=int, default=8802)
+    parser.add_argument("--latency", type=float, default=1.5, help="OpenAI time to first token (s)")
+    parser.add_argument("--jitter", type=float, default=0.5, help="OpenAI latency jitter (s)")
+    parser.add_argument("--tts-latency", type=float, default=0.4, help="ElevenLabs time to first byte (s)")
+    parser.add_argument("--tts-jitter", type=float, default=0.15, help="ElevenLabs latency jitter (s)")
+    args = parser.parse_args()
+
+    openai_server = FakeOpenAIServer(args.openai_port, args.latency, args.jitter).start()
+    elevenlabs_server = FakeElevenLabsServer(args.elevenlabs_port, args.tts_latency, args.tts_jitter).start()
+    print("🧪 Fake APIs running. Use:")
+    print(f"  OPENAI_BASE_URL={openai_server.base_url}")
+    print(f"  ELEVENLABS_BASE_URL={elevenlabs_server.base_url}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        openai_server.stop()
+        elevenlabs_server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""
+Local fallback directions for when the APIs miss their deadline
+
+Every live cycle has a latency budget: GPT-4o must produce its first
+sentence within `llm_budget` seconds of the analysis being triggered, and
+ElevenLabs must deliver the first audio of each line within `tts_budget`
+seconds of the request. When a call misses its deadline the director plays
+a pre-rendered bilingual direction from a local bank instead of going
+silent, picked by cheap scene features (how much the performer is moving
+and how many people are in frame).
+
+Late results are not thrown away: a late GPT-4o direction is synthesized
+in the background and becomes the first choice for the next fallback, and
+late speech lands in the TTS cache as usual.
+
+The bank is a directory with a manifest.json:
+
+    {"version": 1, "directions": [
+        {"id": "spine-smoke", "text": "Let your spine unspool...\\n척추를...",
+         "audio": "spine-smoke.mp3", "motion": "still", "people": "one"}, ...]}
+
+`motion` is "still", "moving" or "any"; `people` is "none", "one",
+"group" or "any". Entries without audio can only stand in for GPT-4o.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+import pygame
+
+MANIFEST = "manifest.json"
+MOTION_LEVELS = ("still", "moving")
+PEOPLE_LEVELS = ("none", "one", "group")
+SPEAKING_POLL = 0.05  # Seconds between checks of whether the speaker is still busy
+
+
+def scene_features(frames, gate=None, pixel_threshold=25, analysis_width=160):
+    """Motion level (fraction of changed pixels) and person count for a raw frame batch
+
+    Reuses what the SceneGate measured when there is one; otherwise motion
+    is measured across the batch and the person count is unknown (None).
+    """
+    if gate is not None:
+        return {"motion": gate.last_motion,
+                "people": gate.last_people if gate.require_person else None}
+    if len(frames) < 2:
+        return {"motion": 0.0, "people": None}
+    grays = []
+    for frame in (frames[0], frames[-1]):
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (analysis_width, max(1, height * analysis_width // width)),
+                           interpolation=cv2.INTER_AREA)
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        grays.append(small.astype(np.int16))
+    changed = np.count_nonzero(np.abs(grays[1] - grays[0]) > pixel_threshold)
+    return {"motion": changed / grays[0].size, "people": None}
+
+
+class FallbackDirection:
+    """One bank entry; `samples` is its decoded audio, or None for text only"""
+
+    def __init__(self, id, text, audio=None, motion="any", people="any"):
+        self.id = id
+        self.text = text
+        self.audio = audio
+        self.motion = motion
+        self.people = people
+        self.samples = None
+        self.last_used = 0.0
+
+
+class FallbackBank:
+    """Pre-rendered directions, latency budgets and fallback/budget-miss counters"""
+
+    def __init__(self, directory="fallback_bank", llm_budget=6.0, tts_budget=2.5,
+                 still_threshold=0.02, late_ttl=120.0, max_late=4):
+        self.directory = directory
+        self.llm_budget = llm_budget  # Seconds from the call to GPT-4o's first sentence (None = no limit)
+        self.tts_budget = tts_budget  # Seconds from TTS request to first audio (None = no limit)
+        self.still_threshold = still_threshold  # Motion below this counts as "still"
+        self.late_ttl = late_ttl  # Late live directions older than this are not used
+        self.entries = []
+        self.late = deque(maxlen=max_late)  # (text, speech, kept_at) of late GPT-4o directions
+        self.pending_call = None  # GPT-4o call still running after missing its deadline
+        self.lock = threading.Lock()
+        self.started = False
+
+        self.cycles = 0  # Live cycles that were held to a budget
+        self.fallbacks = 0
+        self.llm_misses = 0
+        self.tts_misses = 0
+        self.late_kept = 0
+        self.late_used = 0
+
+    def start(self):
+        """Load the manifest and decode every entry's audio into memory"""
+        with self.lock:
+            if self.started:
+                return
+            self.started = True
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                manifest = json.load(f)
+        except FileNotFoundError:
+            print(f"⚠️  No fallback bank at {path}; only late live directions can stand in for slow APIs")
+            return
+        except (OSError, ValueError) as e:
+            print(f"⚠️  Could not read fallback bank {path}: {e}")
+            return
+
+        entries = []
+        for record in manifest.get("directions", []):
+            if not record.get("text"):
+                continue
+            entry = FallbackDirection(record.get("id") or record["text"][:24], record["text"],
+                                      record.get("audio"), record.get("motion", "any"),
+                                      record.get("people", "any"))
+            if entry.audio:
+                try:
+                    sound = pygame.mixer.Sound(os.path.join(self.directory, entry.audio))
+                    entry.samples = pygame.sndarray.array(sound)
+                except (pygame.error, OSError) as e:
+                    print(f"⚠️  Could not load fallback audio {entry.audio}: {e}")
+            entries.append(entry)
+        with self.lock:
+            self.entries = entries
+        voiced = sum(1 for entry in entries if entry.samples is not None)
+        print(f"🛟 Fallback bank: {len(entries)} direction(s), {voiced} with audio, from {self.directory}/")
+
+    def share(self):
+        """A bank for another camera feed: the same entries and budgets, its own late directions and counters"""
+        self.start()
+        bank = FallbackBank(self.directory, self.llm_budget, self.tts_budget, self.still_threshold,
+                            self.late_ttl, self.late.maxlen)
+        # Shared, so feeds also rotate through them least recently used first; the lock
+        # that guards their last_used goes with them (and also covers each bank's own state)
+        bank.entries = self.entries
+        bank.lock = self.lock
+        bank.started = True
+        return bank
+
+    def classify(self, features):
+        """("still" | "moving" | None, "none" | "one" | "group" | None) for scene features"""
+        if not features:
+            return None, None
+        motion = features.get("motion")
+        people = features.get("people")
+        motion = None if motion is None else ("still" if motion < self.still_threshold else "moving")
+        if people is not None:
+            people = PEOPLE_LEVELS[min(people, 2)]
+        return motion, people
+
+    def choose(self, features=None, need_audio=False):
+        """Best-matching entry for the scene, least recently used first; None if the bank is empty"""
+        motion, people = self.classify(features)
+        best, best_score = None, None
+        with self.lock:
+            for entry in self.entries:
+                if need_audio and entry.samples is None:
+                    continue
+                if (motion and entry.motion not in ("any", motion)) or (
+                        people and entry.people not in ("any", people)):
+                    continue
+                # Exact matches beat "any"; then the one heard longest ago
+                score = ((motion is not None and entry.motion == motion)
+                         + (people is not None and entry.people == people), -entry.last_used)
+                if best_score is None or score > best_score:
+                    best, best_score = entry, score
+            if best is not None:
+                best.last_used = time.time()
+        return best
+
+    # Late results
+
+    def keep_late(self, text, speech=None):
+        """Keep a GPT-4o direction that arrived after its deadline, with its speech if prerendering"""
+        with self.lock:
+            self.late.append((text, speech, time.time()))
+            self.late_kept += 1
+        print("⏰ Late direction kept for the next fallback")
+
+    def take_late(self):
+        """Newest late direction whose speech has finished rendering, or None"""
+        now = time.time()
+        with self.lock:
+            for i in range(len(self.late) - 1, -1, -1):
+                text, speech, kept_at = self.late[i]
+                if now - kept_at > self.late_ttl:
+                    continue
+                if speech is not None and (speech.finished_at is None or speech.error):
+                    continue
+                del self.late[i]
+                self.late_used += 1
+                return text
+        return None
+
+    def call_pending(self):
+        """Whether a late GPT-4o call is still running (no new call is made meanwhile)"""
+        return self.pending_call is not None and self.pending_call.is_alive()
+
+    # Deadlines
+
+    def llm_deadline(self, started_at):
+        """When a GPT-4o call started at `started_at` must have its first line"""
+        return None if self.llm_budget is None else started_at + self.llm_budget
+
+    def tts_in_time(self, speech, speaking=None):
+        """Wait for the first audio of a streamed line until its deadline; False on a miss
+
+        `speaking()` says whether earlier audio is still playing. Audio that
+        arrives before the speaker is free leaves no silence, so the line
+        only misses once the speaker is free and its budget has passed.
+        """
+        if self.tts_budget is None:
+            return True
+        while speaking is not None and speaking():
+            if speech.wait_first_byte(SPEAKING_POLL):
+                break
+        remaining = speech.requested_at + self.tts_budget - time.time()
+        # Speech that ended without any audio (the request failed) is a miss too
+        if speech.wait_first_byte(max(0.0, remaining)) and speech.first_byte_at is not None:
+            return True
+        with self.lock:
+            self.tts_misses += 1
+        return False
+
+    def llm_missed(self):
+        with self.lock:
+            self.llm_misses += 1
+
+    def used(self):
+        with self.lock:
+            self.fallbacks += 1
+
+    def cycle(self):
+        with self.lock:
+            self.cycles += 1
+
+    def fallback_rate(self):
+        return self.fallbacks / self.cycles if self.cycles else 0.0
+
+    def summary(self):
+        text = (f"{self.fallbacks} fallback(s) in {self.cycles} live cycle(s) "
+                f"({self.fallback_rate():.0%}), budget misses: {self.llm_misses} GPT-4o, "
+                f"{self.tts_misses} TTS")
+        if self.late_kept:
+            text += f", {self.late_kept} late direction(s) kept, {self.late_used} used"
+        return text
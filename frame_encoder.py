@@ -0,0 +1,111 @@
+"""
+Frame encoding for GPT-4o vision requests
+
+Upload size and image-token cost are set here: target resolution, JPEG
+quality, optional grayscale, and optionally tiling the whole batch into a
+single mosaic image so the per-image overhead is paid once.
+"""
+
+import base64
+import math
+
+import cv2
+import numpy as np
+
+
+def image_tokens(width, height, detail="auto"):
+    """Estimate GPT-4o vision tokens for one image, following OpenAI's published formula"""
+    if detail == "low":
+        return 85
+    # Fit inside 2048x2048, then scale the shortest side down to 768
+    scale = min(1.0, 2048 / max(width, height))
+    width, height = width * scale, height * scale
+    scale = min(1.0, 768 / min(width, height))
+    width, height = width * scale, height * scale
+    tiles = math.ceil(width / 512) * math.ceil(height / 512)
+    return 170 * tiles + 85
+
+
+class FrameEncoder:
+    """Turn raw BGR frames into base64 JPEGs sized for the vision model"""
+
+    def __init__(self, max_width=512, jpeg_quality=70, grayscale=False, mosaic=False,
+                 mosaic_columns=None, detail="auto"):
+        self.max_width = max_width  # Width of every uploaded image (the whole mosaic when tiling)
+        self.jpeg_quality = jpeg_quality
+        self.grayscale = grayscale
+        self.mosaic = mosaic
+        self.mosaic_columns = mosaic_columns  # Default: roughly square grid
+        self.detail = detail  # "low", "high" or "auto"
+
+        self.last_bytes = 0
+        self.last_tokens = 0
+        self.total_bytes = 0
+        self.total_tokens = 0
+        self.requests = 0
+
+    def _resize(self, frame, width):
+        height, current_width = frame.shape[:2]
+        if current_width == width:
+            return frame
+        interpolation = cv2.INTER_AREA if width < current_width else cv2.INTER_LINEAR
+        return cv2.resize(frame, (width, max(1, round(height * width / current_width))),
+                          interpolation=interpolation)
+
+    def _tile(self, frames):
+        """Lay frames out left-to-right, top-to-bottom in one image"""
+        columns = self.mosaic_columns or math.ceil(math.sqrt(len(frames)))
+        rows = math.ceil(len(frames) / columns)
+        tile_width = max(1, self.max_width // columns)
+        tiles = [self._resize(frame, tile_width) for frame in frames]
+        tile_height = max(tile.shape[0] for tile in tiles)
+
+        mosaic = np.zeros((rows * tile_height, columns * tile_width) + tiles[0].shape[2:],
+                          dtype=tiles[0].dtype)
+        for i, tile in enumerate(tiles):
+            row, column = divmod(i, columns)
+            y, x = row * tile_height, column * tile_width
+            mosaic[y:y + tile.shape[0], x:x + tile.shape[1]] = tile
+        return mosaic
+
+    def encode(self, frames):
+        """Encode a batch of frames and return a list of base64 JPEG strings"""
+        if self.grayscale:
+            frames = [cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+                      for frame in frames]
+
+        if self.mosaic and len(frames) > 1:
+            images = [self._tile(frames)]
+        else:
+            images = [frame if frame.shape[1] <= self.max_width else self._resize(frame, self.max_width)
+                      for frame in frames]
+
+        encoded = []
+        self.last_bytes = 0
+        self.last_tokens = 0
+        for image in images:
+            _, buffer = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+            encoded.append(base64.b64encode(buffer).decode("utf-8"))
+            self.last_bytes += len(encoded[-1])
+            self.last_tokens += image_tokens(image.shape[1], image.shape[0], self.detail)
+
+        self.total_bytes += self.last_bytes
+        self.total_tokens += self.last_tokens
+        self.requests += 1
+        return encoded
+
+    def content_parts(self, images):
+        """Chat message content parts for a list of base64 JPEGs"""
+        return [
+            {
+                "type": "image_url",
+                "image_url": {"url": f"data:image/jpeg;base64,{image}", "detail": self.detail},
+            }
+            for image in images
+        ]
+
+    def summary(self):
+        """One-line upload summary"""
+        average = self.total_bytes / self.requests / 1024 if self.requests else 0
+        return (f"{self.requests} request(s), {self.total_bytes / 1024:.1f} KB uploaded "
+                f"({average:.1f} KB/request), ~{self.total_tokens} image tokens")
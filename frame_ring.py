@@ -0,0 +1,95 @@
+"""
+Preallocated ring buffer of raw camera frames
+
+The capture loop copies sampled frames into fixed slots of one NumPy array,
+so no memory is allocated per frame. Nothing is encoded until an analysis
+actually fires; at that point the sharpest, most distinct frames in the
+window are picked for GPT-4o.
+"""
+
+import threading
+
+import cv2
+import numpy as np
+
+
+class FrameRing:
+    """Fixed-size window of the most recent raw frames"""
+
+    def __init__(self, capacity, score_width=320, motion_weight=0.5):
+        self.capacity = capacity
+        self.score_width = score_width  # Frames are scored on a small grayscale copy
+        self.motion_weight = motion_weight  # How much distinct movement counts next to sharpness
+        self.frames = None  # Allocated on the first push, once the camera's frame size is known
+        self.timestamps = np.zeros(capacity)
+        self.selected = None
+        self.pushed = 0
+        self.lock = threading.Lock()
+
+    def push(self, frame, timestamp):
+        """Copy a frame into the next slot, overwriting the oldest one"""
+        with self.lock:
+            if self.frames is None:
+                self.frames = np.empty((self.capacity,) + frame.shape, dtype=frame.dtype)
+            slot = self.pushed % self.capacity
+            if frame.shape == self.frames.shape[1:]:
+                np.copyto(self.frames[slot], frame)
+            else:
+                height, width = self.frames.shape[1:3]
+                cv2.resize(frame, (width, height), dst=self.frames[slot])
+            self.timestamps[slot] = timestamp
+            self.pushed += 1
+
+    def __len__(self):
+        return min(self.pushed, self.capacity)
+
+    def _ordered_slots(self, newest=None):
+        """Slot indices from oldest to newest, optionally only the newest n"""
+        count = len(self) if newest is None else min(newest, len(self))
+        start = self.pushed - count
+        return [(start + i) % self.capacity for i in range(count)]
+
+    def _small_gray(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.score_width:
+            frame = cv2.resize(frame, (self.score_width, int(height * self.score_width / width)),
+                               interpolation=cv2.INTER_AREA)
+        if frame.ndim == 3:
+            frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        return frame
+
+    def scores(self, slots):
+        """Blur score (Laplacian variance) and motion against the previous frame for each slot"""
+        grays = [self._small_gray(self.frames[slot]) for slot in slots]
+        sharpness = np.array([cv2.Laplacian(gray, cv2.CV_64F).var() for gray in grays])
+        motion = np.zeros(len(grays))
+        for i in range(1, len(grays)):
+            motion[i] = cv2.absdiff(grays[i], grays[i - 1]).mean()
+        if len(grays) > 1:
+            motion[0] = motion[1]
+        return sharpness, motion
+
+    def select(self, k, candidates=None):
+        """Return the best k of the newest `candidates` frames in capture order, plus the newest timestamp
+
+        The returned frames are views into a reused selection buffer and stay
+        valid until the next call to select().
+        """
+        with self.lock:
+            slots = self._ordered_slots(candidates)
+            if not slots:
+                return [], 0.0
+            if len(slots) > k:
+                sharpness, motion = self.scores(slots)
+                score = (sharpness / (sharpness.max() or 1.0)
+                         + self.motion_weight * motion / (motion.max() or 1.0))
+                best = sorted(np.argsort(score)[-k:])
+                slots = [slots[i] for i in best]
+
+            if self.selected is None or len(self.selected) < len(slots):
+                self.selected = np.empty((max(k, len(slots)),) + self.frames.shape[1:],
+                                         dtype=self.frames.dtype)
+            for i, slot in enumerate(slots):
+                np.copyto(self.selected[i], self.frames[slot])
+            newest = float(self.timestamps[slots[-1]])
+            return [self.selected[i] for i in range(len(slots))], newest
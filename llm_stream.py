@@ -0,0 +1,107 @@
+"""
+Sentence splitting for streamed GPT-4o output
+
+Text arrives from the chat completion stream a few characters at a time.
+`SentenceSplitter` hands back each sentence or structural line as soon as
+it is complete, so it can go to TTS while the rest is still generating.
+Ritual phrases are kept whole so they still hit the TTS cache. Nothing is
+handed back until the opening of the response has been checked for
+refusal words, since a refusal doesn't always start with one.
+"""
+
+import re
+
+from tts_cache import BREAK_PATTERN, LIST_NUMBER_PATTERN, RITUAL_PHRASES
+
+SENTENCE_ENDINGS = ".!?。"
+SENTENCE_CLOSERS = "\"'”’)]」』"  # May follow a sentence ending, e.g. ."
+OPENING_CHARS = 64  # Text checked for refusals before the first segment is released
+
+REFUSAL_WORDS = ["sorry", "can't", "cannot", "unable", "apologize", "apologies"]
+
+
+def contains_refusal(text):
+    """Check whether (possibly partial) text contains refusal or apologetic words"""
+    text_lower = text.lower()
+    return any(word in text_lower for word in REFUSAL_WORDS)
+
+
+def _normalize(text):
+    text = LIST_NUMBER_PATTERN.sub("", BREAK_PATTERN.sub(" ", text).strip())
+    return " ".join(text.strip('"“” ').split()).lower()
+
+
+def _is_ritual_prefix(text):
+    """True while the pending text could still grow into a ritual phrase"""
+    normalized = _normalize(text)
+    if not normalized:
+        return False
+    return any(phrase.lower().startswith(normalized) and phrase.lower() != normalized
+               for phrase in RITUAL_PHRASES)
+
+
+def _is_speakable(text):
+    return bool(re.search(r"\w", LIST_NUMBER_PATTERN.sub("", text))) or bool(BREAK_PATTERN.search(text))
+
+
+class SentenceSplitter:
+    """Accumulate streamed text and emit complete sentences and lines"""
+
+    def __init__(self, opening=OPENING_CHARS):
+        self.pending = ""
+        self.opening = opening
+        self.opened = not opening  # The opening has been checked and segments can go out
+        self.refused = False  # Refusal words showed up in the opening; nothing is emitted
+
+    def feed(self, delta):
+        """Add streamed text and return any segments that are now complete"""
+        self.pending += delta
+        if self.refused:
+            return []
+        if not self.opened:
+            if contains_refusal(self.pending):
+                self.refused = True
+                return []
+            if len(self.pending) < self.opening:
+                return []
+            self.opened = True
+        segments = []
+        start = 0
+        i = 0
+        while i < len(self.pending):
+            char = self.pending[i]
+            boundary = None
+            if char == "\n":
+                boundary = i + 1
+            elif char in SENTENCE_ENDINGS:
+                end = i + 1
+                while end < len(self.pending) and self.pending[end] in SENTENCE_CLOSERS:
+                    end += 1
+                if end < len(self.pending) and self.pending[end].isspace():
+                    boundary = end
+
+            if boundary is not None:
+                segment = self.pending[start:boundary]
+                # Don't cut inside a <break/> tag or in the middle of a ritual phrase
+                inside_tag = segment.rfind("<") > segment.rfind(">")
+                if not inside_tag and (char == "\n" or not _is_ritual_prefix(segment)):
+                    if _is_speakable(segment):
+                        segments.append(segment.strip())
+                    start = boundary
+            i += 1
+
+        self.pending = self.pending[start:]
+        return segments
+
+    def flush(self):
+        """Return whatever is left once the stream has finished"""
+        if not self.opened and not self.refused:
+            # A response shorter than the opening is checked as a whole
+            self.refused = contains_refusal(self.pending)
+            self.opened = True
+        if self.refused:
+            self.pending = ""
+            return []
+        segments = self.feed("")
+        segment, self.pending = self.pending.strip(), ""
+        return segments + [segment] if _is_speakable(segment) else segments
@@ -0,0 +1,204 @@
+"""
+Per-stage latency instrumentation for the AI Director
+
+Stages record spans (capture, encode, OpenAI request, time to first token,
+TTS request, time to first audio byte, playback, ...). Recent samples are
+kept per span for p50/p95, and the data can go out three ways: appended to
+a JSONL file, served as Prometheus text on a local port, and drawn on the
+preview window. Listeners (e.g. the session archive) get every sample too.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import cv2
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Metrics:
+    """Span timings, counters and gauges shared by all pipeline stages"""
+
+    def __init__(self, window=500):
+        self.window = window  # Samples kept per span for percentiles
+        self.samples = {}
+        self.counts = {}
+        self.sums = {}
+        self.counters = {}
+        self.gauges = {}
+        self.lock = threading.Lock()
+        self.jsonl = None
+        self.server = None
+        self.listeners = []
+
+    def observe(self, span, seconds, **fields):
+        """Record one timing sample for a span"""
+        with self.lock:
+            if span not in self.samples:
+                self.samples[span] = deque(maxlen=self.window)
+                self.counts[span] = 0
+                self.sums[span] = 0.0
+            self.samples[span].append(seconds)
+            self.counts[span] += 1
+            self.sums[span] += seconds
+            record = None
+            if self.jsonl is not None or self.listeners:
+                record = {"ts": round(time.time(), 3), "span": span, "seconds": round(seconds, 4)}
+                record.update(fields)
+            if self.jsonl is not None:
+                self.jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            listeners = list(self.listeners)
+        for listener in listeners:
+            listener(record)
+
+    @contextmanager
+    def span(self, name, **fields):
+        """Time the body of a with-block as one sample of `name`"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **fields)
+
+    def increment(self, name, amount=1):
+        """Add to a counter"""
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_listener(self, listener):
+        """Call `listener(record)` with every sample, as written to the JSONL file"""
+        with self.lock:
+            self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        with self.lock:
+            if listener in self.listeners:
+                self.listeners.remove(listener)
+
+    def add_gauge(self, name, read):
+        """Expose a value that is read on demand, e.g. a cache hit count"""
+        with self.lock:
+            self.gauges[name] = read
+
+    def stats(self, span):
+        """p50/p95/count for a span"""
+        with self.lock:
+            values = list(self.samples.get(span, ()))
+            count = self.counts.get(span, 0)
+        return {"count": count, "p50": percentile(values, 0.5), "p95": percentile(values, 0.95)}
+
+    def snapshot(self):
+        """Stats for every span"""
+        with self.lock:
+            spans = list(self.samples)
+        return {span: self.stats(span) for span in spans}
+
+    def open_jsonl(self, path):
+        """Append every sample to a JSONL file"""
+        with self.lock:
+            self.jsonl = open(path, "a", encoding="utf-8")
+
+    def prometheus_text(self):
+        """Render all metrics in the Prometheus text exposition format"""
+        lines = [
+            "# HELP ai_director_span_seconds Latency of each director pipeline stage",
+            "# TYPE ai_director_span_seconds summary",
+        ]
+        with self.lock:
+            spans = {span: (list(values), self.counts[span], self.sums[span])
+                     for span, values in self.samples.items()}
+            counters = dict(self.counters)
+            gauges = dict(self.gauges)
+
+        for span, (values, count, total) in sorted(spans.items()):
+            for q in (0.5, 0.95):
+                lines.append(f'ai_director_span_seconds{{span="{span}",quantile="{q}"}} '
+                             f"{percentile(values, q):.6f}")
+            lines.append(f'ai_director_span_seconds_sum{{span="{span}"}} {total:.6f}')
+            lines.append(f'ai_director_span_seconds_count{{span="{span}"}} {count}')
+
+        for name, value in sorted(counters.items()):
+            lines.append(f"# TYPE ai_director_{name}_total counter")
+            lines.append(f"ai_director_{name}_total {value}")
+
+        for name, read in sorted(gauges.items()):
+            try:
+                value = float(read())
+            except Exception:
+                continue
+            lines.append(f"# TYPE ai_director_{name} gauge")
+            lines.append(f"ai_director_{name} {value}")
+        return "\n".join(lines) + "\n"
+
+    def serve_prometheus(self, port=9108, host="127.0.0.1"):
+        """Serve /metrics on a local port from a background thread; False if the port can't be bound"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] not in ("/", "/metrics"):
+                    self.send_error(404)
+                    return
+                body = metrics.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), Handler)
+        except OSError as e:
+            print(f"⚠️  Prometheus metrics not served on port {port}: {e}")
+            return False
+        threading.Thread(target=self.server.serve_forever, name="metrics", daemon=True).start()
+        print(f"📈 Prometheus metrics at http://{host}:{port}/metrics")
+        return True
+
+    def draw_overlay(self, frame, spans=None, origin=(10, 90)):
+        """Draw p50/p95 per span on a preview frame"""
+        x, y = origin
+        snapshot = self.snapshot()
+        for span in spans or sorted(snapshot):
+            if span not in snapshot:
+                continue
+            stats = snapshot[span]
+            text = f"{span}: p50 {stats['p50'] * 1000:.0f}ms  p95 {stats['p95'] * 1000:.0f}ms"
+            cv2.putText(frame, text, (x, y), cv2.FONT_HERSHEY_SIMPLEX, 0.45, (0, 255, 255), 1)
+            y += 18
+
+    def summary(self):
+        """Multi-line p50/p95 summary for the end of a session"""
+        lines = []
+        for span, stats in sorted(self.snapshot().items()):
+            lines.append(f"  {span:<20} n={stats['count']:<5} p50 {stats['p50'] * 1000:7.0f} ms   "
+                         f"p95 {stats['p95'] * 1000:7.0f} ms")
+        return "\n".join(lines)
+
+    def close(self):
+        """Flush the JSONL file and stop the Prometheus server"""
+        with self.lock:
+            if self.jsonl is not None:
+                self.jsonl.close()
+                self.jsonl = None
+        if self.server is not None:
+            self.server.shutdown()
+            self.server = None
+
+
+# Shared instance used by every stage
+metrics = Metrics()
@@ -0,0 +1,453 @@
+#!/usr/bin/env python3
+"""
+Multi-camera, multi-performer director sessions
+
+Each camera feed gets its own director (last instruction, instruction
+count, response cache), frame ring, scene gate, cadence and pipeline, and
+speaks on its own audio bus panned to its performer's side. All feeds share
+one pool of OpenAI workers and one of ElevenLabs workers, sized and rate
+limited to the account quotas and scheduled fairly (see worker_pool.py), so
+adding a camera adds load without letting any one feed crowd out the rest.
+Every feed captures on its own thread; the main thread only draws a tiled
+preview and reads the operator's keys.
+
+    python multicam.py --cameras 0 1 --pan left right
+    python multicam.py --synthetic 3 --seconds 120 --no-preview
+"""
+
+import argparse
+import math
+import os
+import queue
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+from ai_director import (AIDirector, build_director_pipeline, check_api_keys, cue_bank, open_camera,
+                         start_archive, start_control_server, stop_archive, stop_transports,
+                         validate_api_keys, warm_connections)
+from archive import SessionArchive
+from audio_engine import PANS, audio
+from capture import CPUMeter, FrameGrabber, capture_mode
+from control import DIRECTORS, HOTKEY_HELP, LIVE_DIRECTOR, FeedControls, handle_key
+from fallback_bank import FallbackBank
+from frame_ring import FrameRing
+from metrics import metrics
+from pipeline import DropOldestQueue, start_workers, stop_workers
+from scene_gate import SceneGate
+from scheduler import CadenceScheduler
+from startup import KeyValidationCache, startup
+from tts_cache import TTSCache
+from worker_pool import WorkerPool
+
+# Concurrency and per-minute quotas of each API, shared by every feed
+API_LIMITS = {
+    "openai": {"workers": 4, "requests_per_minute": 500, "tokens_per_minute": 30000},
+    # ElevenLabs limits concurrent requests by plan; characters are a monthly quota
+    "elevenlabs": {"workers": 5, "requests_per_minute": None, "tokens_per_minute": None},
+}
+
+
+def spread_pans(count):
+    """Pan positions from left to right for `count` performers"""
+    if count == 1:
+        return [0.0]
+    return [-1.0 + 2.0 * i / (count - 1) for i in range(count)]
+
+
+class Feed:
+    """One camera with its own director, frame ring, pipeline and speech bus"""
+
+    def __init__(self, name, video, director, control, stop_event, fallback=None, gate=None,
+                 fps=0.3, frames_per_analysis=3, oversample=3, prefetch=True, max_frame_age=30.0,
+                 silence_gap=None, archive=None, low_cpu=False, preview_fps=None):
+        self.name = name
+        self.video = video
+        self.director = director
+        self.control = control
+        self.stop_event = stop_event
+        self.fallback = fallback
+        self.gate = gate
+        self.fps = fps
+        self.frames_per_analysis = frames_per_analysis
+        self.oversample = oversample
+        self.scheduler = CadenceScheduler(silence_gap) if silence_gap is not None else None
+        self.archive = archive
+        self.latest = None  # Newest frame, for the preview
+        # Grabs every frame; with low_cpu only sampled, archived and previewed ones are decoded
+        self.grabber = FrameGrabber(video, decode_all=not low_cpu, stop_event=stop_event)
+        self.preview_interval = 1.0 / preview_fps if preview_fps else None  # None: headless
+
+        max_frames = self.scheduler.max_batch if self.scheduler else frames_per_analysis
+        self.ring = FrameRing(max_frames * oversample)
+        self.trigger_queue = DropOldestQueue(maxsize=1)
+        batch_queue = DropOldestQueue(maxsize=1)
+        speech_queue = queue.Queue(maxsize=1)
+        playback_queue = queue.Queue(maxsize=4 if prefetch else 1)
+        in_flight = threading.Semaphore(2 if prefetch else 1)
+        self.workers = build_director_pipeline(director, self.ring, self.trigger_queue, batch_queue,
+                                               speech_queue, playback_queue, in_flight, stop_event,
+                                               gate, max_frame_age if prefetch else None,
+                                               self.scheduler, control, fallback)
+        for worker in self.workers:
+            worker.name = f"{name}-{worker.name}"
+        self.thread = threading.Thread(target=self.capture, name=f"{name}-capture", daemon=True)
+
+    def start(self):
+        start_workers(self.workers)
+        self.thread.start()
+
+    def stop(self):
+        stop_workers(self.workers, self.stop_event)
+        self.thread.join(timeout=2.0)
+        self.video.release()
+
+    def capture(self):
+        """Sample frames into the ring and trigger analyses at this feed's own cadence"""
+        frame_interval = 1.0 / (self.fps * self.oversample)
+        last_capture_time = 0
+        last_preview_time = 0
+        samples_since_trigger = 0
+        while not self.stop_event.is_set():
+            # Failures back off instead of spinning; the other feeds need the CPU
+            if not self.grabber.grab():
+                continue
+            current_time = time.time()
+
+            # Decode only when the frame is sampled, archived or previewed
+            if self.scheduler:
+                frame_interval = self.scheduler.capture_interval() / self.oversample
+            sample = current_time - last_capture_time >= frame_interval
+            keep = self.archive is not None and self.archive.frame_due(current_time, self.name)
+            show = (self.preview_interval is not None
+                    and current_time - last_preview_time >= self.preview_interval)
+            frame = self.grabber.retrieve() if sample or keep or show else None
+            if frame is None:
+                sample = keep = show = False
+
+            if sample:
+                self.ring.push(frame, current_time)
+                last_capture_time = current_time
+                samples_since_trigger += 1
+            if keep:
+                self.archive.frame(frame, current_time, self.name)
+            if show:
+                self.latest = frame
+                last_preview_time = current_time
+
+            if self.control.paused:
+                due = False
+                samples_since_trigger = 0
+            elif self.scheduler:
+                due = self.scheduler.should_trigger(current_time)
+                batch_frames = self.scheduler.batch_size()
+            else:
+                due = samples_since_trigger >= self.ring.capacity
+                batch_frames = self.frames_per_analysis
+            if due:
+                self.trigger_queue.put_latest({"triggered_at": current_time, "frames": batch_frames,
+                                               "candidates": batch_frames * self.oversample})
+                samples_since_trigger = 0
+
+    def summary(self, pools):
+        director = self.director
+        text = f"{director.instruction_count} direction(s)"
+        latency = metrics.stats(f"direction_latency_{self.name}")
+        if latency["count"]:
+            text += (f", frame to speech p50 {latency['p50']:.1f}s / p95 {latency['p95']:.1f}s")
+        if director.time_to_first_audio:
+            average = sum(director.time_to_first_audio) / len(director.time_to_first_audio)
+            text += f", time to first audio {average * 1000:.0f} ms"
+        for pool in pools.values():
+            text += f"; {pool.feed_summary(self.name)}"
+        if self.fallback is not None and self.fallback.fallbacks:
+            text += f"; {self.fallback.fallbacks} fallback(s)"
+        return text + f"; {self.grabber.summary()}"
+
+
+def mosaic(feeds, control, tile_width=480):
+    """All feeds' newest frames tiled into one preview image"""
+    tile_height = tile_width * 3 // 4
+    columns = math.ceil(math.sqrt(len(feeds)))
+    rows = math.ceil(len(feeds) / columns)
+    image = np.zeros((rows * tile_height, columns * tile_width, 3), dtype=np.uint8)
+    for i, feed in enumerate(feeds):
+        y, x = (i // columns) * tile_height, (i % columns) * tile_width
+        if feed.latest is not None:
+            image[y:y + tile_height, x:x + tile_width] = cv2.resize(
+                feed.latest, (tile_width, tile_height), interpolation=cv2.INTER_AREA)
+        cv2.putText(image, f"{feed.name}: {feed.director.instruction_count} instruction(s)",
+                    (x + 10, y + 25), cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
+    cv2.putText(image, control.status(), (10, image.shape[0] - 15),
+                cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 255), 1)
+    return image
+
+
+def run_multicam(sources, names=None, pans=None, fps=0.3, frames_per_analysis=3, gate=False,
+                 oversample=3, prefetch=True, max_frame_age=30.0, silence_gap=None, preview=True,
+                 duration=None, director_choice=None, control=None, control_port=None,
+                 ambience=None, fallback=None, limits=None, tts_cache=None, metrics_log=None,
+                 metrics_port=None, preview_fps=15.0, archive=None, low_cpu=False):
+    """Run one director per camera feed on shared, rate-limited API workers
+
+    `sources` are opened VideoCapture-like objects, one per performer;
+    `names` label them (default cam0, cam1, ...) and `pans` place each
+    performer's voice from -1 (left) to 1 (right), spread evenly by default.
+    `gate` gives every feed its own SceneGate. `limits` overrides API_LIMITS.
+    An `archive` records every feed, tagged with its name. `control` is a
+    FeedControls with one state per feed (made from `director_choice` if
+    not given).
+    The preview is drawn at most `preview_fps` times a second; with
+    `low_cpu` the feeds decode only the frames they sample, archive or show.
+    The other arguments are as for run_ai_director and apply to every feed.
+    Returns the feeds.
+    """
+    names = names or [f"cam{i}" for i in range(len(sources))]
+    pans = pans or spread_pans(len(sources))
+    if len(names) != len(sources) or len(pans) != len(sources):
+        raise ValueError("names and pans need one entry per source")
+    if preview and not preview_fps > 0:
+        raise ValueError("preview_fps must be above 0")
+    control = control or FeedControls(names, director_choice or LIVE_DIRECTOR)
+    fallback = FallbackBank() if fallback is None else fallback or None
+    limits = dict(API_LIMITS, **(limits or {}))
+    pools = {service: WorkerPool("OpenAI" if service == "openai" else "ElevenLabs", **settings)
+             for service, settings in limits.items()}
+    # Ritual lines are the same for every performer, so one cache serves them all
+    tts_cache = tts_cache if tts_cache is not None else TTSCache()
+
+    with startup.phase("audio"):
+        audio.start()
+    with startup.phase("cue_bank"):
+        cue_bank.start()
+    if fallback is not None:
+        with startup.phase("fallback_bank"):
+            fallback.start()
+
+    stop_event = threading.Event()
+    feeds = []
+    for i, (name, source, pan) in enumerate(zip(names, sources, pans)):
+        bus = audio.add_bus(f"speech-{name}", pan=pan).name
+        director = AIDirector(tts_cache=tts_cache, speech_bus=bus, workers=pools, feed=name)
+        feed_fallback = None
+        if fallback is not None:
+            feed_fallback = fallback if i == 0 else fallback.share()
+        feeds.append(Feed(name, source, director, control.feed(name), stop_event, feed_fallback,
+                          SceneGate() if gate else None, fps, frames_per_analysis, oversample,
+                          prefetch, max_frame_age, silence_gap, archive, low_cpu,
+                          preview_fps if preview else None))
+
+    if ambience:
+        try:
+            audio.play_ambience(ambience)
+        except Exception as e:
+            print(f"⚠️  Could not play ambience {ambience}: {e}")
+    if archive is not None:
+        start_archive(archive, [feed.director for feed in feeds], feeds=names, fps=fps,
+                      frames_per_analysis=frames_per_analysis, silence_gap=silence_gap)
+    threading.Thread(target=warm_connections, name="warm-connections", daemon=True).start()
+    with startup.phase("pipeline"):
+        for feed in feeds:
+            feed.start()
+
+    if metrics_log:
+        metrics.open_jsonl(metrics_log)
+        print(f"📈 Writing stage timings to {metrics_log}")
+    if metrics_port:
+        metrics.serve_prometheus(metrics_port)
+    control_server = start_control_server(control, control_port)
+    for feed in feeds:
+        metrics.add_gauge(f"instructions_{feed.name}", lambda feed=feed: feed.director.instruction_count)
+    for service, pool in pools.items():
+        metrics.add_gauge(f"{service}_workers_busy", lambda pool=pool: pool.busy)
+        metrics.add_gauge(f"{service}_workers_waiting", pool.waiting_count)
+
+    print(f"🎬 AI Director is ready with {len(feeds)} camera feed(s)!")
+    print("🚀 Cold start:")
+    print(startup.report())
+    for feed, pan in zip(feeds, pans):
+        print(f"📷 {feed.name}: voice panned {pan:+.1f}")
+    for pool in pools.values():
+        quota = []
+        if pool.requests is not None:
+            quota.append(f"{pool.requests.rate * 60:.0f} requests/min")
+        if pool.tokens is not None:
+            quota.append(f"{pool.tokens.rate * 60:.0f} tokens/min")
+        print(f"🧵 {pool.name}: {pool.workers} shared worker(s)"
+              + (f", {', '.join(quota)}" if quota else ""))
+    print(f"🎥 Capture: {capture_mode(low_cpu, preview, preview_fps)}")
+    print(f"🎛️  {control.status()}")
+    if preview:
+        print(f"⌨️  {HOTKEY_HELP}")
+    print("Press 'q' to stop")
+    print("-" * 40)
+
+    started_at = time.time()
+    cpu = CPUMeter()
+    try:
+        while duration is None or time.time() - started_at < duration:
+            if not preview:
+                time.sleep(0.1)
+                continue
+            cv2.imshow('AI Director: all cameras (Press Q to stop)', mosaic(feeds, control))
+            key = cv2.waitKey(max(1, int(1000 / preview_fps))) & 0xFF
+            if key == ord('q'):
+                break
+            message = handle_key(key, control, cue_bank)
+            if message:
+                print(message)
+    except KeyboardInterrupt:
+        print("\n⏹️  Director session interrupted")
+    finally:
+        stop_event.set()
+        for feed in feeds:
+            feed.stop()
+        if control_server is not None:
+            control_server.stop()
+        cue_bank.stop()
+        audio.stop_ambience()
+        if preview:
+            cv2.destroyAllWindows()
+        total = sum(feed.director.instruction_count for feed in feeds)
+        print(f"\n✅ Directors gave {total} instructions across {len(feeds)} feed(s)")
+        for feed in feeds:
+            print(f"📷 {feed.name}: {feed.summary(pools)}")
+        for pool in pools.values():
+            print(f"🧵 {pool.name} workers: {pool.summary()}")
+        print(f"🎥 Capture ({capture_mode(low_cpu, preview, preview_fps)}): whole process {cpu.percent():.1f}%")
+        print(f"💾 TTS cache: {tts_cache.summary()}")
+        print(f"🔊 Audio: {audio.summary()}")
+        stop_transports()
+        if fallback is not None:
+            for feed in feeds:
+                print(f"🛟 Fallbacks ({feed.name}): {feed.fallback.summary()}")
+        if archive is not None:
+            stop_archive(archive)
+        print("📈 Stage timings:")
+        print(metrics.summary())
+        metrics.close()
+    return feeds
+
+
+def pan_position(value):
+    """argparse type for --pan: left, center, right or a number from -1 to 1"""
+    if value in PANS:
+        return PANS[value]
+    try:
+        pan = float(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"{value!r} is not left, center, right or a number from -1 to 1")
+    if not -1.0 <= pan <= 1.0:
+        raise argparse.ArgumentTypeError(f"{value} is outside -1 to 1")
+    return pan
+
+
+def positive_float(value):
+    """argparse type for rates that must be above zero"""
+    number = float(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value}")
+    return number
+
+
+def open_cameras(indices, fast_start=True):
+    """Open every camera at once; exits if any of them can't be opened"""
+    with ThreadPoolExecutor(max_workers=len(indices), thread_name_prefix="camera-open") as executor:
+        videos = list(executor.map(lambda index: open_camera(index, fast_start), indices))
+    for index, video in zip(indices, videos):
+        if not video or not video.isOpened():
+            print(f"❌ Error: Could not open camera {index}")
+            sys.exit(1)
+    return videos
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AI Theatre Director for several cameras and performers")
+    sources = parser.add_mutually_exclusive_group(required=True)
+    sources.add_argument("--cameras", type=int, nargs="+", help="Camera indices, one per performer")
+    sources.add_argument("--sessions", nargs="+", help="Recorded sessions to replay, one per performer")
+    sources.add_argument("--synthetic", type=int, help="Number of synthetic feeds (no camera needed)")
+    parser.add_argument("--names", nargs="+", help="Feed names (default: cam0, cam1, ...)")
+    parser.add_argument("--pan", nargs="+", type=pan_position,
+                        help="Voice position per feed: left, center, right or -1..1 (default: spread out)")
+    parser.add_argument("--fps", type=float, default=0.3, help="Analyses per second per feed (default: 0.3)")
+    parser.add_argument("--frames", type=int, default=3, help="Frames per analysis (default: 3)")
+    parser.add_argument("--silence-gap", type=float,
+                        help="Adapt each feed's cadence to this many seconds of silence between directions")
+    parser.add_argument("--gate", action="store_true", help="Skip analysis when a stage is empty or still")
+    parser.add_argument("--director", type=int, default=LIVE_DIRECTOR, choices=DIRECTORS,
+                        help="Director to start with (default: 4)")
+    parser.add_argument("--seconds", type=float, help="Stop after this many seconds")
+    parser.add_argument("--no-preview", action="store_true", help="Run without the preview window")
+    parser.add_argument("--preview-fps", type=positive_float, default=15.0, help="Preview rate (default: 15)")
+    parser.add_argument("--low-cpu", action="store_true",
+                        help="Decode only the frames that are analyzed, archived or previewed")
+    parser.add_argument("--openai-workers", type=int, default=API_LIMITS["openai"]["workers"],
+                        help="Concurrent GPT-4o calls across all feeds (default: 4)")
+    parser.add_argument("--openai-rpm", type=int, default=API_LIMITS["openai"]["requests_per_minute"],
+                        help="OpenAI requests per minute quota (default: 500)")
+    parser.add_argument("--openai-tpm", type=int, default=API_LIMITS["openai"]["tokens_per_minute"],
+                        help="OpenAI tokens per minute quota (default: 30000)")
+    parser.add_argument("--tts-workers", type=int, default=API_LIMITS["elevenlabs"]["workers"],
+                        help="Concurrent ElevenLabs requests across all feeds (default: 5)")
+    parser.add_argument("--tts-rpm", type=int, help="ElevenLabs requests per minute (default: no limit)")
+    parser.add_argument("--control-port", type=int,
+                        help="Serve the HTTP/WebSocket control API on this local port, e.g. 8765")
+    parser.add_argument("--llm-budget", type=float, default=6.0,
+                        help="Seconds GPT-4o has to start a direction before a fallback plays (default: 6)")
+    parser.add_argument("--tts-budget", type=float, default=2.5,
+                        help="Seconds ElevenLabs has to start a line before a fallback plays (default: 2.5)")
+    parser.add_argument("--fallback-dir", default="fallback_bank",
+                        help="Directory with the fallback bank's manifest.json and audio")
+    parser.add_argument("--ambience", help="Audio file to loop under the session, ducked under speech and cues")
+    parser.add_argument("--metrics-log", help="Append stage timings to this JSONL file")
+    parser.add_argument("--metrics-port", type=int, help="Serve Prometheus metrics on this local port")
+    parser.add_argument("--archive", help="Record the show to this archive directory (see archive.py)")
+    args = parser.parse_args()
+    feeds = len(args.cameras or args.sessions or []) or args.synthetic
+    if args.names and len(args.names) != feeds:
+        parser.error(f"--names needs one name per feed ({feeds})")
+    if args.pan and len(args.pan) != feeds:
+        parser.error(f"--pan needs one position per feed ({feeds})")
+
+    check_api_keys()
+    with startup.phase("key_validation"):
+        valid = validate_api_keys(KeyValidationCache(), fast=True)
+    if not valid:
+        sys.exit(1)
+
+    if args.cameras:
+        videos = open_cameras(args.cameras)
+        names = args.names or [f"cam{index}" for index in args.cameras]
+    else:
+        from replay import ReplaySource, SyntheticSource
+        if args.sessions:
+            videos = [ReplaySource(path) for path in args.sessions]
+            names = args.names or [os.path.splitext(os.path.basename(path))[0] for path in args.sessions]
+        else:
+            videos = [SyntheticSource() for _ in range(args.synthetic)]
+            names = args.names
+
+    limits = {
+        "openai": {"workers": args.openai_workers, "requests_per_minute": args.openai_rpm,
+                   "tokens_per_minute": args.openai_tpm},
+        "elevenlabs": {"workers": args.tts_workers, "requests_per_minute": args.tts_rpm,
+                       "tokens_per_minute": None},
+    }
+    print(f"\n🎬 Starting AI Director session with {len(videos)} feed(s)...")
+    run_multicam(videos, names, args.pan, fps=args.fps, frames_per_analysis=args.frames, gate=args.gate,
+                 silence_gap=args.silence_gap, preview=not args.no_preview, duration=args.seconds,
+                 preview_fps=args.preview_fps, low_cpu=args.low_cpu,
+                 director_choice=args.director, control_port=args.control_port,
+                 ambience=args.ambience, limits=limits, metrics_log=args.metrics_log,
+                 metrics_port=args.metrics_port,
+                 archive=SessionArchive(args.archive) if args.archive else None,
+                 fallback=FallbackBank(args.fallback_dir, args.llm_budget, args.tts_budget))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Staged worker pipeline used by the AI Director
+
+Each stage runs on its own thread and talks to the next one through a
+bounded queue, so a slow stage (GPT-4o, ElevenLabs, audio playback) never
+blocks the camera loop.
+"""
+
+import queue
+import threading
+import types
+
+
+class DropOldestQueue(queue.Queue):
+    """Bounded queue that drops the oldest item instead of blocking the producer"""
+
+    def __init__(self, maxsize=1):
+        super().__init__(maxsize=maxsize)
+        self.dropped = 0
+
+    def put_latest(self, item):
+        """Put an item, discarding stale items if the queue is full"""
+        while True:
+            try:
+                self.put_nowait(item)
+                return
+            except queue.Full:
+                try:
+                    self.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def clear(self):
+        """Discard everything currently waiting in the queue"""
+        while True:
+            try:
+                self.get_nowait()
+            except queue.Empty:
+                return
+
+
+class StageWorker(threading.Thread):
+    """Thread that pulls items from an inbox, processes them and pushes results downstream
+
+    `handler(item)` may return None (nothing to forward), a single item, a
+    list of items, or a generator that yields items as they become ready.
+    Results are put on the outbox with a blocking put, so a full downstream
+    queue applies backpressure to this stage.
+    """
+
+    def __init__(self, name, handler, inbox, outbox=None, stop_event=None, gate=None, poll_interval=0.1):
+        super().__init__(name=name, daemon=True)
+        self.handler = handler
+        self.inbox = inbox
+        self.outbox = outbox
+        self.stop_event = stop_event or threading.Event()
+        # Optional semaphore acquired before taking an item; whoever finishes
+        # the work downstream is responsible for releasing it
+        self.gate = gate
+        self.poll_interval = poll_interval
+        self.processed = 0
+
+    def run(self):
+        while not self.stop_event.is_set():
+            if self.gate is not None and not self.gate.acquire(timeout=self.poll_interval):
+                continue
+            try:
+                item = self.inbox.get(timeout=self.poll_interval)
+            except queue.Empty:
+                if self.gate is not None:
+                    self.gate.release()
+                continue
+
+            try:
+                result = self.handler(item)
+                if isinstance(result, types.GeneratorType):
+                    # Forward each item as soon as the handler produces it
+                    for out in result:
+                        if self.outbox is not None:
+                            self.forward(out)
+                elif result is not None and self.outbox is not None:
+                    for out in result if isinstance(result, list) else [result]:
+                        self.forward(out)
+            except Exception as e:
+                print(f"❌ Error in {self.name} stage: {e}")
+                continue
+            self.processed += 1
+
+    def forward(self, item):
+        """Block until the downstream stage has room, unless we are shutting down"""
+        if isinstance(self.outbox, DropOldestQueue):
+            self.outbox.put_latest(item)
+            return True
+        while not self.stop_event.is_set():
+            try:
+                self.outbox.put(item, timeout=self.poll_interval)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+
+def start_workers(workers):
+    """Start a list of stage workers"""
+    for worker in workers:
+        worker.start()
+
+
+def stop_workers(workers, stop_event, timeout=2.0):
+    """Signal all workers to stop and wait briefly for them to exit"""
+    stop_event.set()
+    for worker in workers:
+        worker.join(timeout=timeout)
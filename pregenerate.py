@@ -0,0 +1,401 @@
+#!/usr/bin/env python3
+"""
+Render fallback directions and cue clips in bulk before a show
+
+Takes a plan of scenes and lines and renders them concurrently: scene
+images or written scene descriptions go to GPT-4o as in a live session,
+and every direction is synthesized by ElevenLabs. Calls run on a bounded
+thread pool with the same rate-limited WorkerPools as multi-camera
+sessions, so hundreds of clips take minutes instead of hours.
+
+A plan is a JSONL file, one item per line:
+
+    {"images": ["scenes/floor-1.jpg", "scenes/floor-2.jpg"], "variants": 3, "people": "one"}
+    {"prompt": "Three dancers crouched in a circle, barely moving", "id": "circle"}
+    {"text": "Let your spine unspool...\\n척추를...", "id": "spine-smoke", "motion": "still"}
+    {"cue": "director_1", "text": "..."}
+
+Images and prompts are turned into `variants` directions each; `text` is
+spoken as written. Bank entries are rendered like streamed live speech
+(ritual lines from the speech cache, pauses rendered locally) and saved as
+WAV under `audio/`, named by the hash of the voice, model, settings and
+text, and listed in a fallback_bank manifest.json. Items with a `cue` are
+rendered as MP3 and also copied to the cue directory as `<cue>.mp3`.
+
+Generated text is appended to directions.jsonl as soon as it arrives and
+audio files are written whole or not at all, so an interrupted run picks up
+where it stopped and items already rendered cost nothing:
+
+    python pregenerate.py plan.jsonl --output fallback_bank
+    python pregenerate.py --images "scenes/*.jpg" --variants 4 --openai-workers 8
+"""
+
+import argparse
+import glob
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import cv2
+
+from ai_director import (MAX_TOKENS, TTS_FILE_FORMAT, TTS_MODEL_ID, TTS_STREAM_FORMAT, TTS_STREAM_RATE,
+                         TTS_VOICE_SETTINGS, AIDirector, check_api_keys, get_elevenlabs_client,
+                         get_openai_client, stop_transports)
+from archive import write_wav
+from audio_stream import SEGMENT_BOUNDARY
+from fallback_bank import MANIFEST, FallbackBank, scene_features
+from multicam import API_LIMITS
+from scene_gate import SceneGate
+from tts_cache import TTSCache, cache_key
+from worker_pool import WorkerPool
+
+JOURNAL = "directions.jsonl"  # Generated text by content key, so a rerun doesn't ask GPT-4o again
+AUDIO_DIR = "audio"
+FEED = "pregenerate"  # Name the jobs share in the worker pools
+
+
+def file_hash(path):
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def slug(text, words=4):
+    """Short readable id from the first words of a text"""
+    return "-".join(re.findall(r"\w+", text.lower())[:words]) or "direction"
+
+
+def write_atomic(path, write):
+    """Write a file through `write(temp_path)` so it appears complete or not at all"""
+    temp = f"{path}.{threading.get_ident()}.part"
+    try:
+        write(temp)
+        os.replace(temp, path)
+    finally:
+        if os.path.exists(temp):
+            os.unlink(temp)
+
+
+def write_bytes(path, data):
+    def write(temp):
+        with open(temp, "wb") as f:
+            f.write(data)
+    write_atomic(path, write)
+
+
+def load_plan(paths, variants=1):
+    """Items from JSONL plan files; blank lines and lines starting with # are skipped"""
+    items = []
+    for path in paths:
+        base = os.path.dirname(path)
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                try:
+                    item = json.loads(line)
+                except ValueError as e:
+                    raise SystemExit(f"❌ {path}:{number}: {e}")
+                if "image" in item:
+                    item["images"] = [item.pop("image")]
+                # Image paths are relative to the plan file
+                item["images"] = [os.path.join(base, image) for image in item.get("images", [])]
+                if not (item.get("text") or item.get("prompt") or item["images"]):
+                    raise SystemExit(f"❌ {path}:{number}: an item needs text, a prompt or images")
+                item.setdefault("variants", variants)
+                items.append(item)
+    return items
+
+
+class Job:
+    """One clip to render: a direction for a scene (one variant of it) or a line as written"""
+
+    def __init__(self, item, variant, id):
+        self.id = id
+        self.variant = variant
+        self.text = item.get("text")
+        self.prompt = item.get("prompt")
+        self.images = item.get("images", [])
+        self.cue = item.get("cue")
+        self.motion = item.get("motion")
+        self.people = item.get("people")
+        self.generated = False  # GPT-4o was called for the text
+        self.rendered = False  # The audio was synthesized (or taken from the speech cache) on this run
+        self.done = False
+        self.entry = None  # Manifest entry of a bank clip
+        self.error = None
+
+    def generation_key(self, director):
+        """Hash of everything the generated direction depends on"""
+        payload = json.dumps(["gpt-4o", director.scene_prompt(), MAX_TOKENS, self.prompt,
+                              [file_hash(path) for path in self.images], self.variant],
+                             ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class Pregenerator:
+    """Renders jobs into a content-indexed bank directory"""
+
+    def __init__(self, output="fallback_bank", cue_dir="generated_assets", limits=None, tts_cache=None):
+        self.output = output
+        self.cue_dir = cue_dir
+        limits = dict(API_LIMITS, **(limits or {}))
+        self.pools = {service: WorkerPool("OpenAI" if service == "openai" else "ElevenLabs", **settings)
+                      for service, settings in limits.items()}
+        self.tts_cache = tts_cache if tts_cache is not None else TTSCache()
+        self.classifier = FallbackBank(output)  # For its still/moving and people thresholds
+        self.gate = SceneGate(refresh_after=None)
+        self.gate_lock = threading.Lock()
+        self.local = threading.local()
+        self.journal_lock = threading.Lock()
+        self.journal = self.load_journal()
+        os.makedirs(os.path.join(output, AUDIO_DIR), exist_ok=True)
+
+    def director(self):
+        """This thread's director; they share the speech cache and the worker pools"""
+        if not hasattr(self.local, "director"):
+            self.local.director = AIDirector(tts_cache=self.tts_cache, response_cache=False,
+                                             workers=self.pools, feed=FEED)
+        return self.local.director
+
+    def load_journal(self):
+        texts = {}
+        try:
+            with open(os.path.join(self.output, JOURNAL), encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue  # A line cut short by an interruption
+                    texts[record["key"]] = record["text"]
+        except FileNotFoundError:
+            pass
+        return texts
+
+    def remember(self, key, text):
+        with self.journal_lock:
+            self.journal[key] = text
+            os.makedirs(self.output, exist_ok=True)
+            with open(os.path.join(self.output, JOURNAL), "a", encoding="utf-8") as f:
+                f.write(json.dumps({"key": key, "text": text}, ensure_ascii=False) + "\n")
+
+    def generate(self, job, director):
+        """The job's direction text, from the journal or GPT-4o; None on failure"""
+        key = job.generation_key(director)
+        with self.journal_lock:
+            text = self.journal.get(key)
+        if text is not None:
+            return text
+
+        frames = []
+        for path in job.images:
+            frame = cv2.imread(path)
+            if frame is None:
+                raise ValueError(f"could not read {path}")
+            frames.append(frame)
+        job.generated = True
+        text = director.analyze_scene(director.encoder.encode(frames) if frames else [], job.prompt)
+        if director.is_refusal_response(text):
+            return None
+        self.remember(key, text)
+        return text
+
+    def features(self, job):
+        """Manifest motion/people tags, measured on the scene images when not given"""
+        motion, people = job.motion, job.people
+        if job.images and (motion is None or people is None):
+            frames = [cv2.imread(path) for path in job.images]
+            with self.gate_lock:
+                measured = scene_features(frames)
+                people = self.gate.count_people_in(frames[-1])
+                if people is not None:
+                    measured["people"] = people
+            measured_motion, measured_people = self.classifier.classify(measured)
+            # One image says nothing about movement
+            motion = motion or (measured_motion if len(frames) > 1 else None)
+            people = people or measured_people
+        return motion or "any", people or "any"
+
+    def render(self, job, director, text):
+        """Path of the job's audio, synthesizing it unless it is already in the bank"""
+        audio_format = TTS_FILE_FORMAT if job.cue else TTS_STREAM_FORMAT
+        key = cache_key(director.voice_id, TTS_MODEL_ID, TTS_VOICE_SETTINGS, audio_format, text)
+        path = os.path.join(self.output, AUDIO_DIR, f"{key[:32]}.{'mp3' if job.cue else 'wav'}")
+        if os.path.exists(path):
+            return path
+
+        job.rendered = True
+        if job.cue:
+            write_bytes(path, director.render_speech(text))
+        else:
+            # The same segments as live streamed speech, so ritual lines and pauses cost nothing
+            pcm = b"".join(chunk for chunk in director.speech_chunks(text) if chunk is not SEGMENT_BOUNDARY)
+            write_atomic(path, lambda temp: write_wav(temp, pcm, TTS_STREAM_RATE))
+        return path
+
+    def install_cue(self, job, path):
+        """Copy a cue's audio into the cue directory unless the same clip is already there"""
+        target = os.path.join(self.cue_dir, f"{job.cue}.mp3")
+        if os.path.exists(target) and file_hash(target) == file_hash(path):
+            return
+        os.makedirs(self.cue_dir, exist_ok=True)
+        # Written whole so the cue bank's watcher never loads half a file
+        write_atomic(target, lambda temp: shutil.copyfile(path, temp))
+
+    def run(self, job):
+        """Render one job, setting its manifest entry (bank clips) or error"""
+        director = self.director()
+        try:
+            text = job.text or self.generate(job, director)
+            if text is None:
+                job.error = "no usable direction from GPT-4o"
+                return
+            path = self.render(job, director, text)
+            if job.cue:
+                self.install_cue(job, path)
+            else:
+                motion, people = self.features(job)
+                job.entry = {"id": job.id, "text": text, "audio": os.path.relpath(path, self.output),
+                             "motion": motion, "people": people}
+            job.done = True
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+
+    def write_manifest(self, entries):
+        """Merge entries into the bank's manifest.json, replacing entries with the same id"""
+        path = os.path.join(self.output, MANIFEST)
+        try:
+            with open(path, encoding="utf-8") as f:
+                directions = json.load(f).get("directions", [])
+        except (OSError, ValueError):
+            directions = []
+        by_id = {entry["id"]: entry for entry in entries}
+        merged = [by_id.pop(record.get("id"), record) for record in directions]
+        merged.extend(entry for entry in entries if entry["id"] in by_id)
+        manifest = json.dumps({"version": 1, "directions": merged}, ensure_ascii=False, indent=1)
+        write_bytes(path, (manifest + "\n").encode("utf-8"))
+        return len(merged)
+
+
+def make_jobs(items):
+    """One job per variant of each item, with ids that are unique within the run"""
+    jobs = []
+    seen = set()
+    for item in items:
+        if item.get("cue"):
+            base = item["cue"]
+        elif item.get("id"):
+            base = item["id"]
+        elif item.get("images"):
+            base = os.path.splitext(os.path.basename(item["images"][0]))[0]
+        else:
+            base = slug(item.get("prompt") or item["text"])
+        count = 1 if item.get("text") else max(1, int(item.get("variants", 1)))
+        for variant in range(count):
+            name = f"{base}-{variant + 1}" if count > 1 else base
+            id, suffix = name, 2
+            while id in seen:
+                id, suffix = f"{name}-{suffix}", suffix + 1
+            seen.add(id)
+            jobs.append(Job(item, variant, id))
+    return jobs
+
+
+def pregenerate(items, output="fallback_bank", cue_dir="generated_assets", limits=None):
+    """Render every item concurrently and update the bank's manifest; returns the jobs"""
+    generator = Pregenerator(output, cue_dir, limits)
+    jobs = make_jobs(items)
+    workers = sum(pool.workers for pool in generator.pools.values())
+    print(f"🏭 Rendering {len(jobs)} clip(s) into {output}/ on {workers} thread(s)")
+    # Create the clients up front rather than racing to create them in every thread
+    get_openai_client()
+    get_elevenlabs_client()
+
+    started = time.time()
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pregenerate")
+    try:
+        futures = {executor.submit(generator.run, job): job for job in jobs}
+        for done, future in enumerate(as_completed(futures), 1):
+            job = futures[future]
+            if job.error:
+                status = f"❌ {job.error}"
+            elif job.generated or job.rendered:
+                status = "✅ " + " + ".join(step for step, ran in (("direction", job.generated),
+                                                                  ("speech", job.rendered)) if ran)
+            else:
+                status = "⏭️  already rendered"
+            print(f"[{done}/{len(jobs)}] {job.id}: {status}")
+        executor.shutdown()
+    except KeyboardInterrupt:
+        print("\n⏹️  Interrupted; finishing the calls in flight. Run again to resume.")
+        executor.shutdown(cancel_futures=True)
+    finally:
+        # Jobs that were in flight when interrupted have finished by now and are kept too
+        entries = [job.entry for job in jobs if job.entry is not None]
+        total = generator.write_manifest(entries)
+        stop_transports()
+
+    elapsed = time.time() - started
+    failed = sum(1 for job in jobs if job.error)
+    print(f"\n📊 {len(entries)} bank direction(s) and {sum(1 for job in jobs if job.cue and job.done)} "
+          f"cue(s) in {elapsed:.0f}s: {sum(job.generated for job in jobs)} direction(s) generated, "
+          f"{sum(job.rendered for job in jobs)} clip(s) rendered, {failed} failed, "
+          f"{sum(1 for job in jobs if not job.done and not job.error)} not started")
+    for pool in generator.pools.values():
+        print(f"   {pool.name}: {pool.summary()}")
+    print(f"🛟 {os.path.join(output, MANIFEST)} lists {total} direction(s)")
+    if not all(job.done for job in jobs):
+        print("Run the same command again to retry or finish the rest.")
+    return jobs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render fallback directions and cue clips in bulk")
+    parser.add_argument("plan", nargs="*", help="JSONL plan file(s); see the module docstring")
+    parser.add_argument("--images", nargs="+", default=[],
+                        help="Scene images (or glob patterns), one scene each")
+    parser.add_argument("--prompts", help="Text file with one scene description per line")
+    parser.add_argument("--variants", type=int, default=1,
+                        help="Directions per scene image or prompt (default: 1)")
+    parser.add_argument("--output", default="fallback_bank",
+                        help="Bank directory for the audio and manifest.json (default: fallback_bank)")
+    parser.add_argument("--cue-dir", default="generated_assets",
+                        help="Where cue items are installed (default: generated_assets)")
+    parser.add_argument("--openai-workers", type=int, default=API_LIMITS["openai"]["workers"],
+                        help="Concurrent GPT-4o calls (default: 4)")
+    parser.add_argument("--openai-rpm", type=int, default=API_LIMITS["openai"]["requests_per_minute"],
+                        help="OpenAI requests per minute quota (default: 500)")
+    parser.add_argument("--openai-tpm", type=int, default=API_LIMITS["openai"]["tokens_per_minute"],
+                        help="OpenAI tokens per minute quota (default: 30000)")
+    parser.add_argument("--tts-workers", type=int, default=API_LIMITS["elevenlabs"]["workers"],
+                        help="Concurrent ElevenLabs requests (default: 5)")
+    parser.add_argument("--tts-rpm", type=int, help="ElevenLabs requests per minute (default: no limit)")
+    args = parser.parse_args()
+
+    items = load_plan(args.plan, args.variants)
+    for pattern in args.images:
+        for path in sorted(glob.glob(pattern)) or [pattern]:
+            items.append({"images": [path], "variants": args.variants})
+    if args.prompts:
+        with open(args.prompts, encoding="utf-8") as f:
+            items.extend({"prompt": line.strip(), "variants": args.variants} for line in f if line.strip())
+    if not items:
+        parser.error("nothing to render: give a plan file, --images or --prompts")
+
+    check_api_keys()
+    limits = {
+        "openai": {"workers": args.openai_workers, "requests_per_minute": args.openai_rpm,
+                   "tokens_per_minute": args.openai_tpm},
+        "elevenlabs": {"workers": args.tts_workers, "requests_per_minute": args.tts_rpm,
+                       "tokens_per_minute": None},
+    }
+    pregenerate(items, args.output, args.cue_dir, limits)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Record camera sessions and replay them in place of cv2.VideoCapture
+
+A session file is a short header followed by one record per frame: the
+capture time (seconds since the start of the recording), the JPEG length
+and the JPEG bytes. `ReplaySource` and `SyntheticSource` both implement the
+parts of the VideoCapture API that run_ai_director uses, so the director
+can be run and benchmarked without a camera.
+
+Record a session:
+    python replay.py --camera 0 --seconds 60 --output rehearsal.session
+"""
+
+import argparse
+import struct
+import time
+
+import cv2
+import numpy as np
+
+MAGIC = b"AIDSESS1"
+RECORD_HEADER = struct.Struct("<dI")  # Seconds since start, JPEG length
+
+
+class SessionRecorder:
+    """Append camera frames to a session file"""
+
+    def __init__(self, path, jpeg_quality=90):
+        self.path = path
+        self.jpeg_quality = jpeg_quality
+        self.file = open(path, "wb")
+        self.file.write(MAGIC)
+        self.started_at = None
+        self.frames = 0
+
+    def write(self, frame, timestamp=None):
+        """Encode and append one frame"""
+        timestamp = time.time() if timestamp is None else timestamp
+        if self.started_at is None:
+            self.started_at = timestamp
+        _, buffer = cv2.imencode(".jpg", frame, [cv2.IMWRITE_JPEG_QUALITY, self.jpeg_quality])
+        data = buffer.tobytes()
+        self.file.write(RECORD_HEADER.pack(timestamp - self.started_at, len(data)))
+        self.file.write(data)
+        self.frames += 1
+
+    def close(self):
+        self.file.close()
+
+
+class ReplaySource:
+    """Play a recorded session back through the VideoCapture API"""
+
+    def __init__(self, path, loop=True, realtime=True):
+        self.path = path
+        self.loop = loop
+        self.realtime = realtime  # Pace frames like the original recording
+        self.file = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an AI Director session file")
+
+        # Index of (timestamp, offset, length) so frames are read on demand
+        self.index = []
+        while True:
+            header = self.file.read(RECORD_HEADER.size)
+            if len(header) < RECORD_HEADER.size:
+                break
+            timestamp, length = RECORD_HEADER.unpack(header)
+            self.index.append((timestamp, self.file.tell(), length))
+            self.file.seek(length, 1)
+
+        self.position = 0
+        self.grabbed = None
+        self.started_at = None
+        self.loop_offset = 0.0
+
+    def isOpened(self):
+        return bool(self.index) and not self.file.closed
+
+    def grab(self):
+        """Advance to the next frame without decoding it"""
+        if self.position >= len(self.index):
+            if not self.loop or not self.index:
+                return False
+            self.loop_offset += self.index[-1][0] + 1.0 / 30
+            self.position = 0
+
+        timestamp, offset, length = self.index[self.position]
+        self.position += 1
+        if self.realtime:
+            if self.started_at is None:
+                self.started_at = time.time()
+            delay = self.started_at + self.loop_offset + timestamp - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.grabbed = (offset, length)
+        return True
+
+    def retrieve(self):
+        """Decode the most recently grabbed frame"""
+        if self.grabbed is None:
+            return False, None
+        offset, length = self.grabbed
+        self.file.seek(offset)
+        data = np.frombuffer(self.file.read(length), dtype=np.uint8)
+        frame = cv2.imdecode(data, cv2.IMREAD_COLOR)
+        return frame is not None, frame
+
+    def read(self):
+        if not self.grab():
+            return False, None
+        return self.retrieve()
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return len(self.index)
+        if prop == cv2.CAP_PROP_FPS and len(self.index) > 1:
+            return (len(self.index) - 1) / max(self.index[-1][0], 1e-6)
+        return 0.0
+
+    def release(self):
+        self.file.close()
+
+
+class SyntheticSource:
+    """Generated frames of a figure moving across a stage, for runs without any recording"""
+
+    def __init__(self, width=640, height=480, fps=30.0, realtime=True):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.realtime = realtime
+        self.frame_number = 0
+        self.started_at = None
+        self.background = np.full((height, width, 3), 40, dtype=np.uint8)
+        self.frame = np.empty_like(self.background)
+
+    def isOpened(self):
+        return True
+
+    def grab(self):
+        if self.started_at is None:
+            self.started_at = time.time()
+        if self.realtime:
+            delay = self.started_at + self.frame_number / self.fps - time.time()
+            if delay > 0:
+                time.sleep(delay)
+        self.frame_number += 1
+        return True
+
+    def retrieve(self):
+        t = self.frame_number / self.fps
+        np.copyto(self.frame, self.background)
+        # A crude body: head and torso sweeping left and right, arms rising and falling
+        x = int(self.width / 2 + self.width / 3 * np.sin(t / 3))
+        y = self.height // 2
+        cv2.circle(self.frame, (x, y - 110), 28, (200, 190, 180), -1)
+        cv2.rectangle(self.frame, (x - 35, y - 80), (x + 35, y + 60), (150, 90, 60), -1)
+        arm = int(60 * np.sin(t * 2))
+        cv2.line(self.frame, (x - 35, y - 60), (x - 90, y - 60 - arm), (150, 90, 60), 12)
+        cv2.line(self.frame, (x + 35, y - 60), (x + 90, y - 60 + arm), (150, 90, 60), 12)
+        cv2.line(self.frame, (x - 20, y + 60), (x - 30, y + 170), (60, 60, 120), 14)
+        cv2.line(self.frame, (x + 20, y + 60), (x + 30, y + 170), (60, 60, 120), 14)
+        return True, self.frame.copy()
+
+    def read(self):
+        self.grab()
+        return self.retrieve()
+
+    def set(self, prop, value):
+        return False
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return self.fps
+        return 0.0
+
+    def release(self):
+        pass
+
+
+def record_session(camera_index, seconds, output, show=True):
+    """Record a camera to a session file"""
+    video = cv2.VideoCapture(camera_index)
+    if not video.isOpened():
+        print(f"❌ Could not open camera {camera_index}")
+        return False
+    video.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+    video.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+
+    recorder = SessionRecorder(output)
+    print(f"🔴 Recording camera {camera_index} to {output} for {seconds:.0f}s (press 'q' to stop early)")
+    started = time.time()
+    try:
+        while time.time() - started < seconds:
+            success, frame = video.read()
+            if not success:
+                time.sleep(0.01)
+                continue
+            recorder.write(frame)
+            if show:
+                cv2.imshow("Recording (Press Q to stop)", frame)
+                if cv2.waitKey(1) & 0xFF == ord("q"):
+                    break
+    except KeyboardInterrupt:
+        pass
+    finally:
+        recorder.close()
+        video.release()
+        cv2.destroyAllWindows()
+    print(f"✅ Recorded {recorder.frames} frames")
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record a camera session for offline replay")
+    parser.add_argument("--camera", type=int, default=0, help="Camera index (default: 0)")
+    parser.add_argument("--seconds", type=float, default=60.0, help="Recording length (default: 60)")
+    parser.add_argument("--output", default="session.session", help="Output session file")
+    parser.add_argument("--no-preview", action="store_true", help="Don't show a preview window")
+    args = parser.parse_args()
+    record_session(args.camera, args.seconds, args.output, show=not args.no_preview)
+
+
+if __name__ == "__main__":
+    main()
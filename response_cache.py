@@ -0,0 +1,218 @@
+"""
+Perceptual-hash cache of director responses
+
+A performer holding a pose produces frame batches that are nearly
+identical, and each one used to cost a full GPT-4o round trip. Every frame
+is reduced to a 64-bit difference hash (dHash) and a 64-bit DCT hash
+(pHash). A new batch whose hashes are within a few bits of a recent batch
+reuses, or rotates through, the directions given for that scene instead of
+calling the model again. Entries expire after a TTL, the least recently
+used entry is evicted when the cache is full, and a scene only gets so many
+reused directions before a fresh call is forced.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+import cv2
+import numpy as np
+
+HASH_SIZE = 8  # 8x8 bits = 64-bit hashes
+PHASH_SIZE = 32  # Image side before the DCT; the lowest 8x8 frequencies are kept
+
+
+def _gray(frame, width, height):
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, (width, height), interpolation=cv2.INTER_AREA).astype(np.float32)
+
+
+def _pack(bits):
+    return int.from_bytes(np.packbits(bits.ravel()).tobytes(), "big")
+
+
+def dhash(frame, size=HASH_SIZE):
+    """Difference hash: whether each pixel is brighter than its right-hand neighbour"""
+    small = _gray(frame, size + 1, size)
+    return _pack(small[:, 1:] > small[:, :-1])
+
+
+def _dct_matrix(n):
+    k = np.arange(n)[:, None]
+    x = np.arange(n)[None, :]
+    matrix = np.cos(np.pi * (2 * x + 1) * k / (2 * n)) * np.sqrt(2.0 / n)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+
+_DCT = _dct_matrix(PHASH_SIZE)
+
+
+def phash(frame, size=HASH_SIZE):
+    """DCT hash: whether each low-frequency coefficient is above their median"""
+    small = _gray(frame, PHASH_SIZE, PHASH_SIZE)
+    low = (_DCT @ small @ _DCT.T)[:size, :size]
+    median = np.median(low.ravel()[1:])  # The DC term only says how bright the frame is
+    return _pack(low > median)
+
+
+def frame_hashes(frames):
+    """(dHash, pHash) for every raw BGR frame in a batch"""
+    return [(dhash(frame), phash(frame)) for frame in frames]
+
+
+def hamming(a, b):
+    return bin(a ^ b).count("1")
+
+
+def batch_distance(hashes, other):
+    """Average over the frames in `hashes` of the bits to the closest frame in `other`
+
+    A frame is only as close as the worse of its two hashes, so both the
+    gradient layout (dHash) and the overall shape (pHash) must agree.
+    """
+    if not hashes or not other:
+        return None
+    total = 0
+    for d, p in hashes:
+        total += min(max(hamming(d, od), hamming(p, op)) for od, op in other)
+    return total / len(hashes)
+
+
+class CacheEntry:
+    """Directions given for one scene, newest last"""
+
+    def __init__(self, hashes, now):
+        self.hashes = hashes
+        self.responses = []
+        self.created_at = now
+        self.reuses = 0  # Reused directions since the last fresh call
+        self.next = 0  # Rotation position
+
+
+class ResponseCache:
+    """Reuse directions for scenes that look the same as a recent one
+
+    `threshold` is the largest average Hamming distance (out of 64 bits)
+    that still counts as the same scene. `mode` is "rotate" to cycle through
+    the last `variants` directions for a scene or "reuse" to repeat the
+    newest one that isn't the direction just given. After `max_reuses` reused directions in a row a fresh call
+    is forced (None = never).
+    """
+
+    def __init__(self, threshold=6, ttl=120.0, max_entries=32, mode="rotate", variants=3,
+                 max_reuses=3):
+        if mode not in ("rotate", "reuse"):
+            raise ValueError('mode must be "rotate" or "reuse"')
+        self.threshold = threshold
+        self.ttl = ttl  # Seconds after which a scene's directions are no longer reused
+        self.max_entries = max_entries
+        self.mode = mode
+        self.variants = variants
+        self.max_reuses = max_reuses
+        self.entries = OrderedDict()  # Least recently used first
+        self.ids = 0
+        self.lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evictions = 0
+        self.refreshes = 0  # Fresh calls forced by max_reuses
+        self.forced = 0  # Fresh calls requested by the operator
+
+    def _prune(self, now):
+        for key in [key for key, entry in self.entries.items() if now - entry.created_at > self.ttl]:
+            del self.entries[key]
+            self.expired += 1
+
+    def _closest(self, hashes):
+        best, best_distance = None, None
+        for key, entry in self.entries.items():
+            distance = batch_distance(hashes, entry.hashes)
+            if distance is not None and distance <= self.threshold and (
+                    best_distance is None or distance < best_distance):
+                best, best_distance = key, distance
+        return best, best_distance
+
+    def lookup(self, hashes, fresh=False, avoid=None):
+        """A cached direction for this scene, or None if the model should be called
+
+        `fresh` skips the cache for this batch; the new direction is still
+        stored by the caller with store(). `avoid` (the direction just
+        given) is never returned, so a scene with nothing else stored is a
+        miss.
+        """
+        with self.lock:
+            now = time.time()
+            self._prune(now)
+            if fresh:
+                self.forced += 1
+                self.misses += 1
+                return None
+            key, _ = self._closest(hashes)
+            if key is None:
+                self.misses += 1
+                return None
+            entry = self.entries[key]
+            if self.max_reuses is not None and entry.reuses >= self.max_reuses:
+                self.refreshes += 1
+                self.misses += 1
+                return None
+            choices = [r for r in entry.responses if r != avoid]
+            if not choices:
+                self.misses += 1
+                return None
+            if self.mode == "reuse":
+                response = choices[-1]
+            else:
+                response = choices[entry.next % len(choices)]
+                entry.next += 1
+            self.entries.move_to_end(key)
+            entry.reuses += 1
+            self.hits += 1
+            return response
+
+    def store(self, hashes, response):
+        """Remember a fresh direction for this scene"""
+        if not hashes or not response:
+            return
+        with self.lock:
+            now = time.time()
+            self._prune(now)
+            key, _ = self._closest(hashes)
+            if key is None:
+                self.ids += 1
+                key = self.ids
+                self.entries[key] = CacheEntry(hashes, now)
+            entry = self.entries[key]
+            # The scene is refreshed: newest hashes and a new TTL
+            entry.hashes = hashes
+            entry.created_at = now
+            entry.reuses = 0
+            if response not in entry.responses:
+                entry.responses.append(response)
+                del entry.responses[:-self.variants]
+            entry.next = 0  # Rotation starts again from the oldest
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+    def hit_rate(self):
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def summary(self):
+        text = (f"{self.hits} hits, {self.misses} misses ({self.hit_rate():.0%} hit rate), "
+                f"{len(self.entries)} scene(s)")
+        if self.refreshes or self.forced:
+            text += f", {self.refreshes} automatic and {self.forced} requested fresh call(s)"
+        if self.expired or self.evictions:
+            text += f", {self.expired} expired, {self.evictions} evicted"
+        return text
@@ -0,0 +1,133 @@
+"""
+Local gate that decides whether a frame batch is worth sending to GPT-4o
+
+Two cheap checks run on the raw frames: NumPy frame differencing against
+the last batch that was analyzed, and OpenCV's built-in HOG people
+detector. A batch only goes to the LLM when a body is present and the scene
+has changed enough since the last direction.
+"""
+
+import time
+
+import cv2
+import numpy as np
+
+
+class SceneGate:
+    """Skip LLM calls on an empty or unchanged stage"""
+
+    def __init__(self, motion_threshold=0.02, pixel_threshold=25, require_person=True,
+                 min_people=1, refresh_after=30.0, analysis_width=320,
+                 hog_win_stride=(8, 8), hog_scale=1.05, hog_hit_threshold=0.0):
+        # Fraction of pixels that must change (by more than pixel_threshold levels)
+        self.motion_threshold = motion_threshold
+        self.pixel_threshold = pixel_threshold
+        self.require_person = require_person
+        self.min_people = min_people
+        # Let a still scene through again after this many seconds (None = never)
+        self.refresh_after = refresh_after
+        self.analysis_width = analysis_width
+        self.hog_win_stride = hog_win_stride
+        self.hog_scale = hog_scale
+        self.hog_hit_threshold = hog_hit_threshold
+
+        self.hog = None  # Built on first use
+        if require_person:
+            if self._detector() is None:
+                # OpenCV 5 moved the HOG people detector out of the main package
+                print("⚠️  HOG people detector not available in this OpenCV build; gating on movement only")
+                self.require_person = False
+
+        self.reference = None  # Small grayscale copy of the last frame that was analyzed
+        self.last_passed_at = 0.0
+        self.last_motion = 0.0
+        self.last_people = 0
+
+        self.checked = 0
+        self.passed = 0
+        self.skipped_no_person = 0
+        self.skipped_no_motion = 0
+
+    def _small(self, frame):
+        height, width = frame.shape[:2]
+        if width > self.analysis_width:
+            scale = self.analysis_width / width
+            frame = cv2.resize(frame, (self.analysis_width, int(height * scale)),
+                               interpolation=cv2.INTER_AREA)
+        return frame
+
+    def _gray(self, small):
+        if small.ndim == 3:
+            small = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        return small.astype(np.int16)
+
+    def motion_level(self, grays):
+        """Largest fraction of changed pixels between consecutive frames and the reference"""
+        sequence = ([self.reference] if self.reference is not None else []) + grays
+        if len(sequence) < 2:
+            return 1.0
+        level = 0.0
+        for previous, current in zip(sequence, sequence[1:]):
+            changed = np.count_nonzero(np.abs(current - previous) > self.pixel_threshold)
+            level = max(level, changed / current.size)
+        return level
+
+    def _detector(self):
+        """The HOG people detector, or None if this OpenCV build has none"""
+        if self.hog is None and hasattr(cv2, "HOGDescriptor"):
+            self.hog = cv2.HOGDescriptor()
+            self.hog.setSVMDetector(cv2.HOGDescriptor_getDefaultPeopleDetector())
+        return self.hog
+
+    def count_people(self, smalls):
+        """Number of people detected, checking the newest frame first; None without a detector"""
+        hog = self._detector()
+        if hog is None:
+            return None
+        for small in reversed(smalls):
+            boxes, _ = hog.detectMultiScale(small, hitThreshold=self.hog_hit_threshold,
+                                                 winStride=self.hog_win_stride,
+                                                 scale=self.hog_scale)
+            if len(boxes) >= self.min_people:
+                return len(boxes)
+        return 0
+
+    def count_people_in(self, frame):
+        """Number of people detected in one raw BGR frame; None without a detector
+
+        Works whether or not the gate itself requires a person.
+        """
+        return self.count_people([self._small(frame)])
+
+    def check(self, frames):
+        """Return True if this batch of raw BGR frames should be analyzed"""
+        self.checked += 1
+        smalls = [self._small(frame) for frame in frames]
+        grays = [self._gray(small) for small in smalls]
+
+        self.last_motion = self.motion_level(grays)
+        self.last_people = self.count_people(smalls) if self.require_person else 0
+        if self.require_person and self.last_people < self.min_people:
+            self.skipped_no_person += 1
+            return False
+
+        stale = (self.refresh_after is not None
+                 and time.time() - self.last_passed_at >= self.refresh_after)
+        if self.last_motion < self.motion_threshold and not stale:
+            self.skipped_no_motion += 1
+            return False
+
+        self.passed += 1
+        self.reference = grays[-1]
+        self.last_passed_at = time.time()
+        return True
+
+    @property
+    def skipped(self):
+        return self.skipped_no_person + self.skipped_no_motion
+
+    def summary(self):
+        """One-line counter summary"""
+        return (f"{self.checked} batches checked, {self.passed} analyzed, "
+                f"{self.skipped_no_person} skipped (no body), "
+                f"{self.skipped_no_motion} skipped (no movement)")
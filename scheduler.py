@@ -0,0 +1,95 @@
+"""
+Adaptive cadence for frame capture and analysis
+
+Instead of a fixed capture rate, the scheduler keeps running estimates of
+how long an analysis takes (trigger to first sentence), how long TTS takes
+to return its first audio, and how long directions play. It then fires
+the next analysis early enough that the new direction is ready right when
+the speaker becomes free, leaving the requested silence gap.
+"""
+
+
+class CadenceScheduler:
+    """Decide when to capture and analyze based on measured stage latencies"""
+
+    def __init__(self, silence_gap=2.0, min_batch=1, max_batch=4, seconds_per_frame=2.0,
+                 min_window=2.0, max_window=8.0, smoothing=0.3):
+        self.silence_gap = silence_gap  # Target seconds of silence between directions
+        self.min_batch = min_batch
+        self.max_batch = max_batch
+        self.seconds_per_frame = seconds_per_frame  # Roughly one analyzed frame per this many seconds
+        self.min_window = min_window
+        self.max_window = max_window
+        self.smoothing = smoothing  # Weight of the newest sample in the moving averages
+
+        # Starting guesses, replaced by measurements as the show runs
+        self.estimates = {"analysis": 3.0, "tts": 0.5, "utterance": 12.0}
+        self.speaking_since = None
+        self.triggered_for = None
+        self.last_trigger = 0.0
+        self.last_finished = None
+        self.gaps = []  # Observed silence between consecutive directions
+
+    def record(self, stage, seconds):
+        """Fold a new latency sample into the moving average for a stage"""
+        previous = self.estimates.get(stage)
+        if previous is None:
+            self.estimates[stage] = seconds
+        else:
+            self.estimates[stage] = (1 - self.smoothing) * previous + self.smoothing * seconds
+
+    def direction_started(self, now):
+        """The speaker started playing a direction"""
+        if self.last_finished is not None:
+            self.gaps.append(now - self.last_finished)
+        self.speaking_since = now
+
+    def direction_finished(self, now):
+        """The speaker finished a direction"""
+        if self.speaking_since is not None:
+            self.record("utterance", now - self.speaking_since)
+        self.speaking_since = None
+        self.last_finished = now
+
+    def lead_time(self):
+        """Expected seconds from triggering an analysis to its first audio"""
+        return self.estimates["analysis"] + self.estimates["tts"]
+
+    def window(self):
+        """Seconds of movement each analysis should look at"""
+        return min(self.max_window, max(self.min_window, self.estimates["utterance"] / 2))
+
+    def batch_size(self):
+        """Number of frames to send per analysis"""
+        frames = round(self.window() / self.seconds_per_frame)
+        return min(self.max_batch, max(self.min_batch, frames))
+
+    def capture_interval(self):
+        """Seconds between the frames of one batch"""
+        return self.window() / self.batch_size()
+
+    def should_trigger(self, now):
+        """Return True when an analysis should start now"""
+        if self.speaking_since is not None:
+            # Fire once per direction, so the next one is ready as this one ends
+            if self.triggered_for == self.speaking_since:
+                return False
+            due = (self.speaking_since + self.estimates["utterance"]
+                   + self.silence_gap - self.lead_time())
+            if now < due:
+                return False
+            self.triggered_for = self.speaking_since
+        elif now - self.last_trigger < max(self.window(), self.lead_time()):
+            # Speaker idle: leave room for the previous analysis to come back
+            return False
+
+        self.last_trigger = now
+        return True
+
+    def summary(self):
+        """One-line summary of the current estimates and observed gaps"""
+        average_gap = sum(self.gaps) / len(self.gaps) if self.gaps else 0.0
+        return (f"analysis {self.estimates['analysis']:.1f}s, TTS {self.estimates['tts']:.2f}s, "
+                f"directions {self.estimates['utterance']:.1f}s, "
+                f"{self.batch_size()} frame(s) every {self.capture_interval():.1f}s, "
+                f"average gap {average_gap:.1f}s (target {self.silence_gap:.1f}s)")
@@ -0,0 +1,165 @@
+"""
+Fast startup helpers for the AI Director
+
+Everything that used to happen one step after another before the first
+frame (API key checks, camera scanning, a fixed camera warm-up sleep) is
+either cached, run in parallel or cut short here. `startup` records how
+long each step of a cold start took so the breakdown can be printed once
+the director is ready.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import contextmanager
+
+import cv2
+
+
+class StartupTimer:
+    """Wall-clock durations of the steps of a cold start"""
+
+    def __init__(self):
+        self.phases = []  # (name, seconds, background)
+        self.lock = threading.Lock()
+
+    def record(self, name, seconds, background=False):
+        with self.lock:
+            self.phases.append((name, seconds, background))
+
+    @contextmanager
+    def phase(self, name, background=False):
+        """Time the body of a with-block as one startup step"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started, background)
+
+    def total(self):
+        """Time spent in steps that held up startup (background steps overlap them)"""
+        with self.lock:
+            return sum(seconds for _, seconds, background in self.phases if not background)
+
+    def report(self):
+        """Multi-line breakdown of the cold start"""
+        with self.lock:
+            phases = list(self.phases)
+        lines = []
+        for name, seconds, background in phases:
+            note = "  (background)" if background else ""
+            lines.append(f"  {name:<20} {seconds * 1000:7.0f} ms{note}")
+        lines.append(f"  {'total':<20} {self.total() * 1000:7.0f} ms")
+        return "\n".join(lines)
+
+
+class KeyValidationCache:
+    """Remember successful API key checks on disk for `ttl` seconds
+
+    Only a hash of each key is stored. Failed checks are never cached, so a
+    fixed key is picked up on the next start.
+    """
+
+    def __init__(self, path=".key_cache.json", ttl=24 * 3600):
+        self.path = path
+        self.ttl = ttl
+        self.entries = {}
+        try:
+            with open(path, encoding="utf-8") as f:
+                self.entries = json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    @staticmethod
+    def fingerprint(service, key, base_url=None):
+        return hashlib.sha256(f"{service}\0{base_url or ''}\0{key}".encode("utf-8")).hexdigest()
+
+    def is_valid(self, service, key, base_url=None):
+        """True if this key passed validation less than `ttl` seconds ago"""
+        entry = self.entries.get(self.fingerprint(service, key, base_url))
+        return entry is not None and time.time() - entry["checked_at"] < self.ttl
+
+    def mark_valid(self, service, key, base_url=None):
+        self.entries[self.fingerprint(service, key, base_url)] = {"service": service,
+                                                                 "checked_at": time.time()}
+        # Drop expired entries so the file doesn't grow with every rotated key
+        now = time.time()
+        self.entries = {fp: entry for fp, entry in self.entries.items()
+                        if now - entry["checked_at"] < self.ttl}
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self.entries, f)
+        except OSError as e:
+            print(f"⚠️  Could not save key validation cache: {e}")
+
+
+def _probe_camera(index):
+    """Open a camera, read one frame and release it again"""
+    cap = cv2.VideoCapture(index)
+    try:
+        if not cap.isOpened():
+            return False
+        ret, _ = cap.read()
+        return ret
+    finally:
+        cap.release()
+
+
+def probe_cameras(indices, timeout=3.0):
+    """Probe all camera indices at once; return {index: True/False/None}
+
+    None means the probe did not finish within `timeout` seconds. A hung
+    probe is left to finish on its own thread and never blocks startup.
+    """
+    executor = ThreadPoolExecutor(max_workers=len(indices), thread_name_prefix="camera-probe")
+    futures = {index: executor.submit(_probe_camera, index) for index in indices}
+    wait(futures.values(), timeout=timeout)
+    executor.shutdown(wait=False)
+
+    results = {}
+    for index, future in futures.items():
+        if not future.done():
+            results[index] = None
+        elif future.exception() is not None:
+            results[index] = False
+        else:
+            results[index] = future.result()
+    return results
+
+
+def wait_for_stable_frames(video, timeout=2.0, stable_frames=3, max_change=4.0,
+                           min_brightness=8.0, analysis_width=160):
+    """Read frames until exposure has settled, for at most `timeout` seconds
+
+    The camera is ready once `stable_frames` consecutive frames are not black
+    and differ from the previous one by less than `max_change` (mean absolute
+    pixel difference on a small grayscale copy). Returns True if the frames
+    settled, False if the timeout was hit first.
+    """
+    deadline = time.time() + timeout
+    previous = None
+    stable = 0
+    while time.time() < deadline:
+        success, frame = video.read()
+        if not success:
+            time.sleep(0.01)
+            continue
+        height, width = frame.shape[:2]
+        small = cv2.resize(frame, (analysis_width, max(1, int(height * analysis_width / width))),
+                           interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY) if small.ndim == 3 else small
+        if previous is not None and gray.mean() >= min_brightness \
+                and cv2.absdiff(gray, previous).mean() < max_change:
+            stable += 1
+            if stable >= stable_frames:
+                return True
+        else:
+            stable = 0
+        previous = gray
+    return False
+
+
+# Shared instance for the current process
+startup = StartupTimer()
@@ -0,0 +1,81 @@
+"""
+Tests for writing a show archive and reading it back
+"""
+
+import base64
+import time
+
+import cv2
+import numpy as np
+import pytest
+
+from archive import AUDIO, EVENT, FEED, FRAME, SENT, ArchiveReader, SessionArchive
+
+
+def jpeg_base64(frame):
+    ok, buffer = cv2.imencode(".jpg", frame)
+    return base64.b64encode(buffer.tobytes()).decode("ascii")
+
+
+def test_round_trip(tmp_path):
+    start = time.time()
+    archive = SessionArchive(str(tmp_path), segment_bytes=1024, frame_interval=1.0).start()
+    frame = np.full((48, 64, 3), 90, dtype=np.uint8)
+    archive.frame(frame, start)
+    archive.frame(frame, start + 0.5)  # Within frame_interval: not archived
+    archive.frame(np.full((48, 64, 3), 180, dtype=np.uint8), start + 2.0)
+    archive.sent_frames([jpeg_base64(frame)], direction=1, timestamp=start + 2.5)
+    archive.event("direction", 1, timestamp=start + 3.0, kind="speech", text="Lift your arm.")
+    pcm = np.arange(1000, dtype=np.int16).tobytes()  # Bigger than a segment on its own
+    archive.audio(pcm, 16000, direction=1, timestamp=start + 4.0)
+    archive.close()
+    assert archive.dropped == 0
+    assert archive.segment_number > 1
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert len(reader) == 5
+        assert reader.started_at == start
+        assert reader.duration == pytest.approx(4.0)
+        assert len(reader.select(FRAME)) == 2
+        assert len(reader.select(FRAME, start=1.0)) == 1
+
+        position, image = reader.frame_at(1.5)
+        assert reader.index["timestamp"][position] == start
+        assert abs(int(image[0, 0, 0]) - 90) <= 2
+        _, image = reader.frame_at(60.0)
+        assert abs(int(image[0, 0, 0]) - 180) <= 2
+
+        assert reader.image(reader.select(SENT)[0]).shape == (48, 64, 3)
+        [(seconds, event)] = reader.events()
+        assert seconds == pytest.approx(3.0)
+        assert event == {"event": "direction", "kind": "speech", "text": "Lift your arm."}
+        audio = reader.select(AUDIO)[0]
+        assert bytes(reader.payload(audio)) == pcm
+        assert reader.index["param"][audio] == 16000
+        assert reader.index["direction"][audio] == 1
+
+
+def test_reopened_archive_keeps_feeds_and_numbers_directions_after_earlier_runs(tmp_path):
+    archive = SessionArchive(str(tmp_path)).start()
+    archive.event("direction", 2, feed="stage left", kind="speech")
+    archive.event("direction", 3, feed="stage right", kind="speech")
+    archive.close()
+
+    archive = SessionArchive(str(tmp_path)).start()
+    assert archive.direction_base == 3
+    archive.event("direction", 1, feed="stage right", kind="speech")
+    archive.event("direction", 1, feed="balcony", kind="speech")
+    archive.close()
+
+    with ArchiveReader(str(tmp_path)) as reader:
+        assert reader.feeds == {0: None, 1: "stage left", 2: "stage right", 3: "balcony"}
+        assert len(reader.select(FEED)) == 3
+        right = reader.feed_number("stage right")
+        assert sorted(int(d) for d in reader.index["direction"][reader.select(EVENT, feed=right)]) == [3, 4]
+        assert int(reader.index["direction"][reader.select(EVENT, feed=3)][0]) == 4
+
+
+def test_records_before_start_are_ignored(tmp_path):
+    archive = SessionArchive(str(tmp_path))
+    archive.event("direction", 1, kind="speech")
+    assert archive.pending.empty()
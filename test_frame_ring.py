@@ -0,0 +1,63 @@
+"""
+Tests for the raw frame ring and its frame selection
+"""
+
+import numpy as np
+
+from frame_ring import FrameRing
+
+
+def flat(value, shape=(48, 64, 3)):
+    return np.full(shape, value, dtype=np.uint8)
+
+
+def noise(seed, shape=(48, 64, 3)):
+    return np.random.default_rng(seed).integers(0, 256, shape, dtype=np.uint8)
+
+
+def test_ring_keeps_the_newest_frames_in_capture_order():
+    ring = FrameRing(4)
+    for i in range(6):
+        ring.push(flat(i * 10), float(i))
+    assert len(ring) == 4
+
+    frames, newest = ring.select(4)
+    assert [int(frame[0, 0, 0]) for frame in frames] == [20, 30, 40, 50]
+    assert newest == 5.0
+
+
+def test_select_prefers_sharp_frames_and_keeps_their_order():
+    ring = FrameRing(6)
+    sharp = {1: noise(1), 4: noise(4)}
+    for i in range(6):
+        ring.push(sharp.get(i, flat(128)), float(i))
+
+    frames, newest = ring.select(2)
+    assert len(frames) == 2
+    assert np.array_equal(frames[0], sharp[1])
+    assert np.array_equal(frames[1], sharp[4])
+    assert newest == 4.0
+
+
+def test_select_only_looks_at_the_newest_candidates():
+    ring = FrameRing(6)
+    for i in range(6):
+        ring.push(noise(i) if i == 0 else flat(128), float(i))
+
+    frames, newest = ring.select(1, candidates=2)
+    assert len(frames) == 1
+    assert not np.array_equal(frames[0], noise(0))
+    assert newest in (4.0, 5.0)
+
+
+def test_push_resizes_frames_to_the_first_frame_size():
+    ring = FrameRing(2)
+    ring.push(flat(10), 0.0)
+    ring.push(flat(200, shape=(96, 128, 3)), 1.0)
+    frames, _ = ring.select(2)
+    assert frames[1].shape == (48, 64, 3)
+    assert int(frames[1][0, 0, 0]) == 200
+
+
+def test_empty_ring_selects_nothing():
+    assert FrameRing(3).select(2) == ([], 0.0)
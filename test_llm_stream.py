@@ -0,0 +1,64 @@
+"""
+Tests for splitting streamed GPT-4o output into sentences
+"""
+
+from llm_stream import SentenceSplitter
+
+
+def feed_all(splitter, deltas):
+    segments = []
+    for delta in deltas:
+        segments += splitter.feed(delta)
+    return segments + splitter.flush()
+
+
+def test_sentences_go_out_as_soon_as_they_end():
+    splitter = SentenceSplitter(opening=0)
+    assert splitter.feed("Raise your left") == []
+    assert splitter.feed(" arm. Now the") == ["Raise your left arm."]
+    assert splitter.flush() == ["Now the"]
+
+
+def test_closing_quotes_stay_with_their_sentence():
+    splitter = SentenceSplitter(opening=0)
+    assert splitter.feed('Whisper "stop."') == []  # The quote may still be followed by more text
+    assert splitter.feed(' Then freeze.) ') == ['Whisper "stop."', "Then freeze.)"]
+    assert feed_all(SentenceSplitter(opening=0), ["Hold it.” ", "Breathe."]) == ["Hold it.”", "Breathe."]
+
+
+def test_lines_are_segments_and_bare_list_numbers_are_dropped():
+    segments = feed_all(SentenceSplitter(opening=0), ["1. Step forward\n2. Turn", " left\n\n"])
+    assert segments == ["Step forward", "Turn left"]
+
+
+def test_ritual_phrases_are_not_cut():
+    segments = feed_all(SentenceSplitter(opening=0),
+                        ["I see a body. ", "This is now my body. ", "Turn."])
+    assert segments == ["I see a body. This is now my body.", "Turn."]
+
+
+def test_break_tags_are_not_cut():
+    segments = feed_all(SentenceSplitter(opening=0), ['Wait. <break time="1.', '5s"/> Go. '])
+    assert segments == ["Wait.", '<break time="1.5s"/> Go.']
+
+
+def test_opening_is_held_back_until_checked():
+    splitter = SentenceSplitter(opening=32)
+    assert splitter.feed("Lift your chin. ") == []
+    assert splitter.feed("Look up to the light. ") == ["Lift your chin.", "Look up to the light."]
+
+
+def test_refusal_in_the_opening_suppresses_everything():
+    splitter = SentenceSplitter(opening=64)
+    assert splitter.feed("Beautiful. Now, ") == []
+    assert splitter.feed("I'm sorry, but I can't help with that. ") == []
+    assert splitter.feed("More text after the opening. " * 3) == []
+    assert splitter.refused
+    assert splitter.flush() == []
+
+
+def test_short_response_is_checked_as_a_whole():
+    assert feed_all(SentenceSplitter(opening=64), ["Turn around. ", "Slowly."]) == ["Turn around.", "Slowly."]
+    splitter = SentenceSplitter(opening=64)
+    assert feed_all(splitter, ["Unable to see ", "anyone."]) == []
+    assert splitter.refused
@@ -0,0 +1,80 @@
+"""
+Tests for the perceptual-hash cache of director responses
+"""
+
+import numpy as np
+import pytest
+
+from response_cache import ResponseCache, batch_distance, frame_hashes
+
+SCENE = [(0, 0)]
+SAME_SCENE = [(0b111, 0b1)]  # 3 bits away
+OTHER_SCENE = [(2 ** 64 - 1, 2 ** 64 - 1)]
+
+
+def test_hashes_match_a_brighter_copy_but_not_another_scene():
+    rng = np.random.default_rng(0)
+    frame = rng.integers(0, 200, (120, 160, 3), dtype=np.uint8)
+    brighter = frame + 20
+    other = rng.integers(0, 200, (120, 160, 3), dtype=np.uint8)
+    hashes = frame_hashes([frame])
+    assert batch_distance(hashes, frame_hashes([brighter])) <= 2
+    assert batch_distance(hashes, frame_hashes([other])) > 6
+    assert batch_distance(hashes, []) is None
+
+
+def test_similar_scene_is_a_hit_and_another_scene_a_miss():
+    cache = ResponseCache()
+    assert cache.lookup(SCENE) is None
+    cache.store(SCENE, "Raise your arm.")
+    assert cache.lookup(SAME_SCENE) == "Raise your arm."
+    assert cache.lookup(OTHER_SCENE) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_rotate_cycles_and_max_reuses_forces_a_refresh():
+    cache = ResponseCache(variants=2, max_reuses=3)
+    for response in ("one", "two", "three"):
+        cache.store(SCENE, response)
+    assert len(cache.entries) == 1
+    assert [cache.lookup(SCENE) for _ in range(3)] == ["two", "three", "two"]
+    assert cache.lookup(SCENE) is None
+    assert cache.refreshes == 1
+
+    cache.store(SCENE, "four")  # A fresh answer resets the count
+    assert cache.lookup(SCENE) == "three"
+
+
+def test_reuse_never_repeats_the_direction_just_given():
+    cache = ResponseCache(mode="reuse", max_reuses=None)
+    cache.store(SCENE, "one")
+    assert cache.lookup(SCENE, avoid="one") is None
+    cache.store(SCENE, "two")
+    assert cache.lookup(SCENE) == "two"
+    assert cache.lookup(SCENE, avoid="two") == "one"
+
+
+def test_fresh_lookups_are_counted_misses():
+    cache = ResponseCache()
+    cache.store(SCENE, "one")
+    assert cache.lookup(SCENE, fresh=True) is None
+    assert cache.forced == 1
+
+
+def test_entries_expire_and_the_oldest_are_evicted():
+    cache = ResponseCache(ttl=60.0, max_entries=1)
+    cache.store(SCENE, "one")
+    next(iter(cache.entries.values())).created_at -= 61.0
+    assert cache.lookup(SCENE) is None
+    assert cache.expired == 1
+
+    cache.store(SCENE, "one")
+    cache.store(OTHER_SCENE, "two")
+    assert cache.evictions == 1
+    assert cache.lookup(SCENE) is None
+    assert cache.lookup(OTHER_SCENE) == "two"
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        ResponseCache(mode="shuffle")
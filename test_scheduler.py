@@ -0,0 +1,54 @@
+"""
+Tests for the adaptive capture cadence
+"""
+
+import pytest
+
+from scheduler import CadenceScheduler
+
+
+def test_idle_speaker_triggers_once_per_window():
+    scheduler = CadenceScheduler()
+    assert scheduler.window() == 6.0  # Half of the 12s starting guess for a direction
+    assert scheduler.should_trigger(100.0)
+    assert not scheduler.should_trigger(103.0)
+    assert scheduler.should_trigger(106.0)
+
+
+def test_triggers_once_so_the_next_direction_is_ready_after_the_gap():
+    scheduler = CadenceScheduler(silence_gap=2.0)
+    scheduler.direction_started(200.0)
+    # 12s direction + 2s gap - (3s analysis + 0.5s TTS) lead time
+    assert not scheduler.should_trigger(210.0)
+    assert scheduler.should_trigger(210.5)
+    assert not scheduler.should_trigger(211.0)
+
+    scheduler.direction_finished(212.0)
+    scheduler.direction_started(214.5)
+    assert scheduler.gaps == [2.5]
+    assert scheduler.should_trigger(230.0)
+
+
+def test_measurements_move_the_estimates():
+    scheduler = CadenceScheduler(smoothing=0.5)
+    scheduler.record("analysis", 5.0)
+    assert scheduler.estimates["analysis"] == 4.0
+    scheduler.record("upload", 1.0)
+    assert scheduler.estimates["upload"] == 1.0
+
+    scheduler.direction_started(0.0)
+    scheduler.direction_finished(20.0)
+    assert scheduler.estimates["utterance"] == 16.0
+    assert scheduler.lead_time() == pytest.approx(4.5)
+
+
+@pytest.mark.parametrize("utterance, batch, interval", [
+    (1.0, 1, 2.0),  # Window clamped to min_window
+    (12.0, 3, 2.0),
+    (40.0, 4, 2.0),  # Window clamped to max_window, batch to max_batch
+])
+def test_batch_size_follows_direction_length(utterance, batch, interval):
+    scheduler = CadenceScheduler()
+    scheduler.estimates["utterance"] = utterance
+    assert scheduler.batch_size() == batch
+    assert scheduler.capture_interval() == pytest.approx(interval)
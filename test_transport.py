@@ -0,0 +1,115 @@
+"""
+Tests for the circuit breaker and retries of the resilient HTTP transport
+"""
+
+import threading
+
+import httpx
+import pytest
+
+from transport import CircuitBreaker, ResilientTransport
+
+
+class ScriptedTransport:
+    """Stands in for HTTPTransport: answers with the given status codes or exceptions in turn"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.requests = []
+
+    def handle_request(self, request):
+        self.requests.append(request)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return httpx.Response(outcome, headers={"retry-after": "0"}, request=request)
+
+    def close(self):
+        pass
+
+
+def make_transport(outcomes, **kwargs):
+    transport = ResilientTransport(httpx, "Test", backoff=0.0, max_backoff=0.0, **kwargs)
+    transport.base.close()
+    transport.base = ScriptedTransport(outcomes)
+    return transport
+
+
+def post(transport):
+    return transport.handle_request(httpx.Request("POST", "https://api.example.test/v1", content=b"{}"))
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker("Test", failure_threshold=2, reset_after=0.0)
+    breaker.failure()
+    assert breaker.state == "closed"
+    breaker.failure()
+    assert breaker.state == "open"
+
+    assert breaker.allow()
+    assert breaker.state == "half-open"
+    others = []
+    thread = threading.Thread(target=lambda: others.append(breaker.allow()))
+    thread.start()
+    thread.join()
+    assert others == [False]
+
+    breaker.failure()  # A failed trial reopens the circuit
+    assert breaker.state == "open"
+    assert breaker.allow()
+    breaker.success()
+    assert breaker.state == "closed"
+    assert breaker.opens == 2
+
+
+def test_release_frees_the_trial_only_for_its_thread():
+    breaker = CircuitBreaker("Test", failure_threshold=1, reset_after=0.0)
+    breaker.failure()
+    assert breaker.allow()
+    thread = threading.Thread(target=breaker.release)
+    thread.start()
+    thread.join()
+    assert breaker.trial is not None
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_open_circuit_fails_fast():
+    breaker = CircuitBreaker("Test", failure_threshold=1, reset_after=60.0)
+    breaker.failure()
+    assert not breaker.allow()
+    assert breaker.rejected == 1
+
+
+def test_429s_are_retried_without_tripping_the_breaker():
+    transport = make_transport([429, 429, 200], retries=2,
+                               breaker=CircuitBreaker("Test", failure_threshold=1))
+    assert post(transport).status_code == 200
+    assert transport.retried == 2
+    assert transport.breaker.state == "closed"
+    assert transport.breaker.failures == 0
+
+    transport.base.outcomes = [429, 429, 429]
+    assert post(transport).status_code == 429  # Out of retries: the caller sees the 429
+    assert transport.breaker.state == "closed"
+    transport.close()
+
+
+def test_429_during_a_half_open_trial_releases_it():
+    breaker = CircuitBreaker("Test", failure_threshold=1, reset_after=0.0)
+    breaker.failure()
+    transport = make_transport([429], retries=0, breaker=breaker)
+    assert post(transport).status_code == 429
+    assert breaker.state == "half-open"
+    assert breaker.trial is None
+    transport.close()
+
+
+def test_server_errors_open_the_circuit():
+    transport = make_transport([503, httpx.ConnectError("refused"), 200], retries=2,
+                               breaker=CircuitBreaker("Test", failure_threshold=2, reset_after=60.0))
+    with pytest.raises(httpx.ConnectError, match="circuit open"):
+        post(transport)
+    assert transport.breaker.state == "open"
+    assert len(transport.base.requests) == 2
+    transport.close()
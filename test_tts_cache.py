@@ -0,0 +1,71 @@
+"""
+Tests for splitting directions into ritual/text/break segments and the TTS cache
+"""
+
+from tts_cache import TTSCache, cache_key, split_utterance
+
+
+def test_split_utterance_separates_rituals_text_and_breaks():
+    text = ('I see a body. This is now my body. Raise your left arm. '
+            '<break time="1.5s"/> 1. Hold it. <break time="500ms" /> This is good. Good body.')
+    assert split_utterance(text) == [
+        ("ritual", "I see a body. This is now my body."),
+        ("text", "Raise your left arm."),
+        ("break", 1.5),
+        ("text", "Hold it."),
+        ("break", 0.5),
+        ("ritual", "This is good. Good body."),
+    ]
+
+
+def test_split_utterance_canonicalizes_ritual_spelling():
+    segments = split_utterance('"i see a  body.\nthis is NOW my body." Turn around.')
+    assert segments == [
+        ("ritual", "I see a body. This is now my body."),
+        ("text", "Turn around."),
+    ]
+
+
+def test_split_utterance_drops_unspeakable_leftovers():
+    assert split_utterance('- " " <break time="2s"/>') == [("break", 2.0)]
+
+
+def test_cache_key_covers_every_parameter():
+    settings = {"stability": 0.5, "similarity_boost": 0.75}
+    key = cache_key("voice", "model", settings, "mp3_44100_128", "Turn around.")
+    reordered = {"similarity_boost": 0.75, "stability": 0.5}
+    assert key == cache_key("voice", "model", reordered, "mp3_44100_128", "Turn around.")
+
+    changed = [
+        ("other-voice", "model", settings, "mp3_44100_128", "Turn around."),
+        ("voice", "other-model", settings, "mp3_44100_128", "Turn around."),
+        ("voice", "model", dict(settings, stability=0.6), "mp3_44100_128", "Turn around."),
+        ("voice", "model", settings, "pcm_16000", "Turn around."),
+        ("voice", "model", settings, "mp3_44100_128", "Turn around!"),
+    ]
+    assert len({cache_key(*args) for args in changed} | {key}) == len(changed) + 1
+
+
+def test_tts_cache_memory_then_disk_hits(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), memory_items=1)
+    assert cache.get("a", "text") is None
+    cache.put("a", b"audio-a")
+    assert cache.get("a", "text") == b"audio-a"
+    assert (cache.misses, cache.memory_hits) == (1, 1)
+
+    cache.put("b", b"audio-b")  # Pushes "a" out of memory; it is still on disk
+    assert cache.get("a") == b"audio-a"
+    assert cache.disk_hits == 1
+    assert cache.chars_saved == len("text")
+
+    reopened = TTSCache(directory=str(tmp_path))
+    assert reopened.get("b") == b"audio-b"
+    assert reopened.disk_hits == 1
+
+
+def test_tts_cache_evicts_disk_entries_over_the_cap(tmp_path):
+    cache = TTSCache(directory=str(tmp_path), disk_max_bytes=25)
+    for key in "abc":
+        cache.put(key, b"x" * 10)
+    assert cache.disk_bytes <= 25
+    assert len(list(tmp_path.glob("*.audio"))) == 2
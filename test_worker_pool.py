@@ -0,0 +1,82 @@
+"""
+Tests for rate limiting and fair slot handout in the shared API workers
+"""
+
+import threading
+import time
+
+import pytest
+
+from worker_pool import TokenBucket, WorkerPool, per_minute
+
+
+def test_token_bucket_allows_a_burst_then_paces():
+    bucket = TokenBucket(rate=20.0, capacity=2)
+    assert bucket.take() == 0.0
+    assert bucket.take() == 0.0
+    started = time.monotonic()
+    delay = bucket.take()
+    assert delay == pytest.approx(0.05, abs=0.01)
+    assert time.monotonic() - started >= 0.04
+    assert bucket.waited == delay
+
+
+def test_token_bucket_never_charges_more_than_its_capacity():
+    bucket = TokenBucket(rate=1000.0, capacity=5)
+    assert bucket.take(50) == 0.0
+    assert bucket.take(1) > 0.0
+
+
+def test_per_minute():
+    assert per_minute(None) is None
+    bucket = per_minute(600)
+    assert (bucket.rate, bucket.capacity) == (10.0, 100.0)
+
+
+def wait_for_waiting(pool, count):
+    deadline = time.monotonic() + 2.0
+    while pool.waiting_count() < count:
+        assert time.monotonic() < deadline, "callers never queued"
+        time.sleep(0.001)
+
+
+def queue_callers(pool, callers, order):
+    """Start one thread per (name, feed) and wait until each is queued, in that order"""
+    threads = []
+    for name, feed in callers:
+        def call(name=name, feed=feed):
+            with pool.slot(feed):
+                order.append(name)
+        thread = threading.Thread(target=call)
+        thread.start()
+        threads.append(thread)
+        wait_for_waiting(pool, len(threads))
+    return threads
+
+
+def test_feed_served_longest_ago_goes_first():
+    pool = WorkerPool("Test", workers=1)
+    pool.acquire("a")
+    order = []
+    threads = queue_callers(pool, [("a2", "a"), ("a3", "a"), ("b", "b")], order)
+    pool.release("a")
+    for thread in threads:
+        thread.join()
+    assert order == ["b", "a2", "a3"]
+
+
+def test_feed_with_fewest_calls_in_flight_goes_first():
+    pool = WorkerPool("Test", workers=2)
+    pool.acquire("a")
+    with pool.slot("b"):
+        pass  # b was served after a
+    pool.acquire("c")
+    order = []
+    threads = queue_callers(pool, [("a2", "a"), ("b2", "b")], order)
+    pool.release("c")  # a2 arrived first, but a already has a call in flight
+    threads[1].join()
+    pool.release("a")
+    threads[0].join()
+    assert order == ["b2", "a2"]
+    assert pool.busy == 0
+    assert pool.calls == {"b": 2, "a": 1}
@@ -0,0 +1,347 @@
+"""
+Resilient HTTP transport shared by the OpenAI and ElevenLabs clients
+
+Both SDKs accept an httpx-style client (the OpenAI SDK uses httpx2, the
+ElevenLabs SDK httpx), and `ResilientTransport` wraps the standard
+HTTPTransport of either one:
+
+- explicit connect and read deadlines on every attempt
+- retries with jittered exponential backoff for connection errors,
+  timeouts, 429 and 5xx (honouring Retry-After)
+- optional hedging: when no response headers have arrived after the p95
+  of recent requests, a duplicate is sent and the first answer wins
+- keep-alive connection pools that are warmed at session start and
+  re-warmed while idle, so the first direction doesn't pay for TLS
+- a circuit breaker that fails fast while a service keeps failing (429s
+  are retried but don't count as failures)
+
+Every attempt records where its time went (pool wait and TCP connect, TLS,
+server wait) as `<service>_http_*` spans, with retry, hedge and breaker
+counters, so the stage timings show where tail latency comes from. The
+SDKs' own retries should be turned off (max_retries=0).
+"""
+
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from email.utils import parsedate_to_datetime
+
+from metrics import metrics, percentile
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class CircuitBreaker:
+    """Closed → open after `failure_threshold` failures in a row → half-open after `reset_after` seconds
+
+    While open every call fails fast; in half-open one trial call is let
+    through and its outcome closes or reopens the circuit. A trial that ends
+    without an outcome (rate limited, or an error that isn't the service's)
+    is released so the next call can try.
+    """
+
+    def __init__(self, name, failure_threshold=5, reset_after=20.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_after = reset_after
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial = None  # Thread making the half-open trial call
+        self.opens = 0
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def allow(self):
+        """Whether a call may go out now"""
+        with self.lock:
+            if self.state == "closed":
+                return True
+            if self.state == "open" and time.time() - self.opened_at >= self.reset_after:
+                self.state = "half-open"
+                self.trial = None
+            if self.state == "half-open" and self.trial is None:
+                self.trial = threading.get_ident()
+                return True
+            self.rejected += 1
+            return False
+
+    def release(self):
+        """Free the half-open trial slot if this thread holds it"""
+        with self.lock:
+            if self.trial == threading.get_ident():
+                self.trial = None
+
+    def success(self):
+        with self.lock:
+            if self.state != "closed":
+                print(f"🔌 {self.name} is answering again; circuit closed")
+            self.state = "closed"
+            self.failures = 0
+
+    def failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.state == "half-open" or (self.state == "closed"
+                                             and self.failures >= self.failure_threshold):
+                if self.state == "closed":
+                    print(f"🔌 {self.name} failed {self.failures} times in a row; "
+                          f"failing fast for {self.reset_after:.0f}s")
+                self.state = "open"
+                self.opened_at = time.time()
+                self.opens += 1
+                metrics.increment(f"{self.name.lower()}_breaker_opens")
+
+
+def _retry_after(response):
+    """Seconds asked for by a Retry-After header, or None"""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class ResilientTransport:
+    """Deadlines, retries, hedging, warm pools and a circuit breaker around an HTTPTransport
+
+    `http` is the httpx module the SDK uses (httpx or httpx2).
+    """
+
+    def __init__(self, http, service, connect_timeout=3.0, read_timeout=20.0, retries=2,
+                 backoff=0.25, max_backoff=2.0, hedge=False, hedge_min_samples=20,
+                 hedge_floor=0.5, breaker=None, keepalive_expiry=120.0, max_connections=8):
+        self.http = http
+        self.service = service
+        self.prefix = service.lower()
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout  # Longest silence between bytes, not the whole request
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples  # Samples needed before the p95 is trusted
+        self.hedge_floor = hedge_floor  # Never hedge sooner than this
+        self.breaker = breaker or CircuitBreaker(service)
+        self.base = http.HTTPTransport(limits=http.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+            keepalive_expiry=keepalive_expiry,
+        ))
+        self.latencies = deque(maxlen=200)  # Seconds to response headers, for the hedge delay
+        self.pool = ThreadPoolExecutor(max_workers=max_connections, thread_name_prefix=f"{self.prefix}-http")
+        self.last_used = 0.0
+        self.lock = threading.Lock()  # Guards the latencies and the counters below
+        self.warmer = None
+        self.stop_event = threading.Event()
+
+        self.requests = 0
+        self.attempts = 0
+        self.retried = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+        self.new_connections = 0
+        self.reused_connections = 0
+
+    # httpx BaseTransport API
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def close(self):
+        self.stop_event.set()
+        self.pool.shutdown(wait=False)
+        self.base.close()
+
+    def handle_request(self, request):
+        request.read()  # Retries and hedges need the body more than once
+        with self.lock:
+            self.requests += 1
+        self.last_used = time.time()
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                with self.lock:
+                    self.retried += 1
+                metrics.increment(f"{self.prefix}_http_retries")
+            if not self.breaker.allow():
+                raise self.http.ConnectError(f"{self.service} circuit open after repeated failures",
+                                             request=request)
+            try:
+                response = self._send(request)
+            except self.http.TransportError as e:
+                self.breaker.failure()
+                error = e
+                delay = None
+            else:
+                if response.status_code not in RETRY_STATUSES:
+                    self.breaker.success()
+                    return response
+                # Rate limiting means the service is up: wait as asked, but don't trip the breaker
+                if response.status_code != 429:
+                    self.breaker.failure()
+                if attempt == self.retries:
+                    return response
+                delay = _retry_after(response)
+                response.close()
+            finally:
+                # Any other exception, or a 429, leaves no outcome for a half-open trial
+                self.breaker.release()
+            if attempt < self.retries:
+                # Full jitter keeps a crowd of clients from retrying in lockstep
+                backoff = random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+                time.sleep(backoff if delay is None else min(max(delay, backoff), self.max_backoff * 4))
+        raise error
+
+    # Attempts
+
+    def hedge_delay(self):
+        """Seconds to wait for headers before sending a duplicate, or None to not hedge"""
+        if not self.hedge:
+            return None
+        with self.lock:
+            samples = list(self.latencies)
+        if len(samples) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_floor, percentile(samples, 0.95))
+
+    def _send(self, request):
+        delay = self.hedge_delay()
+        if delay is None:
+            return self._attempt(request)
+        first = self.pool.submit(self._attempt, request)
+        done, _ = wait([first], timeout=delay)
+        if done:
+            return first.result()
+
+        with self.lock:
+            self.hedged += 1
+        metrics.increment(f"{self.prefix}_http_hedges")
+        hedge = self.pool.submit(self._attempt, request)
+        pending = [first, hedge]
+        error = None
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                pending.remove(future)
+                if future.exception() is not None:
+                    error = future.exception()
+                    continue
+                # The loser's response (if it ever arrives) is closed and its connection released
+                for other in pending:
+                    other.add_done_callback(_close_result)
+                if future is hedge:
+                    with self.lock:
+                        self.hedge_wins += 1
+                    metrics.increment(f"{self.prefix}_http_hedge_wins")
+                return future.result()
+        raise error
+
+    def _attempt(self, request):
+        marks = {}
+
+        def trace(event, info):
+            marks[event] = time.perf_counter()
+
+        # Each attempt gets its own request so hedged copies can be traced separately
+        timeout = dict(request.extensions.get("timeout") or {})
+        timeout["connect"] = min(timeout.get("connect") or self.connect_timeout, self.connect_timeout)
+        timeout["pool"] = min(timeout.get("pool") or self.connect_timeout, self.connect_timeout)
+        timeout["read"] = min(timeout.get("read") or self.read_timeout, self.read_timeout)
+        copy = self.http.Request(request.method, request.url, headers=request.headers,
+                                 content=request.content,
+                                 extensions=dict(request.extensions, timeout=timeout, trace=trace))
+        with self.lock:
+            self.attempts += 1
+        started = time.perf_counter()
+        response = self.base.handle_request(copy)
+        headers_at = time.perf_counter()
+        self._record(marks, started, headers_at)
+        return response
+
+    def _record(self, marks, started, headers_at):
+        connected = marks.get("connection.connect_tcp.complete")
+        with self.lock:
+            self.latencies.append(headers_at - started)
+            if connected is not None:
+                self.new_connections += 1
+            else:
+                self.reused_connections += 1
+        prefix = f"{self.prefix}_http"
+        metrics.observe(f"{prefix}_headers", headers_at - started)
+        if connected is not None:
+            metrics.observe(f"{prefix}_connect", connected - started)
+            tls_started = marks.get("connection.start_tls.started")
+            tls_done = marks.get("connection.start_tls.complete")
+            if tls_started is not None and tls_done is not None:
+                metrics.observe(f"{prefix}_tls", tls_done - tls_started)
+        sent = marks.get("http11.send_request_body.complete") or marks.get("http2.send_request_body.complete")
+        if sent is not None:
+            metrics.observe(f"{prefix}_server_wait", headers_at - sent)
+
+    # Warm connections
+
+    def warm(self, url, connections=2):
+        """Open `connections` keep-alive connections to the origin of `url` in parallel"""
+        origin = self.http.URL(str(url)).copy_with(raw_path=b"/")
+
+        def touch():
+            request = self.http.Request("HEAD", origin, extensions={"timeout": {
+                "connect": self.connect_timeout, "read": self.connect_timeout,
+                "write": self.connect_timeout, "pool": self.connect_timeout}})
+            try:
+                response = self.base.handle_request(request)
+                response.read()
+                response.close()
+                return True
+            except self.http.TransportError:
+                return False
+
+        started = time.perf_counter()
+        results = list(self.pool.map(lambda _: touch(), range(connections)))
+        self.last_used = time.time()
+        metrics.observe(f"{self.prefix}_http_warm", time.perf_counter() - started)
+        return sum(results)
+
+    def keep_warm(self, url, connections=2, idle_after=30.0):
+        """Re-warm the pool from a background thread whenever it has been idle for `idle_after` seconds"""
+        if self.warmer is not None:
+            return
+        self.stop_event.clear()
+
+        def run():
+            while not self.stop_event.wait(idle_after / 3):
+                if time.time() - self.last_used >= idle_after:
+                    self.warm(url, connections)
+
+        self.warmer = threading.Thread(target=run, name=f"{self.prefix}-keep-warm", daemon=True)
+        self.warmer.start()
+
+    def stop_warming(self):
+        self.stop_event.set()
+        self.warmer = None
+
+    def summary(self):
+        text = (f"{self.requests} request(s), {self.retried} retried, "
+                f"{self.new_connections} new / {self.reused_connections} reused connection(s)")
+        if self.hedge:
+            text += f", {self.hedged} hedged ({self.hedge_wins} won by the hedge)"
+        if self.breaker.opens or self.breaker.rejected:
+            text += f", circuit opened {self.breaker.opens}x, {self.breaker.rejected} call(s) failed fast"
+        return text
+
+
+def _close_result(future):
+    if future.exception() is None:
+        future.result().close()
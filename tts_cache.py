@@ -0,0 +1,186 @@
+"""
+Content-addressed cache for synthesized speech
+
+Audio is keyed by everything that affects the rendered sound: voice, model,
+voice settings, output format and text. Recent entries live in an in-memory
+LRU; everything is also written to a size-capped directory on disk so the
+ritual phrases survive restarts.
+"""
+
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+
+# Lines the director speaks on every cycle; these are synthesized once and reused
+RITUAL_PHRASES = [
+    "I see a body. This is now my body.",
+    "This is good. Good body.",
+]
+
+BREAK_PATTERN = re.compile(r'<break\s+time\s*=\s*"([\d.]+)\s*(ms|s)"\s*/?>', re.IGNORECASE)
+RITUAL_PATTERN = re.compile(
+    "|".join(r"\s+".join(re.escape(word) for word in phrase.split()) for phrase in RITUAL_PHRASES),
+    re.IGNORECASE,
+)
+LIST_NUMBER_PATTERN = re.compile(r"^\s*(\d+[.)]|[-*•])\s*", re.MULTILINE)
+
+
+def cache_key(voice_id, model_id, voice_settings, output_format, text):
+    """Stable hash of every parameter that changes the synthesized audio"""
+    payload = json.dumps([voice_id, model_id, voice_settings, output_format, text],
+                         sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _canonical_ritual(text):
+    normalized = " ".join(text.split()).lower()
+    for phrase in RITUAL_PHRASES:
+        if phrase.lower() == normalized:
+            return phrase
+    return text
+
+
+def _clean_text(text):
+    text = LIST_NUMBER_PATTERN.sub("", text)
+    text = " ".join(text.replace('"', " ").replace("“", " ").replace("”", " ").split())
+    return text if re.search(r"\w", text) else ""
+
+
+def split_utterance(text):
+    """Split a director response into ("ritual" | "text", str) and ("break", seconds) segments"""
+    segments = []
+    position = 0
+    for match in BREAK_PATTERN.finditer(text):
+        segments.extend(_split_rituals(text[position:match.start()]))
+        seconds = float(match.group(1))
+        if match.group(2).lower() == "ms":
+            seconds /= 1000.0
+        segments.append(("break", seconds))
+        position = match.end()
+    segments.extend(_split_rituals(text[position:]))
+    return segments
+
+
+def _split_rituals(text):
+    segments = []
+    position = 0
+    for match in RITUAL_PATTERN.finditer(text):
+        cleaned = _clean_text(text[position:match.start()])
+        if cleaned:
+            segments.append(("text", cleaned))
+        segments.append(("ritual", _canonical_ritual(match.group(0))))
+        position = match.end()
+    cleaned = _clean_text(text[position:])
+    if cleaned:
+        segments.append(("text", cleaned))
+    return segments
+
+
+class TTSCache:
+    """Two-tier (memory LRU + size-capped disk) cache of synthesized audio"""
+
+    def __init__(self, directory=".tts_cache", memory_items=64, disk_max_bytes=256 * 1024 * 1024):
+        self.directory = directory
+        self.memory_items = memory_items
+        self.disk_max_bytes = disk_max_bytes
+        self.memory = OrderedDict()
+        self.lock = threading.Lock()
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.chars_saved = 0  # Characters we didn't have to send to ElevenLabs
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.disk_bytes = sum(size for _, size, _ in self._disk_entries())
+
+    def _path(self, key):
+        return os.path.join(self.directory, f"{key}.audio")
+
+    def get(self, key, text=""):
+        """Return cached audio bytes or None"""
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                self.memory_hits += 1
+                self.chars_saved += len(text)
+                return self.memory[key]
+
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+            os.utime(path)  # Mark as recently used for disk eviction
+        except OSError:
+            with self.lock:
+                self.misses += 1
+            return None
+
+        with self.lock:
+            self.disk_hits += 1
+            self.chars_saved += len(text)
+            self._remember(key, data)
+        return data
+
+    def put(self, key, data):
+        """Store audio bytes in both tiers"""
+        if not data:
+            return
+        with self.lock:
+            self._remember(key, data)
+
+        path = self._path(key)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            existing = os.path.getsize(path) if os.path.exists(path) else 0
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"⚠️  Could not write TTS cache entry: {e}")
+            return
+
+        with self.lock:
+            self.disk_bytes += len(data) - existing
+            if self.disk_bytes > self.disk_max_bytes:
+                self._evict_disk()
+
+    def _remember(self, key, data):
+        self.memory[key] = data
+        self.memory.move_to_end(key)
+        while len(self.memory) > self.memory_items:
+            self.memory.popitem(last=False)
+
+    def _disk_entries(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".audio"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            entries.append((name, stat.st_size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        """Delete least recently used files until the directory is under its cap"""
+        entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+        total = sum(size for _, size, _ in entries)
+        for name, size, _ in entries:
+            if total <= self.disk_max_bytes:
+                break
+            try:
+                os.unlink(os.path.join(self.directory, name))
+                total -= size
+            except OSError:
+                pass
+        self.disk_bytes = total
+
+    def summary(self):
+        """One-line hit/miss summary"""
+        return (f"{self.memory_hits} memory hits, {self.disk_hits} disk hits, "
+                f"{self.misses} misses, {self.chars_saved} characters saved")
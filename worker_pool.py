@@ -0,0 +1,140 @@
+"""
+API workers shared by every camera feed
+
+In a multi-camera session each feed has its own director, but they all
+draw on one OpenAI quota and one ElevenLabs quota. A `WorkerPool` bounds
+how many calls to one API are in flight at once and hands free slots out
+fairly: to the waiting feed with the fewest calls already running, then to
+the one served longest ago, so a feed that triggers often can't starve the
+others. Each call also takes from the API's token buckets (requests and
+tokens or characters per minute) before it goes out.
+"""
+
+import itertools
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from metrics import metrics, percentile
+
+
+class TokenBucket:
+    """`rate` tokens per second, with up to `capacity` saved up for a burst
+
+    Callers take tokens on credit and sleep off the debt, so they are
+    served in the order they asked.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.waited = 0.0
+        self.lock = threading.Lock()
+
+    def take(self, amount=1):
+        """Take `amount` tokens, sleeping until they are available; returns seconds waited"""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= min(amount, self.capacity)
+            delay = max(0.0, -self.tokens / self.rate)
+            self.waited += delay
+        if delay:
+            time.sleep(delay)
+        return delay
+
+
+def per_minute(limit, burst_seconds=10.0):
+    """Token bucket for a per-minute quota that allows `burst_seconds` of it at once, or None"""
+    if not limit:
+        return None
+    return TokenBucket(limit / 60.0, limit * burst_seconds / 60.0)
+
+
+class WorkerPool:
+    """At most `workers` concurrent calls to one API, shared fairly between feeds
+
+    `tokens_per_minute` is the quota for whatever `slot(tokens=...)` counts:
+    prompt and completion tokens for OpenAI, characters for ElevenLabs.
+    """
+
+    def __init__(self, name, workers=4, requests_per_minute=None, tokens_per_minute=None):
+        self.name = name
+        self.workers = workers
+        self.requests = per_minute(requests_per_minute)
+        self.tokens = per_minute(tokens_per_minute)
+        self.cond = threading.Condition()
+        self.busy = 0
+        self.active = {}  # Feed -> calls in flight
+        self.served_at = {}  # Feed -> when it was last given a slot
+        self.waiting = []  # (arrival, feed) tickets
+        self.arrivals = itertools.count()
+        self.waits = {}  # Feed -> recent seconds spent waiting for a slot and tokens
+        self.calls = {}
+
+    def _next(self):
+        return min(self.waiting, key=lambda ticket: (self.active.get(ticket[1], 0),
+                                                     self.served_at.get(ticket[1], 0.0), ticket[0]))
+
+    def acquire(self, feed):
+        """Block until this feed is given a slot"""
+        with self.cond:
+            ticket = (next(self.arrivals), feed)
+            self.waiting.append(ticket)
+            while self.busy >= self.workers or self._next() is not ticket:
+                self.cond.wait()
+            self.waiting.remove(ticket)
+            self.busy += 1
+            self.active[feed] = self.active.get(feed, 0) + 1
+            self.served_at[feed] = time.monotonic()
+            self.cond.notify_all()  # Another slot may be free for whoever is next
+
+    def release(self, feed):
+        with self.cond:
+            self.busy -= 1
+            self.active[feed] -= 1
+            self.cond.notify_all()
+
+    @contextmanager
+    def slot(self, feed, tokens=0):
+        """Hold one of the pool's slots for the body of a with-block"""
+        started = time.perf_counter()
+        self.acquire(feed)
+        try:
+            if self.requests is not None:
+                self.requests.take(1)
+            if self.tokens is not None and tokens:
+                self.tokens.take(tokens)
+            waited = time.perf_counter() - started
+            with self.cond:
+                self.waits.setdefault(feed, deque(maxlen=200)).append(waited)
+                self.calls[feed] = self.calls.get(feed, 0) + 1
+            metrics.observe(f"{self.name.lower()}_worker_wait", waited, feed=feed)
+            yield
+        finally:
+            self.release(feed)
+
+    def waiting_count(self):
+        with self.cond:
+            return len(self.waiting)
+
+    def feed_summary(self, feed):
+        with self.cond:
+            waits = list(self.waits.get(feed, ()))
+        return (f"{self.calls.get(feed, 0)} {self.name} call(s), waited p50 "
+                f"{percentile(waits, 0.5) * 1000:.0f} ms / p95 {percentile(waits, 0.95) * 1000:.0f} ms")
+
+    def summary(self):
+        with self.cond:
+            calls = sum(self.calls.values())
+            waits = [wait for feed_waits in self.waits.values() for wait in feed_waits]
+        text = (f"{calls} call(s) on {self.workers} worker(s), waited p95 "
+                f"{percentile(waits, 0.95) * 1000:.0f} ms")
+        throttled = sum(bucket.waited for bucket in (self.requests, self.tokens) if bucket is not None)
+        if throttled:
+            text += f", {throttled:.1f}s held back by the rate limit"
+        return text